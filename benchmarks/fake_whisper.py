@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""fake_whisper.py -- Deterministic stand-in for the whisper.cpp CLI and server.
+
+CLI mode mirrors ``main -m MODEL -f FILE|- --language L --output-vtt``: it
+reads a WAV file (or stdin for ``-f -``), sleeps to simulate work and prints
+VTT with one cue per second of audio, flushing each cue as it is "decoded"
+like the real binary does. With ``--port`` it behaves like
+``whisper-server`` instead and answers ``POST /inference`` multipart uploads.
+
+Timing is controlled through environment variables so the real transcriber
+code paths can run unchanged:
+
+    FAKE_WHISPER_LOAD_SEC      model load time per process (default 0.05)
+    FAKE_WHISPER_RTF           seconds of work per second of audio (default 0.02)
+    FAKE_WHISPER_WORDS         words per one-second cue (default 6)
+
+Output text is derived from the audio length only, so runs are repeatable.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import re
+import sys
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+_WORDS = "the quick brown fox jumps over a lazy dog while whisper listens".split()
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _arg(argv: List[str], flag: str, default: str = "") -> str:
+    return argv[argv.index(flag) + 1] if flag in argv and argv.index(flag) + 1 < len(argv) else default
+
+
+def _timestamp(ms: int) -> str:
+    seconds, millis = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+def iter_vtt(wav_bytes: bytes) -> Iterator[str]:
+    """Simulate inference over one WAV file, yielding its VTT one cue at a time."""
+    with wave.open(io.BytesIO(wav_bytes)) as wf:
+        duration_ms = wf.getnframes() * 1000 // max(1, wf.getframerate())
+    rtf = _env_float("FAKE_WHISPER_RTF", 0.02)
+    words = max(1, int(_env_float("FAKE_WHISPER_WORDS", 6)))
+    yield "WEBVTT\n\n"
+    for cue, start in enumerate(range(0, duration_ms, 1000)):
+        end = min(start + 1000, duration_ms)
+        time.sleep(rtf * (end - start) / 1000.0)
+        text = " ".join(_WORDS[(cue * words + i) % len(_WORDS)] for i in range(words))
+        yield f"{_timestamp(start)} --> {_timestamp(end)}\n{text}\n\n"
+
+
+def transcribe(wav_bytes: bytes) -> str:
+    """Simulate inference over one WAV file and return its VTT transcript."""
+    return "".join(iter_vtt(wav_bytes))
+
+
+class _InferenceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        match = re.search(r"boundary=([^;]+)", self.headers.get("Content-Type", ""))
+        audio = b""
+        if match:
+            for part in body.split(b"--" + match.group(1).encode()):
+                head, _, content = part.partition(b"\r\n\r\n")
+                if b'name="file"' in head:
+                    audio = content[:-2] if content.endswith(b"\r\n") else content
+        try:
+            payload, status = transcribe(audio).encode(), 200
+        except (wave.Error, EOFError) as exc:
+            payload, status = f"bad audio: {exc}".encode(), 400
+        self.send_response(status)
+        self.send_header("Content-Type", "text/vtt")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+def main(argv: List[str]) -> int:
+    time.sleep(_env_float("FAKE_WHISPER_LOAD_SEC", 0.05))
+    if "--port" in argv:
+        server = ThreadingHTTPServer((_arg(argv, "--host", "127.0.0.1"), int(_arg(argv, "--port"))), _InferenceHandler)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    source = _arg(argv, "-f")
+    if not source:
+        print("error: no input file (-f)", file=sys.stderr)
+        return 2
+    if source == "-":
+        data = sys.stdin.buffer.read()
+    else:
+        with open(source, "rb") as f:
+            data = f.read()
+    for cue in iter_vtt(data):
+        sys.stdout.write(cue)
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
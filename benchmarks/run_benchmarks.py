@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""run_benchmarks.py -- Throughput and latency benchmarks for WhisperLite.
+
+Runs against ``fake_whisper.py`` so no whisper.cpp build or model is
+needed, and prints one JSON document (or writes it with ``--output``) that
+can be diffed between commits. A short human-readable summary goes to
+stderr.
+
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --only buffer,vtt --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List
+
+REPO = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO / "src"))
+
+import numpy as np  # noqa: E402
+import soundfile as sf  # noqa: E402
+
+from audio_chunk import AudioChunk  # noqa: E402
+from output_writer import save_transcript  # noqa: E402
+from segments import Segment, format_timestamp  # noqa: E402
+from transcriber import WhisperTranscriber, parse_vtt  # noqa: E402
+from transcript_buffer import TranscriptBuffer  # noqa: E402
+
+FAKE_WHISPER = Path(__file__).resolve().parent / "fake_whisper.py"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples, dtype=np.float64)
+    return {
+        "p50": round(float(np.percentile(values, 50)), 3),
+        "p95": round(float(np.percentile(values, 95)), 3),
+        "p99": round(float(np.percentile(values, 99)), 3),
+        "max": round(float(values.max()), 3),
+    }
+
+
+def install_fake_binaries(directory: Path) -> Dict[str, str]:
+    """Expose fake_whisper.py as ``main`` and ``whisper-server`` in ``directory``."""
+    paths = {}
+    for name in ("main", "whisper-server"):
+        path = directory / name
+        path.write_text(f"#!/bin/sh\nexec \"{sys.executable}\" \"{FAKE_WHISPER}\" \"$@\"\n")
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        paths[name] = str(path)
+    return paths
+
+
+def write_tone(path: Path, seconds: float, rate: int = 16000) -> None:
+    t = np.arange(int(seconds * rate)) / rate
+    sf.write(str(path), (6000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16), rate)
+
+
+def bench_chunk_latency(ctx: Dict, quick: bool) -> List[Dict]:
+    """Latency of single chunks through one-shot processes and a warm server worker."""
+    results = []
+    n_chunks = 10 if quick else 40
+    pcm = (np.zeros(24000, dtype=np.int16)).tobytes()
+    for workers in (0, 1):
+        transcriber = WhisperTranscriber(
+            ctx["model"], whisper_bin=ctx["bins"]["main"], server_bin=ctx["bins"]["whisper-server"], workers=workers
+        )
+        latencies = []
+        try:
+            for i in range(n_chunks):
+                start = time.perf_counter()
+                transcriber.transcribe_chunk(AudioChunk(i, pcm, offset_ms=i * 1500))
+                latencies.append((time.perf_counter() - start) * 1000)
+        finally:
+            transcriber.close()
+        results.append({
+            "name": "chunk_latency",
+            "params": {"backend": "server" if workers else "one-shot", "chunks": n_chunks, "chunk_sec": 1.5},
+            "metrics": {"latency_ms": percentiles(latencies)},
+        })
+    return results
+
+
+def bench_first_segment(ctx: Dict, quick: bool) -> List[Dict]:
+    """Time until the first segment of a long chunk is available, with and without streaming."""
+    results = []
+    n_chunks = 3 if quick else 10
+    pcm = (np.zeros(16000 * 8, dtype=np.int16)).tobytes()
+    transcriber = WhisperTranscriber(ctx["model"], whisper_bin=ctx["bins"]["main"])
+    for streaming in (False, True):
+        first, total = [], []
+        for i in range(n_chunks):
+            start = time.perf_counter()
+            arrivals = []
+            on_segment = (lambda _segment: arrivals.append(time.perf_counter())) if streaming else None
+            transcriber.transcribe_chunk(AudioChunk(i, pcm), on_segment=on_segment)
+            done = time.perf_counter()
+            first.append(((arrivals[0] if arrivals else done) - start) * 1000)
+            total.append((done - start) * 1000)
+        results.append({
+            "name": "first_segment",
+            "params": {"streaming": streaming, "chunks": n_chunks, "chunk_sec": 8.0},
+            "metrics": {"first_segment_ms": percentiles(first), "chunk_ms": percentiles(total)},
+        })
+    return results
+
+
+def bench_cli_rtf(ctx: Dict, quick: bool) -> List[Dict]:
+    """End-to-end real-time factor of ``main.py --input`` on a synthetic recording."""
+    results = []
+    audio_sec = 15.0 if quick else 60.0
+    wav = ctx["tmp"] / "cli_input.wav"
+    write_tone(wav, audio_sec)
+    env = dict(os.environ, PATH=f"{ctx['bin_dir']}{os.pathsep}{os.environ.get('PATH', '')}")
+    for jobs in (1, 4):
+        output = ctx["tmp"] / f"cli_out_{jobs}.txt"
+        cmd = [sys.executable, str(REPO / "src" / "main.py"), "--input", str(wav), "--model", ctx["model"],
+               "--output", str(output), "--jobs", str(jobs)]
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        wall = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"main.py failed: {proc.stderr.strip()}")
+        results.append({
+            "name": "cli_rtf",
+            "params": {"audio_sec": audio_sec, "jobs": jobs},
+            "metrics": {"wall_sec": round(wall, 3), "rtf": round(wall / audio_sec, 4)},
+        })
+    return results
+
+
+def bench_vtt(ctx: Dict, quick: bool) -> List[Dict]:
+    """VTT parsing throughput on whisper-style output."""
+    results = []
+    for cues in ((10_000,) if quick else (10_000, 100_000)):
+        text = "WEBVTT\n\n" + "".join(
+            f"{format_timestamp(i * 1000)} --> {format_timestamp(i * 1000 + 900)}\nsegment number {i} of the test\n\n"
+            for i in range(cues)
+        )
+        start = time.perf_counter()
+        segments = parse_vtt(text)
+        elapsed = time.perf_counter() - start
+        assert len(segments) == cues
+        results.append({
+            "name": "vtt_parse",
+            "params": {"cues": cues},
+            "metrics": {
+                "elapsed_ms": round(elapsed * 1000, 3),
+                "cues_per_sec": round(cues / elapsed),
+                "mb_per_sec": round(len(text) / elapsed / 1e6, 2),
+            },
+        })
+    return results
+
+
+def bench_buffer(ctx: Dict, quick: bool) -> List[Dict]:
+    """TranscriptBuffer append, incremental read, range query and full-text cost."""
+    results = []
+    for size in ((10_000, 100_000) if quick else (100_000, 1_000_000)):
+        buffer = TranscriptBuffer()
+        segments = [Segment(i * 1000, i * 1000 + 900, f"word{i}") for i in range(size)]
+        cursor = 0
+        read_ns = []
+        start = time.perf_counter()
+        for i, segment in enumerate(segments):
+            buffer.append([segment])
+            if i % 100 == 0:
+                t0 = time.perf_counter_ns()
+                cursor = buffer.read_since(cursor).cursor
+                read_ns.append(time.perf_counter_ns() - t0)
+        append_sec = time.perf_counter() - start
+
+        t0 = time.perf_counter()
+        for k in range(1000):
+            buffer.get_range((k * 997 % size) * 1000, (k * 997 % size) * 1000 + 30_000)
+        range_us = (time.perf_counter() - t0) * 1e6 / 1000
+
+        t0 = time.perf_counter()
+        buffer.full_text()
+        full_text_first_ms = (time.perf_counter() - t0) * 1000
+        t0 = time.perf_counter()
+        buffer.full_text()
+        full_text_cached_us = (time.perf_counter() - t0) * 1e6
+
+        results.append({
+            "name": "transcript_buffer",
+            "params": {"segments": size},
+            "metrics": {
+                "append_us_per_segment": round(append_sec * 1e6 / size, 3),
+                "read_since_us": percentiles([ns / 1000 for ns in read_ns]),
+                "get_range_us": round(range_us, 3),
+                "full_text_first_ms": round(full_text_first_ms, 3),
+                "full_text_cached_us": round(full_text_cached_us, 3),
+            },
+        })
+    return results
+
+
+def bench_save(ctx: Dict, quick: bool) -> List[Dict]:
+    """save_transcript time and output size per format."""
+    results = []
+    count = 10_000 if quick else 100_000
+    segments = [Segment(i * 1000, i * 1000 + 900, f"segment {i} of the benchmark") for i in range(count)]
+    full_text = " ".join(s.text for s in segments)
+    out_dir = ctx["tmp"] / "save"
+    for fmt in ("txt", "json", "jsonl", "srt", "vtt"):
+        start = time.perf_counter()
+        path = save_transcript(segments, full_text, "bench", datetime.now(), str(out_dir), fmt)
+        elapsed = time.perf_counter() - start
+        results.append({
+            "name": "save_transcript",
+            "params": {"format": fmt, "segments": count},
+            "metrics": {"elapsed_ms": round(elapsed * 1000, 3), "bytes": os.path.getsize(path)},
+        })
+    return results
+
+
+BENCHMARKS: Dict[str, Callable[[Dict, bool], List[Dict]]] = {
+    "chunk": bench_chunk_latency,
+    "stream": bench_first_segment,
+    "cli": bench_cli_rtf,
+    "vtt": bench_vtt,
+    "buffer": bench_buffer,
+    "save": bench_save,
+}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="WhisperLite benchmarks")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes for a fast smoke run.")
+    parser.add_argument("--only", type=str, help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--output", type=str, help="Write the JSON results here instead of stdout.")
+    args = parser.parse_args()
+
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"Error: Unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+        return 1
+
+    tmp = Path(tempfile.mkdtemp(prefix="whisperlite-bench-"))
+    try:
+        bin_dir = tmp / "bin"
+        bin_dir.mkdir()
+        model = tmp / "fake-model.bin"
+        model.write_bytes(b"\0")
+        ctx = {"tmp": tmp, "bin_dir": str(bin_dir), "bins": install_fake_binaries(bin_dir), "model": str(model)}
+
+        results = []
+        for name in selected:
+            start = time.perf_counter()
+            entries = BENCHMARKS[name](ctx, args.quick)
+            results.extend(entries)
+            print(f"{name}: {len(entries)} results in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+            for entry in entries:
+                print(f"  {entry['params']} {entry['metrics']}", file=sys.stderr)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": args.quick,
+            "fake_whisper": {
+                name: os.environ.get(name)
+                for name in ("FAKE_WHISPER_LOAD_SEC", "FAKE_WHISPER_RTF", "FAKE_WHISPER_WORDS")
+            },
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
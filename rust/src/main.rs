@@ -69,6 +69,13 @@ pub struct CommandResponse {
 
 
 
+/// Length of the PCM blocks handed to the Python transcriber, in seconds
+const TRANSPORT_BLOCK_SEC: f32 = 0.1;
+
+/// Format of the PCM piped to the Python transcriber
+const CAPTURE_SAMPLE_RATE: u32 = 16_000;
+const CAPTURE_CHANNELS: u16 = 1;
+
 /// Capture audio from microphone and send raw samples to a channel
 fn start_audio_capture(tx: Sender<Vec<i16>>, sample_rate: u32, channels: u16) -> Result<cpal::Stream> {
     let host = cpal::default_host();
@@ -88,7 +95,9 @@ fn start_audio_capture(tx: Sender<Vec<i16>>, sample_rate: u32, channels: u16) ->
     };
 
     let mut sample_buffer = Vec::<i16>::new();
-    let frames_per_chunk = (sr as f32 * 1.5) as usize * channels;
+    // Audio is forwarded in short blocks; the Python side decides (and with
+    // --adaptive-chunks, adjusts) the length of the chunks sent to whisper.cpp.
+    let frames_per_chunk = (sr as f32 * TRANSPORT_BLOCK_SEC) as usize * channels;
     let tx_clone = tx.clone();
 
     let stream = device.build_input_stream(
@@ -142,11 +151,16 @@ async fn start_transcription(model_path: String, state: State<'_, AppState>) ->
     let transcript_clone = state.transcript_buffer.clone();
     let model_path_clone = model_path.clone();
 
-    // Spawn Python subprocess
+    // Spawn Python subprocess; it reads raw PCM from stdin and prints one JSON line per segment
     let python_process = Command::new("python3")
         .arg("src/main.py")
         .arg("--model")
         .arg(model_path_clone)
+        .arg("--stdin-pcm")
+        .arg("--sample-rate")
+        .arg(CAPTURE_SAMPLE_RATE.to_string())
+        .arg("--channels")
+        .arg(CAPTURE_CHANNELS.to_string())
         .stdin(Stdio::piped())
         .stdout(Stdio::piped())
         .spawn();
@@ -175,8 +189,16 @@ async fn start_transcription(model_path: String, state: State<'_, AppState>) ->
                 let reader = BufReader::new(stdout);
                 for line in reader.lines() {
                     match line {
-                        Ok(text) => {
-                            transcript_buffer_clone.push(text);
+                        Ok(line) => {
+                            // Each line is {"start", "end", "text"}
+                            match serde_json::from_str::<serde_json::Value>(&line) {
+                                Ok(segment) => {
+                                    if let Some(text) = segment.get("text").and_then(|t| t.as_str()) {
+                                        transcript_buffer_clone.push(text.to_string());
+                                    }
+                                },
+                                Err(e) => eprintln!("Ignoring unexpected python output {:?}: {}", line, e),
+                            }
                         },
                         Err(e) => {
                             eprintln!("Failed to read from python stdout: {}", e);
@@ -189,7 +211,7 @@ async fn start_transcription(model_path: String, state: State<'_, AppState>) ->
             *state.python_process.write().take() = Some(child);
 
             // Start audio capture
-            match start_audio_capture(tx, 16_000, 1) {
+            match start_audio_capture(tx, CAPTURE_SAMPLE_RATE, CAPTURE_CHANNELS) {
                 Ok(stream) => {
                     *state.stream_handle.write().take() = Some(stream);
                     *is_recording = true;
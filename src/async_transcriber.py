@@ -0,0 +1,206 @@
+"""async_transcriber.py -- asyncio front end for one-shot whisper.cpp processes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import AsyncIterator, List, Optional, Set
+
+from audio_chunk import AudioChunk
+from metrics import METRICS
+from segments import Segment, rebase_segments
+from tracing import TRACER
+from transcriber import Chunk, VttStreamParser, WhisperTranscriber, to_source_timeline
+
+logger = logging.getLogger("AsyncTranscriber")
+
+
+class AsyncWhisperTranscriber:
+    """
+    Transcribe chunks from an event loop without a thread per call.
+
+    Each chunk runs in its own whisper.cpp process started with
+    ``asyncio.create_subprocess_exec``; at most ``concurrency`` run at once
+    and further calls wait for a slot. The WAV is piped to stdin and stdout
+    is parsed as it is printed, so :meth:`stream` yields each segment as
+    soon as whisper.cpp has decoded it.
+
+    Cancelling a call (or closing the iterator early) kills its process.
+    ``timeout`` is a deadline for the whole call, including the wait for a
+    slot: when it passes the process is killed, the error is logged and the
+    segments produced so far are kept, as with :class:`WhisperTranscriber`.
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        use_gpu: bool = False,
+        whisper_bin: Optional[str] = None,
+        language: str = "en",
+        concurrency: int = 1,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 512 * 1024 * 1024,
+    ) -> None:
+        # Binary lookup, model checks, command line and cache are shared with the blocking API
+        self._whisper = WhisperTranscriber(
+            model_path,
+            use_gpu=use_gpu,
+            whisper_bin=whisper_bin,
+            language=language,
+            cache_dir=cache_dir,
+            cache_max_bytes=cache_max_bytes,
+        )
+        self.concurrency = max(1, concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._processes: Set[asyncio.subprocess.Process] = set()
+
+    @property
+    def cache(self):
+        return self._whisper.cache
+
+    async def __aenter__(self) -> "AsyncWhisperTranscriber":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Kill any whisper.cpp processes still running."""
+        for process in list(self._processes):
+            await _kill(process)
+
+    async def transcribe(self, chunk: Chunk, timeout: float = 10.0) -> List[Segment]:
+        """Transcribe ``chunk`` and return all of its segments on the source timeline."""
+        return [segment async for segment in self.stream(chunk, timeout)]
+
+    async def stream(self, chunk: Chunk, timeout: float = 10.0) -> AsyncIterator[Segment]:
+        """Yield the segments of ``chunk`` as whisper.cpp prints them."""
+        if not isinstance(chunk, AudioChunk) and not os.path.isfile(chunk):
+            logger.error(f"Chunk not found: {chunk}")
+            return
+
+        cache, key = self.cache, None
+        if cache is not None and isinstance(chunk, AudioChunk):
+            with METRICS.time("cache.lookup"):
+                key = cache.key(chunk)
+                cached = cache.get(key)
+            if cached is not None:
+                for segment in to_source_timeline(chunk, cached):
+                    yield segment
+                return
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if self._semaphore is None:
+            # Created here so it belongs to the loop the transcriber is used from
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        self._waiting += 1
+        METRICS.depth("async.waiting", self._waiting)
+        try:
+            with METRICS.time("async.wait"):
+                await asyncio.wait_for(self._semaphore.acquire(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            logger.error("Timed out waiting for a free whisper.cpp slot.")
+            return
+        finally:
+            self._waiting -= 1
+
+        segments: List[Segment] = []
+        run = self._run(chunk, deadline)
+        try:
+            async for segment in run:
+                segments.append(segment)
+                yield segment
+        finally:
+            # Kill the process now if the caller stopped early, not when ``run`` is collected
+            await run.aclose()
+            self._semaphore.release()
+
+        # Empty output is not cached: it may come from a timeout or a crash
+        if key is not None and segments:
+            cache.put(key, rebase_segments(segments, -chunk.offset_ms))
+
+    async def _run(self, chunk: Chunk, deadline: float) -> AsyncIterator[Segment]:
+        loop = asyncio.get_running_loop()
+        if isinstance(chunk, AudioChunk):
+            TRACER.mark(chunk.trace, "inference_start")
+        with METRICS.time("wav.encode"):
+            wav_bytes = chunk.to_wav_bytes() if isinstance(chunk, AudioChunk) else None
+        cmd = self._whisper.build_command("-" if wav_bytes is not None else chunk)
+        logger.debug(f"Running: {' '.join(cmd)}")
+
+        try:
+            with METRICS.time("whisper.spawn"):
+                process = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.PIPE if wav_bytes is not None else asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+        except Exception as ex:
+            logger.exception(f"Failed to invoke whisper.cpp: {ex}")
+            return
+        self._processes.add(process)
+
+        helpers = [asyncio.ensure_future(process.stderr.read())]
+        if wav_bytes is not None:
+            helpers.append(asyncio.ensure_future(_write_and_close(process.stdin, wav_bytes)))
+        parser = VttStreamParser()
+        parsed = 0
+        try:
+            with METRICS.time("whisper.inference"):
+                while True:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError
+                    line = await asyncio.wait_for(process.stdout.readline(), remaining)
+                    if not line:
+                        break
+                    for segment in parser.feed_line(line.decode("utf-8", errors="replace")):
+                        parsed += 1
+                        yield to_source_timeline(chunk, [segment], mark=False)[0]
+                for segment in parser.close():
+                    parsed += 1
+                    yield to_source_timeline(chunk, [segment], mark=False)[0]
+                await asyncio.wait_for(process.wait(), max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            logger.error("whisper.cpp process timed out.")
+        finally:
+            # Also reached on cancellation and when the caller stops iterating early
+            await _kill(process)
+            self._processes.discard(process)
+            for helper in helpers[1:]:
+                helper.cancel()
+            try:
+                # The pipe closes with the process, so this returns promptly
+                stderr = await asyncio.wait_for(helpers[0], 1.0)
+            except (asyncio.TimeoutError, OSError):
+                stderr = b""
+            for line in stderr.decode("utf-8", errors="replace").splitlines():
+                logger.error(f"whisper.cpp stderr: {line.strip()}")
+
+        if not parsed:
+            logger.warning("No segments parsed from whisper.cpp output.")
+        if isinstance(chunk, AudioChunk):
+            TRACER.mark(chunk.trace, "transcribed")
+
+
+async def _write_and_close(pipe: asyncio.StreamWriter, data: bytes) -> None:
+    try:
+        pipe.write(data)
+        await pipe.drain()
+        pipe.close()
+    except (BrokenPipeError, ConnectionResetError):
+        pass  # the process exited (or was killed) before reading all of its input
+
+
+async def _kill(process: asyncio.subprocess.Process) -> None:
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+    await process.wait()
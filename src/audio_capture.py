@@ -3,7 +3,7 @@ audio_capture.py — WhisperLite
 Captures real-time microphone input, slices it into precise audio chunks, and prepares for streaming STT.
 
 - Uses sounddevice for cross-platform streaming
-- Buffers output as .wav for whisper.cpp
+- Buffers output as .wav for whisper.cpp, or hands PCM over in memory
 - No internet, telemetry, or cloud
 """
 
@@ -14,6 +14,12 @@ import queue
 import logging
 import time
 import wave
+
+from audio_chunk import AudioChunk
+from chunk_queue import BLOCK, ChunkQueue
+from metrics import METRICS
+from tracing import ChunkTrace
+
 try:
     import sounddevice as sd
 except Exception as exc:  # ModuleImport or portaudio missing
@@ -33,29 +39,45 @@ class AudioCapture:
         sample_rate=16000,
         channels=1,
         dtype='int16',
-        output_dir="chunks"
+        output_dir="chunks",
+        in_memory=False,
+        vad=None,
+        hop_sec=None,
+        queue_size=0,
+        overflow=BLOCK
     ):
         self.chunk_duration_sec = chunk_duration_sec
         self.sample_rate = sample_rate
         self.channels = channels
         self.dtype = dtype
         self.frames_per_chunk = int(self.sample_rate * self.chunk_duration_sec)
+        # Hop between window starts; shorter than the window means overlapping chunks
+        hop_frames = int(self.sample_rate * hop_sec) if hop_sec else self.frames_per_chunk
+        self.frames_per_hop = min(max(1, hop_frames), self.frames_per_chunk)
+        self.overlap_frames = self.frames_per_chunk - self.frames_per_hop
+        self.in_memory = in_memory
+        self.vad = vad  # Optional VoiceActivityDetector; silent chunks are dropped
         self.device_info = None
 
         # Internal state
         self._chunk_counter = 0
-        self._audio_queue = queue.Queue()
+        self._frames_emitted = 0
+        # Bounded hand-off to the transcription thread; see ChunkQueue for the overflow policies
+        self._audio_queue = ChunkQueue(
+            queue_size, overflow, chunk_sec=self.frames_per_hop / self.sample_rate
+        )
         self._stream = None
         self._stop_event = threading.Event()
         self._buffer = bytearray()
         self._last_chunk_path = None
         self._lock = threading.Lock()
 
-        # Output location
+        # Output location (unused when chunks stay in memory)
         self.chunks_dir = os.path.join(
             os.path.dirname(os.path.abspath(__file__)), output_dir
         )
-        os.makedirs(self.chunks_dir, exist_ok=True)
+        if not self.in_memory:
+            os.makedirs(self.chunks_dir, exist_ok=True)
 
         # Logging setup
         logging.basicConfig(
@@ -85,7 +107,7 @@ class AudioCapture:
         filename = f"chunk_{chunk_idx:03d}.wav"
         filepath = os.path.join(self.chunks_dir, filename)
         try:
-            with wave.open(filepath, 'wb') as wf:
+            with METRICS.time("capture.wav_write"), wave.open(filepath, 'wb') as wf:
                 wf.setnchannels(self.channels)
                 wf.setsampwidth(2)
                 wf.setframerate(self.sample_rate)
@@ -97,6 +119,20 @@ class AudioCapture:
         except Exception as e:
             self.logger.error(f"Failed to write {filepath}: {e}")
 
+    def set_chunk_duration(self, seconds):
+        """Change the length of the next chunks, keeping the window overlap."""
+        frames = max(self.overlap_frames + 1, int(self.sample_rate * seconds))
+        with self._lock:
+            self.chunk_duration_sec = frames / self.sample_rate
+            self.frames_per_chunk = frames
+            self.frames_per_hop = frames - self.overlap_frames
+        self._audio_queue.chunk_sec = self.frames_per_hop / self.sample_rate
+
+    def _queue_memory_chunk(self, chunk):
+        """Place an in-memory AudioChunk on the chunk queue."""
+        self._audio_queue.put(chunk)
+        self.logger.debug(f"Chunk {chunk.index:03d} queued in memory")
+
     def _callback(self, indata, frames, time_info, status):
         """Sounddevice stream callback: buffers and slices audio."""
         if status:
@@ -105,16 +141,47 @@ class AudioCapture:
         if self._stop_event.is_set():
             raise sd.CallbackStop
 
+        with METRICS.time("capture.callback"):
+            self._slice(indata)
+
+    def _slice(self, indata):
+        """Append a block of input and emit every full chunk it completes."""
+        now = time.monotonic()
         self._buffer.extend(indata.tobytes())
         bytes_per_sample = 2
-        bytes_per_chunk = self.frames_per_chunk * self.channels * bytes_per_sample
+        with self._lock:
+            frames_per_chunk, frames_per_hop = self.frames_per_chunk, self.frames_per_hop
+        bytes_per_chunk = frames_per_chunk * self.channels * bytes_per_sample
+        bytes_per_hop = frames_per_hop * self.channels * bytes_per_sample
 
-        # Write full-sized chunks from the buffer
+        # Write full-sized chunks from the buffer, keeping any overlap for the next one
         while len(self._buffer) >= bytes_per_chunk:
-            chunk_bytes = self._buffer[:bytes_per_chunk]
-            del self._buffer[:bytes_per_chunk]
+            chunk_bytes = bytes(self._buffer[:bytes_per_chunk])
+            # The chunk's last sample was captured before everything buffered after it
+            frames_after = (len(self._buffer) - bytes_per_chunk) // (self.channels * bytes_per_sample)
+            del self._buffer[:bytes_per_hop]
             self._chunk_counter += 1
-            self._write_wav_file(chunk_bytes, self._chunk_counter)
+            chunk = AudioChunk(
+                self._chunk_counter, chunk_bytes, self.sample_rate, self.channels,
+                offset_ms=self._frames_emitted * 1000 // self.sample_rate,
+                trace=ChunkTrace(self._chunk_counter, now - frames_after / self.sample_rate),
+            )
+            self._frames_emitted += frames_per_hop
+            METRICS.add("audio_seconds", frames_per_hop / self.sample_rate)
+
+            if self.vad is not None:
+                with METRICS.time("capture.vad"):
+                    voiced = self.vad.process(chunk)
+                if voiced is None:
+                    continue
+                # Only in-memory chunks carry an offset, so only they are trimmed
+                if self.in_memory:
+                    chunk = voiced
+
+            if self.in_memory:
+                self._queue_memory_chunk(chunk)
+            else:
+                self._write_wav_file(chunk.pcm, chunk.index)
 
     def start(self):
         """Start capturing audio, spawn sounddevice stream."""
@@ -126,7 +193,9 @@ class AudioCapture:
             return
         try:
             self._stop_event.clear()
-            self._chunk_counter = 0
+            self._audio_queue.reopen()
+            # Keep the chunk counter running so a restart never reuses the
+            # name of a chunk file that may still be waiting in the queue.
             self._buffer = bytearray()
             self._stream = sd.InputStream(
                 samplerate=self.sample_rate,
@@ -145,6 +214,8 @@ class AudioCapture:
     def stop(self):
         """Stop audio stream and release device."""
         self._stop_event.set()
+        # A callback blocked on a full queue must return before the stream can stop
+        self._audio_queue.close()
         if self._stream:
             try:
                 self._stream.stop()
@@ -159,8 +230,18 @@ class AudioCapture:
         with self._lock:
             return self._last_chunk_path
 
+    @property
+    def pending_chunks(self):
+        """Number of chunks waiting to be picked up for transcription."""
+        return self._audio_queue.qsize()
+
+    @property
+    def queue_stats(self):
+        """Overload counters of the chunk queue (drops, coalesced chunks, max depth)."""
+        return self._audio_queue.stats
+
     def get_chunk(self, block=True, timeout=None):
-        """Retrieve the next chunk file path from the queue."""
+        """Retrieve the next chunk (file path, or AudioChunk when in memory) from the queue."""
         try:
             return self._audio_queue.get(block=block, timeout=timeout)
         except queue.Empty:
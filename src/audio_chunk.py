@@ -0,0 +1,46 @@
+"""audio_chunk.py -- In-memory audio chunks handed from capture to transcription."""
+
+from __future__ import annotations
+
+import io
+import wave
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from tracing import ChunkTrace
+
+
+@dataclass
+class AudioChunk:
+    """A slice of interleaved little-endian int16 PCM kept entirely in memory.
+
+    ``offset_ms`` is where the chunk starts on its source's timeline; segment
+    times produced for the chunk are shifted by it. ``trace`` carries the
+    chunk's capture time to the segments transcribed from it.
+    """
+
+    index: int
+    pcm: bytes
+    sample_rate: int = 16000
+    channels: int = 1
+    offset_ms: int = 0
+    trace: Optional["ChunkTrace"] = None
+
+    @property
+    def num_frames(self) -> int:
+        return len(self.pcm) // (2 * self.channels)
+
+    @property
+    def duration_sec(self) -> float:
+        return self.num_frames / float(self.sample_rate)
+
+    def to_wav_bytes(self) -> bytes:
+        """Wrap the PCM in a WAV header without touching the filesystem."""
+        out = io.BytesIO()
+        with wave.open(out, "wb") as wf:
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)
+            wf.setframerate(self.sample_rate)
+            wf.writeframes(self.pcm)
+        return out.getvalue()
@@ -0,0 +1,215 @@
+"""batch.py -- Resumable batch transcription of many audio files in one process."""
+
+from __future__ import annotations
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from file_transcriber import transcribe_file
+from output_writer import save_transcript
+
+logger = logging.getLogger("Batch")
+
+AUDIO_EXTENSIONS = {".wav", ".flac", ".ogg", ".mp3", ".aiff", ".aif", ".au"}
+LEDGER_FILENAME = ".whisperlite_batch.jsonl"
+SUMMARY_FILENAME = "batch_summary.json"
+
+
+def discover_inputs(spec: str) -> List[str]:
+    """
+    Resolve a batch spec into a sorted list of audio file paths.
+    ``spec`` may be a directory (its audio files), a glob pattern, or a
+    manifest file listing one path per line (``#`` starts a comment;
+    relative paths are resolved against the manifest's directory).
+    """
+    if os.path.isdir(spec):
+        paths = [
+            os.path.join(spec, name) for name in os.listdir(spec)
+            if os.path.splitext(name)[1].lower() in AUDIO_EXTENSIONS
+        ]
+    elif os.path.isfile(spec):
+        base = os.path.dirname(os.path.abspath(spec))
+        paths = []
+        with open(spec, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.split("#", 1)[0].strip()
+                if line:
+                    paths.append(line if os.path.isabs(line) else os.path.join(base, line))
+    else:
+        paths = glob.glob(spec, recursive=True)
+        if not paths:
+            raise FileNotFoundError(f"No inputs match batch spec: {spec}")
+    return sorted({os.path.abspath(p) for p in paths if not os.path.isdir(p)})
+
+
+def _output_names(inputs: List[str], extension: str) -> Dict[str, str]:
+    """Map each input to a stable output filename, disambiguating repeated stems."""
+    names: Dict[str, str] = {}
+    seen: Dict[str, int] = {}
+    for path in inputs:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        count = seen.get(stem, 0)
+        seen[stem] = count + 1
+        names[path] = f"{stem}.{extension}" if count == 0 else f"{stem}_{count}.{extension}"
+    return names
+
+
+class JobLedger:
+    """
+    Append-only JSON Lines record of finished files.
+    A file counts as done only if it succeeded and its size and mtime are
+    unchanged, so edited recordings are transcribed again on the next run.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._records: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # A torn final line from an interrupted run
+                        continue
+                    self._records[record["input"]] = record
+
+    @staticmethod
+    def fingerprint(path: str) -> Dict:
+        stat = os.stat(path)
+        return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+    def is_done(self, path: str) -> bool:
+        record = self._records.get(path)
+        if not record or record.get("status") != "ok":
+            return False
+        if not os.path.exists(record.get("output", "")):
+            return False
+        try:
+            return record.get("fingerprint") == self.fingerprint(path)
+        except OSError:
+            return False
+
+    def get(self, path: str) -> Optional[Dict]:
+        return self._records.get(path)
+
+    def record(self, entry: Dict) -> None:
+        with self._lock:
+            self._records[entry["input"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def _transcribe_one(path: str, output_name: str, transcriber, output_dir: str,
+                    file_format: str, username: str, make_vad: Optional[Callable] = None,
+                    window_sec: float = 1.5, hop_sec: Optional[float] = None) -> Dict:
+    entry = {"input": path, "output": None, "status": "failed",
+             "audio_sec": 0.0, "elapsed_sec": 0.0, "rtf": None, "error": None}
+    started = time.monotonic()
+    try:
+        entry["fingerprint"] = JobLedger.fingerprint(path)
+        result = transcribe_file(
+            path, transcriber, chunk_sec=window_sec,
+            vad=make_vad() if make_vad else None, hop_sec=hop_sec, priority="batch",
+        )
+        full_text = " ".join(s["text"] for s in result.segments)
+        entry["output"] = save_transcript(
+            segments=result.segments,
+            full_text=full_text,
+            username=username,
+            timestamp=datetime.now(),
+            output_dir=output_dir,
+            file_format=file_format,
+            output_filename=output_name,
+        )
+        entry["audio_sec"] = round(result.duration_sec, 3)
+        entry["failed_chunks"] = result.failed_chunks
+        entry["vad_skipped_sec"] = round(result.skipped_sec, 3)
+        entry["status"] = "ok"
+    except Exception as exc:
+        logger.error(f"Batch item failed: {path}: {exc}")
+        entry["error"] = str(exc)
+    entry["elapsed_sec"] = round(time.monotonic() - started, 3)
+    if entry["audio_sec"]:
+        entry["rtf"] = round(entry["elapsed_sec"] / entry["audio_sec"], 4)
+    return entry
+
+
+def run_batch(
+    inputs: List[str],
+    transcriber,
+    output_dir: str,
+    file_format: str,
+    username: str,
+    ledger_path: Optional[str] = None,
+    make_vad: Optional[Callable] = None,
+    window_sec: float = 1.5,
+    hop_sec: Optional[float] = None,
+) -> Dict:
+    """
+    Transcribe every input through one shared ``transcriber`` and write each
+    transcript with :func:`save_transcript`.
+
+    Files already marked done in the ledger are skipped. Several files are
+    in progress at once so the transcriber's worker pool stays busy across
+    file boundaries. Returns the summary that is also written to
+    ``batch_summary.json`` in ``output_dir``. ``make_vad`` builds a fresh
+    voice-activity detector for each file; ``window_sec``/``hop_sec`` set
+    the (optionally overlapping) chunk windows.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    ledger = JobLedger(ledger_path or os.path.join(output_dir, LEDGER_FILENAME))
+    names = _output_names(inputs, file_format)
+
+    entries: Dict[str, Dict] = {}
+    todo = []
+    for path in inputs:
+        if ledger.is_done(path):
+            entries[path] = dict(ledger.get(path), status="skipped")
+        else:
+            todo.append(path)
+    logger.info(f"Batch: {len(todo)} to transcribe, {len(inputs) - len(todo)} already done")
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, transcriber.concurrency)) as executor:
+        futures = [
+            executor.submit(_transcribe_one, path, names[path], transcriber,
+                            output_dir, file_format, username, make_vad,
+                            window_sec, hop_sec)
+            for path in todo
+        ]
+        # Record each file as soon as it finishes so an interrupted run loses little
+        for future in as_completed(futures):
+            entry = future.result()
+            ledger.record(entry)
+            entries[entry["input"]] = entry
+
+    files = [entries[path] for path in inputs]
+    done = [e for e in files if e["status"] == "ok"]
+    audio_sec = sum(e["audio_sec"] for e in done)
+    elapsed_sec = time.monotonic() - started
+    summary = {
+        "files": files,
+        "totals": {
+            "inputs": len(files),
+            "transcribed": len(done),
+            "skipped": sum(1 for e in files if e["status"] == "skipped"),
+            "failed": sum(1 for e in files if e["status"] == "failed"),
+            "audio_sec": round(audio_sec, 3),
+            "elapsed_sec": round(elapsed_sec, 3),
+            "rtf": round(elapsed_sec / audio_sec, 4) if audio_sec else None,
+        },
+    }
+    with open(os.path.join(output_dir, SUMMARY_FILENAME), "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=4, ensure_ascii=False)
+    return summary
@@ -0,0 +1,136 @@
+"""chunk_controller.py -- Adapt live chunk length to the measured cost of transcription."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import Optional
+
+logger = logging.getLogger("ChunkController")
+
+
+class ChunkController:
+    """
+    Choose the live chunk duration from how long chunks take to transcribe.
+
+    Each finished chunk is reported with :meth:`record`. Processing time is
+    modelled as ``overhead + rtf * audio_sec`` (process start and model
+    setup plus per-second inference), fitted by exponentially weighted least
+    squares so the estimate follows changes in load. With ``concurrency``
+    chunks in flight, a chunk of length ``L`` keeps up with real time at
+    ``target_load`` utilisation when::
+
+        overhead + rtf * L <= concurrency * target_load * L
+
+    The controller picks the shortest ``L`` that satisfies this (shorter
+    chunks mean lower latency), within ``[min_sec, max_sec]``. When it
+    cannot be satisfied, or a backlog builds up anyway, it moves towards
+    longer chunks, which spend less of each second on overhead. Each step
+    changes the duration by at most ``max_step`` (a fraction) to avoid
+    oscillation.
+    """
+
+    def __init__(
+        self,
+        initial_sec: float = 1.5,
+        min_sec: float = 1.0,
+        max_sec: float = 8.0,
+        concurrency: int = 1,
+        target_load: float = 0.8,
+        smoothing: float = 0.2,
+        max_step: float = 0.25,
+    ) -> None:
+        if not 0 < min_sec <= max_sec:
+            raise ValueError("Chunk duration bounds must satisfy 0 < min_sec <= max_sec")
+        self.min_sec = min_sec
+        self.max_sec = max_sec
+        self.concurrency = max(1, concurrency)
+        self.target_load = target_load
+        self.smoothing = smoothing
+        self.max_step = max_step
+        self._duration = min(max(initial_sec, min_sec), max_sec)
+        self._lock = threading.Lock()
+
+        # Exponentially weighted moments of (audio_sec, elapsed_sec)
+        self._n = 0
+        self._mean_x = 0.0
+        self._mean_y = 0.0
+        self._var_x = 0.0
+        self._cov_xy = 0.0
+        self.shortest_sec = self._duration
+        self.longest_sec = self._duration
+
+    @property
+    def duration_sec(self) -> float:
+        """The chunk duration to use for the next chunk."""
+        with self._lock:
+            return self._duration
+
+    def record(self, audio_sec: float, elapsed_sec: float) -> None:
+        """Report that ``audio_sec`` of audio took ``elapsed_sec`` to transcribe."""
+        if audio_sec <= 0 or elapsed_sec < 0:
+            return
+        with self._lock:
+            self._n += 1
+            a = 1.0 if self._n == 1 else max(self.smoothing, 1.0 / self._n)
+            dx = audio_sec - self._mean_x
+            dy = elapsed_sec - self._mean_y
+            self._mean_x += a * dx
+            self._mean_y += a * dy
+            self._var_x = (1 - a) * (self._var_x + a * dx * dx)
+            self._cov_xy = (1 - a) * (self._cov_xy + a * dx * dy)
+
+    def _model(self):
+        if not self._n:
+            return None
+        # Without enough spread in chunk lengths, attribute everything to per-second cost
+        if self._var_x > 1e-3 * max(self._mean_x, 1e-9) ** 2:
+            rtf = max(0.0, self._cov_xy / self._var_x)
+            overhead = max(0.0, self._mean_y - rtf * self._mean_x)
+        else:
+            rtf, overhead = self._mean_y / self._mean_x, 0.0
+        return overhead, rtf
+
+    @property
+    def estimate(self) -> Optional[tuple]:
+        """``(overhead_sec, rtf)`` of the fitted cost model, or None before any data."""
+        with self._lock:
+            return self._model()
+
+    def update(self, backlog: int = 0) -> float:
+        """Recompute the chunk duration; ``backlog`` is how many chunks are waiting."""
+        with self._lock:
+            model = self._model()
+            if model is None:
+                return self._duration
+            overhead, rtf = model
+            capacity = self.concurrency * self.target_load
+            if rtf >= capacity:
+                target = self.max_sec
+            else:
+                target = overhead / (capacity - rtf)
+            if backlog > 1:
+                # Falling behind despite the model: trade latency for throughput
+                target = max(target, self._duration * (1 + self.max_step))
+
+            low = self._duration * (1 - self.max_step)
+            high = self._duration * (1 + self.max_step)
+            new = min(max(target, low, self.min_sec), high, self.max_sec)
+            new = round(new, 2)
+            if new != self._duration:
+                logger.debug(
+                    f"Chunk duration {self._duration:.2f}s -> {new:.2f}s "
+                    f"(overhead {overhead:.3f}s, RTF {rtf:.3f}, backlog {backlog})"
+                )
+                self._duration = new
+                self.shortest_sec = min(self.shortest_sec, new)
+                self.longest_sec = max(self.longest_sec, new)
+            return self._duration
+
+    def summary(self) -> str:
+        model = self.estimate
+        fitted = f", overhead {model[0]:.2f}s, RTF {model[1]:.2f}" if model else ""
+        return (
+            f"Adaptive chunks: {self.shortest_sec:.2f}-{self.longest_sec:.2f}s "
+            f"(final {self.duration_sec:.2f}s{fitted})"
+        )
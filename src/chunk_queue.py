@@ -0,0 +1,183 @@
+"""chunk_queue.py -- Bounded hand-off of captured chunks with explicit overload policies."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Optional
+
+from audio_chunk import AudioChunk
+from metrics import METRICS
+
+logger = logging.getLogger("ChunkQueue")
+
+BLOCK = "block"
+DROP_OLDEST = "drop-oldest"
+COALESCE = "coalesce"
+SKIP_TO_LIVE = "skip-to-live"
+POLICIES = (BLOCK, DROP_OLDEST, COALESCE, SKIP_TO_LIVE)
+
+
+@dataclass
+class QueueStats:
+    """Running totals of what the queue did under overload."""
+
+    chunks_in: int = 0
+    chunks_dropped: int = 0
+    dropped_sec: float = 0.0
+    chunks_coalesced: int = 0
+    max_depth: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Audio queue: {self.chunks_dropped}/{self.chunks_in} chunks dropped "
+            f"({self.dropped_sec:.1f}s audio), {self.chunks_coalesced} coalesced, max depth {self.max_depth}"
+        )
+
+
+def _mergeable(first: Any, second: Any, max_sec: float) -> bool:
+    if not (isinstance(first, AudioChunk) and isinstance(second, AudioChunk)):
+        return False
+    if (first.sample_rate, first.channels) != (second.sample_rate, second.channels):
+        return False
+    first_end_ms = first.offset_ms + first.num_frames * 1000 // first.sample_rate
+    # A gap means audio in between was dropped (e.g. silence removed by VAD)
+    if second.offset_ms > first_end_ms + 1:
+        return False
+    return second.offset_ms + second.duration_sec * 1000 - first.offset_ms <= max_sec * 1000
+
+
+def coalesce_chunks(first: AudioChunk, second: AudioChunk) -> AudioChunk:
+    """Join two contiguous or overlapping chunks into one, dropping the overlap once."""
+    first_end_ms = first.offset_ms + first.num_frames * 1000 // first.sample_rate
+    overlap_frames = max(0, (first_end_ms - second.offset_ms) * second.sample_rate // 1000)
+    overlap_bytes = min(overlap_frames * 2 * second.channels, len(second.pcm))
+    return AudioChunk(
+        second.index,
+        bytes(first.pcm) + bytes(second.pcm[overlap_bytes:]),
+        first.sample_rate,
+        first.channels,
+        first.offset_ms,
+        # The merged chunk is complete when its last sample is, like ``second``
+        second.trace,
+    )
+
+
+class ChunkQueue:
+    """
+    FIFO of captured chunks with at most ``maxsize`` entries (0 = unbounded).
+
+    What :meth:`put` does when the queue is full depends on ``policy``:
+
+    - ``block``: wait for the consumer to make room (no audio is lost, but
+      the producer stalls; for a microphone that means overruns in the
+      audio driver).
+    - ``drop-oldest``: discard the oldest queued chunk.
+    - ``coalesce``: merge the two oldest queued chunks into one longer chunk
+      (at most ``max_coalesce_sec``), so whisper.cpp pays its fixed cost
+      once for both. Falls back to ``drop-oldest`` when nothing can be
+      merged (file-path chunks, gaps, or the size cap).
+    - ``skip-to-live``: discard the whole backlog and keep only the new chunk.
+
+    :meth:`get` and :meth:`qsize` behave like ``queue.Queue``.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 0,
+        policy: str = BLOCK,
+        max_coalesce_sec: float = 30.0,
+        chunk_sec: float = 0.0,
+    ) -> None:
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy {policy!r}; expected one of {', '.join(POLICIES)}")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.max_coalesce_sec = max_coalesce_sec
+        self.chunk_sec = chunk_sec  # duration assumed for chunks given as file paths
+        self.stats = QueueStats()
+        self._items: Deque[Any] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _duration(self, chunk: Any) -> float:
+        return chunk.duration_sec if isinstance(chunk, AudioChunk) else self.chunk_sec
+
+    def _drop(self, chunk: Any) -> None:
+        seconds = self._duration(chunk)
+        if not self.stats.chunks_dropped:
+            logger.warning(f"Transcription is falling behind; dropping queued audio ({self.policy})")
+        self.stats.chunks_dropped += 1
+        self.stats.dropped_sec += seconds
+        METRICS.add("capture.dropped_chunks")
+        METRICS.add("capture.dropped_seconds", seconds)
+
+    def _make_room(self) -> None:
+        if self.policy == SKIP_TO_LIVE:
+            while self._items:
+                self._drop(self._items.popleft())
+            return
+        if self.policy == COALESCE:
+            for i in range(len(self._items) - 1):
+                first, second = self._items[i], self._items[i + 1]
+                if _mergeable(first, second, self.max_coalesce_sec):
+                    self._items[i] = coalesce_chunks(first, second)
+                    del self._items[i + 1]
+                    self.stats.chunks_coalesced += 1
+                    METRICS.add("capture.coalesced_chunks")
+                    return
+        self._drop(self._items.popleft())
+
+    def put(self, chunk: Any, timeout: Optional[float] = None) -> None:
+        """Queue ``chunk``, applying the overflow policy if the queue is full."""
+        with self._cond:
+            self.stats.chunks_in += 1
+            if self.maxsize > 0 and len(self._items) >= self.maxsize:
+                if self.policy == BLOCK:
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    while len(self._items) >= self.maxsize and not self._closed:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            raise queue.Full
+                        self._cond.wait(remaining)
+                else:
+                    self._make_room()
+            self._items.append(chunk)
+            depth = len(self._items)
+            self.stats.max_depth = max(self.stats.max_depth, depth)
+            self._cond.notify_all()
+        METRICS.depth("capture.queue", depth)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Remove and return the oldest chunk; raises ``queue.Empty`` when none arrives."""
+        with self._cond:
+            if block:
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while not self._items:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+            if not self._items:
+                raise queue.Empty
+            chunk = self._items.popleft()
+            self._cond.notify_all()
+            return chunk
+
+    def qsize(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+    def close(self) -> None:
+        """Release producers blocked in :meth:`put`; they enqueue past the limit."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def reopen(self) -> None:
+        with self._cond:
+            self._closed = False
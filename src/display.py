@@ -5,16 +5,33 @@ from __future__ import annotations
 import tkinter as tk
 from typing import Callable, Optional
 
+from tracing import TRACER
 from transcript_buffer import TranscriptBuffer
 
 
 class DisplayWindow:
-    """Floating window that displays the rolling transcript."""
-
-    def __init__(self, on_stop: Callable[[], None], refresh_ms: int = 500) -> None:
+    """
+    Floating window that displays the rolling transcript.
+
+    New segments are read from the buffer with a cursor and appended to a
+    read-only ``Text`` widget, so a refresh costs the same however long the
+    session has run. The widget keeps the last ``history_chars`` characters;
+    that tail stays scrollable, and the view follows new text only while it
+    is already scrolled to the bottom.
+    """
+
+    def __init__(
+        self,
+        on_stop: Callable[[], None],
+        refresh_ms: int = 500,
+        history_chars: int = 20000,
+    ) -> None:
         self.on_stop = on_stop
         self.refresh_ms = refresh_ms
+        self.history_chars = history_chars
         self.buffer: Optional[TranscriptBuffer] = None
+        self._cursor = 0
+        self._chars = 0
 
         self.root = tk.Tk()
         self.root.title("WhisperLite")
@@ -22,31 +39,36 @@ class DisplayWindow:
         self.root.geometry("400x200")
         self.root.configure(bg="black")
 
-        self.text_var = tk.StringVar()
-        self.label = tk.Label(
-            self.root,
-            textvariable=self.text_var,
-            justify="left",
-            bg="black",
-            fg="white",
-            wraplength=380,
-            anchor="nw",
-        )
-        self.label.pack(fill="both", expand=True, padx=4, pady=4)
-
         bottom = tk.Frame(self.root, bg="black")
-        bottom.pack(fill="x")
+        bottom.pack(side="bottom", fill="x")
         self.status_canvas = tk.Canvas(bottom, width=12, height=12, highlightthickness=0, bg="black")
         self.status_indicator = self.status_canvas.create_oval(2, 2, 10, 10, fill="red")
         self.status_canvas.pack(side="left", padx=4, pady=4)
         self.stop_button = tk.Button(bottom, text="Stop", command=self.stop)
         self.stop_button.pack(side="right", padx=4, pady=4)
 
+        self.scrollbar = tk.Scrollbar(self.root)
+        self.scrollbar.pack(side="right", fill="y")
+        self.text = tk.Text(
+            self.root,
+            bg="black",
+            fg="white",
+            wrap="word",
+            borderwidth=0,
+            highlightthickness=0,
+            yscrollcommand=self.scrollbar.set,
+            state="disabled",
+        )
+        self.text.pack(fill="both", expand=True, padx=4, pady=4)
+        self.scrollbar.config(command=self.text.yview)
+
         self.root.protocol("WM_DELETE_WINDOW", self.stop)
 
     def set_buffer(self, buffer: TranscriptBuffer) -> None:
         """Assign a :class:`TranscriptBuffer` to display."""
         self.buffer = buffer
+        self._cursor = 0
+        self._clear_text()
 
     def set_active(self, active: bool) -> None:
         """Update the status indicator color."""
@@ -61,10 +83,44 @@ class DisplayWindow:
     # Public for tests
     def _update_loop(self) -> None:
         if self.buffer is not None:
-            text = self.buffer.full_text()
-            self.text_var.set(text)
+            self._render(self.buffer.read_since(self._cursor))
         self.root.after(self.refresh_ms, self._update_loop)
 
+    def _render(self, delta) -> None:
+        """Append the segments in ``delta``; untouched when nothing changed."""
+        if delta.reset:
+            self._clear_text()
+        self._cursor = delta.cursor
+        text = " ".join(s.text for s in delta.segments if s.text)
+        if not text:
+            return
+        if self._chars:
+            text = " " + text
+
+        follow = self.text.yview()[1] >= 1.0
+        self.text.configure(state="normal")
+        self.text.insert("end", text)
+        self._chars += len(text)
+        excess = self._chars - self.history_chars
+        if excess > 0:
+            cut = _word_boundary(self.displayed_text(), excess)
+            self.text.delete("1.0", f"1.0 + {cut} chars")
+            self._chars -= cut
+        self.text.configure(state="disabled")
+        if follow:
+            self.text.see("end")
+        TRACER.finish_segments(delta.segments, "displayed")
+
+    def _clear_text(self) -> None:
+        self.text.configure(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.configure(state="disabled")
+        self._chars = 0
+
+    def displayed_text(self) -> str:
+        """Return the text currently held by the widget."""
+        return self.text.get("1.0", "end-1c")
+
     def stop(self) -> None:
         """Invoke stop callback and close the window."""
         self.set_active(False)
@@ -75,3 +131,13 @@ class DisplayWindow:
     def signal_stop(self) -> None:
         """Thread-safe request to stop the window."""
         self.root.after(0, self.stop)
+
+
+def _word_boundary(text: str, position: int) -> int:
+    """First index at or after ``position`` that starts a word, so trimming never splits one."""
+    if 0 < position < len(text) and not text[position - 1].isspace():
+        while position < len(text) and not text[position].isspace():
+            position += 1  # finish the word that was cut into
+    while position < len(text) and text[position].isspace():
+        position += 1
+    return position
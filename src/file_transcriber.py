@@ -0,0 +1,155 @@
+"""file_transcriber.py -- Transcribe a whole audio file through WhisperTranscriber."""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from audio_chunk import AudioChunk
+from metrics import METRICS
+from resample import TARGET_RATE, AudioConverter
+from stitcher import SegmentStitcher
+from wav_mmap import map_pcm_wav
+from worker_pool import DEFAULT_PRIORITY
+
+logger = logging.getLogger("FileTranscriber")
+
+
+@dataclass
+class FileTranscript:
+    """Segments for one input file plus the amount of audio they cover."""
+
+    segments: List[Dict] = field(default_factory=list)
+    duration_sec: float = 0.0
+    failed_chunks: int = 0
+    skipped_sec: float = 0.0
+
+
+def _collect_segments(future, result: FileTranscript) -> List[Dict]:
+    """Wait for a submitted chunk and return its segments ([] on failure)."""
+    try:
+        return future.result() or []
+    except Exception as exc:
+        logger.error(f"Failed to transcribe chunk: {exc}")
+        result.failed_chunks += 1
+        return []
+
+
+def _pcm_bytes(data: np.ndarray):
+    """Expose a block's int16 samples as bytes without copying when it is contiguous."""
+    if data.flags.c_contiguous:
+        return memoryview(data).cast("B")
+    return data.tobytes()
+
+
+def _converted_windows(
+    f, converter: AudioConverter, window: int, hop: int
+) -> Iterator[np.ndarray]:
+    """Yield ``window``-frame 16 kHz mono windows every ``hop`` frames, converting block by block."""
+    pending = np.zeros(0, dtype=np.int16)
+    emitted = False
+    read_size = max(1, window * f.samplerate // TARGET_RATE)
+    for block in f.blocks(blocksize=read_size, dtype='int16', always_2d=True):
+        pending = np.concatenate((pending, converter.process(block)))
+        while len(pending) >= window:
+            yield pending[:window]
+            pending = pending[hop:]
+            emitted = True
+    pending = np.concatenate((pending, converter.flush()))
+    while len(pending) >= window:
+        yield pending[:window]
+        pending = pending[hop:]
+        emitted = True
+    # Like SoundFile.blocks, a tail made only of already-sent overlap is skipped
+    if len(pending) > (window - hop if emitted else 0):
+        yield pending
+
+
+def transcribe_file(
+    path: str,
+    transcriber,
+    chunk_sec: float = 1.5,
+    vad=None,
+    hop_sec: Optional[float] = None,
+    priority: str = DEFAULT_PRIORITY,
+) -> FileTranscript:
+    """
+    Stream ``path`` through ``transcriber`` in ``chunk_sec`` windows.
+
+    Chunks are submitted with a bounded number in flight and collected in
+    submission order, so segments come back in timeline order with their
+    times shifted onto the file's global timeline. An optional
+    :class:`VoiceActivityDetector` drops or trims silent audio first.
+    With ``hop_sec`` shorter than ``chunk_sec`` the windows overlap and a
+    :class:`SegmentStitcher` removes words transcribed twice at the edges.
+    Input that is not 16 kHz mono is downmixed and resampled on the fly.
+    Uncompressed 16-bit WAV files are memory-mapped and chunked as views
+    into the mapping; other formats are decoded with ``soundfile``.
+    Chunks are submitted with ``priority`` (see ``worker_pool.PRIORITIES``).
+    """
+    result = FileTranscript()
+    source = map_pcm_wav(path) or sf.SoundFile(path, 'r')
+    with source as f:
+        # Whisper.cpp expects 16kHz mono audio; convert other inputs as they stream in
+        converter = AudioConverter(f.samplerate, f.channels)
+        if converter.needed:
+            logger.info(f"Converting {f.samplerate} Hz, {f.channels} channel audio to 16 kHz mono")
+            samplerate, channels = TARGET_RATE, 1
+        else:
+            samplerate, channels = f.samplerate, f.channels
+
+        chunk_size_samples = int(samplerate * chunk_sec)
+        hop_samples = int(samplerate * hop_sec) if hop_sec else chunk_size_samples
+        hop_samples = min(max(1, hop_samples), chunk_size_samples)
+        overlap = chunk_size_samples - hop_samples
+        stitcher = SegmentStitcher(overlap * 1000 // samplerate) if overlap else None
+
+        frames_read = 0
+        in_flight = deque()
+        max_in_flight = 2 * transcriber.concurrency
+
+        def collect() -> None:
+            start_ms, end_ms, future = in_flight.popleft()
+            segments = _collect_segments(future, result)
+            if stitcher is not None:
+                segments = stitcher.add(segments, start_ms, end_ms)
+            result.segments.extend(segments)
+
+        if converter.needed:
+            blocks = _converted_windows(f, converter, chunk_size_samples, hop_samples)
+        else:
+            blocks = f.blocks(blocksize=chunk_size_samples, overlap=overlap, dtype='int16')
+        for chunk_idx, data in enumerate(blocks, start=1):
+            start_frame = (chunk_idx - 1) * hop_samples
+            frames_read = start_frame + len(data)
+
+            # Hand the PCM to whisper.cpp in memory instead of via a temp file
+            chunk = AudioChunk(chunk_idx, _pcm_bytes(data), samplerate, channels,
+                               start_frame * 1000 // samplerate)
+            if vad is not None:
+                chunk = vad.process(chunk)
+                if chunk is None:
+                    continue
+
+            end_ms = chunk.offset_ms + chunk.num_frames * 1000 // samplerate
+            in_flight.append((chunk.offset_ms, end_ms, transcriber.submit(chunk, priority=priority)))
+            if METRICS.enabled:
+                METRICS.depth("file.in_flight", len(in_flight))
+            while len(in_flight) > max_in_flight:
+                collect()
+
+        while in_flight:
+            collect()
+        if stitcher is not None:
+            result.segments.extend(stitcher.flush())
+
+        result.duration_sec = frames_read / float(samplerate)
+        METRICS.add("audio_seconds", result.duration_sec)
+        if vad is not None:
+            result.skipped_sec = vad.stats.skipped_ms / 1000.0
+    return result
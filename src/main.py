@@ -10,26 +10,109 @@ import threading
 import time
 import sys
 import json
-import soundfile as sf
-import tempfile
 from datetime import datetime
 
-from audio_capture import AudioCapture
+from metrics import METRICS
+from tracing import TRACER
 from transcriber import WhisperTranscriber
 from transcript_buffer import TranscriptBuffer
-from display import DisplayWindow
-from output_writer import save_transcript
+from output_writer import open_writer, save_transcript
+from stitcher import SegmentStitcher
 from ui_controller import UIController
 
+# tkinter, sounddevice, soundfile and numpy are imported by the modes that
+# need them, so --save-transcript and --serve start without paying for them.
+
+def _make_vad(args):
+    """Build a VoiceActivityDetector from CLI flags, or None when --vad is off."""
+    if not args.vad:
+        return None
+    from vad import VoiceActivityDetector
+    return VoiceActivityDetector(threshold_db=args.vad_threshold_db, hangover_ms=args.vad_hangover_ms)
+
+def _make_priority_scheduler(args):
+    """Scheduler for modes that mix live and batch work on one worker pool."""
+    from worker_pool import PriorityScheduler
+    return PriorityScheduler(args.priority_mode, batch_limit=args.batch_workers, scheduler=args.scheduler)
+
+def _cache_kwargs(args) -> dict:
+    return {"cache_dir": args.cache_dir, "cache_max_bytes": args.cache_max_mb * 1024 * 1024}
+
+def _make_transcriber(args, scheduler=None) -> WhisperTranscriber:
+    return WhisperTranscriber(
+        args.model, language=args.language, workers=args.workers, jobs=args.jobs, scheduler=scheduler,
+        **_cache_kwargs(args)
+    )
+
+def _print_cache_stats(transcriber, file=sys.stderr) -> None:
+    if transcriber.cache is not None:
+        print(transcriber.cache.stats.summary(), file=file)
+
+def _start_stats(args) -> None:
+    if args.stats or args.stats_file:
+        METRICS.enable()
+
+def _write_stats_file(args) -> None:
+    if args.stats_file:
+        try:
+            METRICS.write(args.stats_file)
+        except OSError as exc:
+            print(f"Warning: could not write stats to {args.stats_file}: {exc}", file=sys.stderr)
+
+def _report_stats(args) -> None:
+    """Print the --stats summary and write the --stats-file snapshot, if requested."""
+    if args.stats:
+        print(METRICS.summary(), file=sys.stderr)
+    _write_stats_file(args)
+
+def _start_tracing(args) -> None:
+    if args.trace_file:
+        TRACER.enable()
+
+def _export_trace(args) -> None:
+    """Report speech-to-screen latency and write the --trace-file, if requested."""
+    if not args.trace_file:
+        return
+    print(TRACER.summary(), file=sys.stderr)
+    try:
+        TRACER.export(args.trace_file)
+        print(f"Latency trace saved to {args.trace_file}", file=sys.stderr)
+    except OSError as exc:
+        print(f"Warning: could not write trace to {args.trace_file}: {exc}", file=sys.stderr)
+
+def _make_chunk_controller(args, concurrency: int):
+    """Build a ChunkController for --adaptive-chunks, starting from --window-sec."""
+    from chunk_controller import ChunkController
+    return ChunkController(
+        initial_sec=args.window_sec,
+        min_sec=min(args.min_window_sec, args.max_window_sec),
+        max_sec=args.max_window_sec,
+        concurrency=concurrency,
+    )
+
 def launch_gui_mode(args) -> None:
+    from audio_capture import AudioCapture
+    from display import DisplayWindow
+
     buffer = TranscriptBuffer()
     ui = UIController()
 
-    display = DisplayWindow(ui.request_stop)
+    display = DisplayWindow(ui.request_stop, history_chars=args.history_chars)
     display.set_buffer(buffer)
     threading.Thread(target=display.start, daemon=True).start()
 
-    audio = AudioCapture()
+    vad = _make_vad(args)
+    hop_sec = args.hop_sec
+    if hop_sec and args.keep_chunks:
+        print("Warning: --hop-sec needs in-memory chunks; ignoring it with --keep-chunks.")
+        hop_sec = None
+    audio = AudioCapture(
+        chunk_duration_sec=args.window_sec, in_memory=not args.keep_chunks, vad=vad, hop_sec=hop_sec,
+        queue_size=args.queue_size, overflow=args.overflow,
+    )
+    stitcher = None
+    if hop_sec and hop_sec < args.window_sec:
+        stitcher = SegmentStitcher(int((args.window_sec - hop_sec) * 1000))
     try:
         audio.start()
     except Exception:
@@ -37,33 +120,110 @@ def launch_gui_mode(args) -> None:
         return
 
     try:
-        transcriber = WhisperTranscriber(args.model)
-    except FileNotFoundError as exc:
+        transcriber = WhisperTranscriber(args.model, workers=args.workers, **_cache_kwargs(args))
+    except (FileNotFoundError, RuntimeError) as exc:
         print(exc)
         audio.stop()
         return
 
+    live_writer = None
+    if args.live_output:
+        extension = os.path.splitext(args.live_output)[1].lstrip(".") or args.format
+        try:
+            live_writer = open_writer(args.live_output, extension)
+        except (ValueError, RuntimeError) as exc:
+            print(f"Warning: not writing live transcript: {exc}")
+    write_lock = threading.Lock()
+
+    def on_segments(segments) -> None:
+        if segments:
+            buffer.append(segments)
+            if live_writer is not None:
+                with write_lock, METRICS.time("output.live_write"):
+                    live_writer.write_many(segments)
+
+    def stitched(chunk):
+        start_ms = chunk.offset_ms
+        end_ms = start_ms + int(chunk.duration_sec * 1000)
+        return lambda segments: on_segments(stitcher.add(segments, start_ms, end_ms))
+
+    controller = None
+    if args.adaptive_chunks:
+        controller = _make_chunk_controller(args, transcriber.concurrency)
+
+    # Only take a chunk off the capture queue when a worker is free, so any
+    # backlog stays in the bounded queue where --overflow applies
+    slots = threading.Semaphore(transcriber.concurrency)
+
+    def releasing(callback, chunk):
+        submitted = time.monotonic()
+
+        def deliver(segments) -> None:
+            try:
+                callback(segments)
+            finally:
+                slots.release()
+                if controller is not None:
+                    audio_sec = getattr(chunk, "duration_sec", audio.chunk_duration_sec)
+                    controller.record(audio_sec, time.monotonic() - submitted)
+                    audio.set_chunk_duration(controller.update(backlog=audio.pending_chunks))
+        return deliver
+
     def capture_loop() -> None:
         while not ui.should_stop():
+            if not slots.acquire(timeout=0.1):
+                continue
             chunk = audio.get_chunk(timeout=0.1)
-            if chunk:
-                segments = transcriber.transcribe_chunk(chunk)
-                if segments:
-                    buffer.append(segments)
+            if not chunk:
+                slots.release()
+                continue
+            TRACER.mark(getattr(chunk, "trace", None), "dequeued")
+            # With a worker pool this returns immediately; segments arrive in order
+            if stitcher is not None:
+                transcriber.submit(chunk, callback=releasing(stitched(chunk), chunk), priority="live")
+            else:
+                # Show each segment as soon as whisper.cpp prints it
+                transcriber.submit(
+                    chunk,
+                    callback=releasing(lambda segments: None, chunk),
+                    on_segment=lambda segment: on_segments([segment]),
+                    priority="live",
+                )
 
-    worker = threading.Thread(target=capture_loop, daemon=True).start()
+    worker = threading.Thread(target=capture_loop, daemon=True)
+    worker.start()
 
+    next_stats_write = time.monotonic() + args.stats_interval
     try:
         while not ui.should_stop():
             time.sleep(0.1)
+            if args.stats_file and time.monotonic() >= next_stats_write:
+                _write_stats_file(args)
+                next_stats_write = time.monotonic() + args.stats_interval
     except KeyboardInterrupt:
         ui.request_stop()
 
     audio.stop()
     worker.join(timeout=1)
+    transcriber.close()
+    if stitcher is not None:
+        on_segments(stitcher.flush())
+    if live_writer is not None:
+        live_writer.close()
+        print(f"Live transcript saved to {live_writer.path}")
+    if vad is not None:
+        print(vad.stats.summary())
+    if args.queue_size:
+        print(audio.queue_stats.summary())
+    if controller is not None:
+        print(controller.summary())
+    _report_stats(args)
+    _export_trace(args)
     display.signal_stop()
 
 def cli_main(args) -> None:
+    from file_transcriber import transcribe_file
+
     # Check for mock transcription output for testing purposes
     if os.environ.get("MOCK_TRANSCRIPTION_OUTPUT") == "true":
         all_segments = [
@@ -72,8 +232,8 @@ def cli_main(args) -> None:
         ]
     else:
         try:
-            transcriber = WhisperTranscriber(args.model, language=args.language)
-        except FileNotFoundError as exc:
+            transcriber = _make_transcriber(args)
+        except (FileNotFoundError, RuntimeError) as exc:
             print(f"Error: {exc}", file=sys.stderr)
             sys.exit(1)
 
@@ -81,35 +241,19 @@ def cli_main(args) -> None:
             print(f"Error: Input file not found: {args.input}", file=sys.stderr)
             sys.exit(1)
 
-        all_segments = []
+        vad = _make_vad(args)
         try:
-            with sf.SoundFile(args.input, 'r') as f:
-                samplerate = f.samplerate
-                channels = f.channels
-                # Whisper.cpp typically expects 16kHz mono audio
-                if samplerate != 16000 or channels != 1:
-                    print("Warning: Input audio not 16kHz mono. Resampling/downmixing might be needed for optimal results.", file=sys.stderr)
-
-                # Process in 1.5 second chunks (adjust as needed)
-                chunk_size_samples = int(samplerate * 1.5)
-                
-                while True:
-                    data = f.read(frames=chunk_size_samples, dtype='int16')
-                    if not data.any():
-                        break
-
-                    # Create a temporary WAV file for the chunk
-                    with tempfile.NamedTemporaryFile(suffix=".wav", delete=True) as temp_wav_file:
-                        sf.write(temp_wav_file.name, data, samplerate)
-                        
-                        # Transcribe the chunk
-                        segments = transcriber.transcribe_chunk(temp_wav_file.name)
-                        if segments:
-                            all_segments.extend(segments)
-
+            all_segments = transcribe_file(
+                args.input, transcriber, chunk_sec=args.window_sec, vad=vad, hop_sec=args.hop_sec
+            ).segments
+            if vad is not None:
+                print(vad.stats.summary(), file=sys.stderr)
         except Exception as e:
             print(f"Error processing audio file: {e}", file=sys.stderr)
             sys.exit(1)
+        finally:
+            transcriber.close()
+        _print_cache_stats(transcriber)
 
     full_text = " ".join([s["text"] for s in all_segments])
     
@@ -121,35 +265,317 @@ def cli_main(args) -> None:
         output_filename = f"whisperlite_transcript_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{args.format}"
 
     try:
-        path = save_transcript(
-            segments=all_segments,
-            full_text=full_text,
-            username=getpass.getuser(),
-            timestamp=datetime.now(),
-            output_dir=output_dir,
-            file_format=args.format,
-            output_filename=output_filename
-        )
+        with METRICS.time("output.save"):
+            path = save_transcript(
+                segments=all_segments,
+                full_text=full_text,
+                username=getpass.getuser(),
+                timestamp=datetime.now(),
+                output_dir=output_dir,
+                file_format=args.format,
+                output_filename=output_filename
+            )
         print(f"Transcript saved to {path}")
     except Exception as e:
         print(f"Error saving transcript: {e}", file=sys.stderr)
         sys.exit(1)
+    _report_stats(args)
+
+def batch_main(args) -> None:
+    from batch import discover_inputs, run_batch
+
+    try:
+        inputs = discover_inputs(args.batch)
+    except (FileNotFoundError, OSError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+    if not inputs:
+        print(f"Error: No audio files found for batch: {args.batch}", file=sys.stderr)
+        sys.exit(1)
+
+    if not args.normal_priority:
+        # Leave the CPU and disk to live transcription running on the same machine
+        from worker_pool import lower_process_priority
+        lower_process_priority()
+
+    try:
+        transcriber = _make_transcriber(args)
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        summary = run_batch(
+            inputs,
+            transcriber,
+            output_dir=args.output_dir,
+            file_format=args.format,
+            username=getpass.getuser(),
+            ledger_path=args.ledger,
+            make_vad=(lambda: _make_vad(args)) if args.vad else None,
+            window_sec=args.window_sec,
+            hop_sec=args.hop_sec,
+        )
+    finally:
+        transcriber.close()
+    _print_cache_stats(transcriber)
+    _report_stats(args)
+
+    totals = summary["totals"]
+    for entry in summary["files"]:
+        if entry["status"] == "failed":
+            print(f"Failed: {entry['input']}: {entry['error']}", file=sys.stderr)
+    print(
+        f"Batch complete: {totals['transcribed']} transcribed, {totals['skipped']} skipped, "
+        f"{totals['failed']} failed (RTF {totals['rtf']})"
+    )
+    if totals["failed"]:
+        sys.exit(1)
+
+def stdin_pcm_main(args) -> None:
+    from pcm_stream import stream_pcm
+
+    try:
+        transcriber = _make_transcriber(args)
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    controller = _make_chunk_controller(args, transcriber.concurrency) if args.adaptive_chunks else None
+
+    # Segments own stdout; anything else printed goes to stderr
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    vad = _make_vad(args)
+    try:
+        stats = stream_pcm(
+            sys.stdin.buffer, transcriber, out,
+            sample_rate=args.sample_rate, channels=args.channels, chunk_sec=args.window_sec, vad=vad,
+            controller=controller,
+        )
+    except KeyboardInterrupt:
+        return
+    finally:
+        transcriber.close()
+    _print_cache_stats(transcriber)
+    if vad is not None:
+        print(vad.stats.summary(), file=sys.stderr)
+    if controller is not None:
+        print(controller.summary(), file=sys.stderr)
+    _report_stats(args)
+    _export_trace(args)
+    if stats.failed_chunks:
+        print(f"Failed to transcribe {stats.failed_chunks} of {stats.chunks} chunks", file=sys.stderr)
+
+def sessions_main(args) -> None:
+    from segments import as_dicts
+    from session_manager import SessionManager
+    from worker_pool import make_scheduler
+
+    try:
+        transcriber = _make_transcriber(args, scheduler=make_scheduler(args.scheduler))
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+
+    # Segments own stdout, one JSON line each tagged with its stream
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    write_lock = threading.Lock()
+
+    def on_segments(name, segments) -> None:
+        with write_lock:
+            for segment in as_dicts(segments):
+                out.write(json.dumps({"stream": name, **segment}, ensure_ascii=False) + "\n")
+            out.flush()
+
+    manager = SessionManager(
+        transcriber, chunk_sec=args.window_sec, make_vad=lambda: _make_vad(args), on_segments=on_segments
+    )
+    sources = []
+    try:
+        if args.pcm_streams:
+            for path in args.pcm_streams:
+                source = open(path, "rb")
+                sources.append(source)
+                manager.add_pcm_source(path, source, sample_rate=args.sample_rate, channels=args.channels)
+            manager.wait()
+        else:
+            manager.capture_device_channels(args.split_channels, sample_rate=args.sample_rate)
+            print(f"Transcribing {args.split_channels} channels; press Ctrl+C to stop", file=sys.stderr)
+            while True:
+                time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+    except (OSError, RuntimeError, ValueError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+    finally:
+        manager.close()
+        transcriber.close()
+        for source in sources:
+            source.close()
+    print(manager.summary(), file=sys.stderr)
+    _print_cache_stats(transcriber)
+    _report_stats(args)
+
+def serve_main(args) -> None:
+    from sidecar import SidecarServer
+
+    def make_transcriber():
+        return _make_transcriber(args, scheduler=_make_priority_scheduler(args))
+
+    server = SidecarServer(make_transcriber, output_dir=args.output_dir)
+    try:
+        if args.serve_socket:
+            server.serve_unix(args.serve_socket)
+        else:
+            # Frames own stdout; stray prints from any module go to stderr instead
+            wfile = sys.stdout.buffer
+            sys.stdout = sys.stderr
+            server.serve_stream(sys.stdin.buffer, wfile)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        _write_stats_file(args)
+
+
+def serve_http_main(args) -> None:
+    import asyncio
+    from transcription_server import ServerLimits, TranscriptionServer
+
+    try:
+        transcriber = _make_transcriber(args, scheduler=_make_priority_scheduler(args))
+    except (FileNotFoundError, RuntimeError) as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        sys.exit(1)
+    limits = ServerLimits(
+        queue_size=args.server_queue,
+        max_upload_bytes=args.max_upload_mb * 1024 * 1024,
+        max_streams=args.max_streams,
+    )
+    server = TranscriptionServer(
+        transcriber, args.serve_host, args.serve_http, limits, default_format=args.format, chunk_sec=args.window_sec
+    )
+
+    async def run() -> None:
+        await server.start()
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        transcriber.close()
+        print(server.stats.summary(), file=sys.stderr)
+        _print_cache_stats(transcriber)
+        _report_stats(args)
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="WhisperLite Transcription App")
     parser.add_argument("--model", type=str, default="models/ggml-tiny.en.bin",
                         help="Path to the Whisper model file (e.g., models/ggml-tiny.en.bin)")
-    parser.add_argument("--format", type=str, default="txt", choices=["txt", "json", "srt"],
-                        help="Output format for the transcript (txt, json, srt)")
+    parser.add_argument("--format", type=str, default="txt", choices=["txt", "json", "jsonl", "srt", "vtt"],
+                        help="Output format for the transcript (txt, json, jsonl, srt, vtt)")
     parser.add_argument("--save-transcript", action="store_true",
                         help="Run in save-transcript mode, reading JSON segments from stdin.")
     parser.add_argument("--output-dir", type=str, default=os.path.join(os.path.expanduser("~"), "Downloads"),
                         help="Directory to save the transcript file.")
     parser.add_argument("--input", type=str, help="Path to an audio file for transcription (CLI mode).")
     parser.add_argument("--output", type=str, help="Path to save the transcript (CLI mode).")
+    parser.add_argument("--batch", type=str,
+                        help="Directory, glob pattern or manifest file of audio files to transcribe into --output-dir.")
+    parser.add_argument("--normal-priority", action="store_true",
+                        help="Run --batch at normal OS priority instead of lowering its CPU and I/O priority.")
+    parser.add_argument("--ledger", type=str,
+                        help="Job ledger used to resume an interrupted batch (default: <output-dir>/.whisperlite_batch.jsonl).")
     parser.add_argument("--language", type=str, default="en", help="Language for transcription (e.g., en, es).")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Persistent whisper.cpp server workers that keep the model loaded (0 spawns one process per chunk).")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Number of chunks to transcribe in parallel in CLI mode (one whisper.cpp process each).")
+    parser.add_argument("--window-sec", type=float, default=1.5,
+                        help="Length of each audio window sent to whisper.cpp in seconds (default: 1.5).")
+    parser.add_argument("--adaptive-chunks", action="store_true",
+                        help="GUI and --stdin-pcm modes: adjust the window length at runtime from measured transcription speed, "
+                             "starting at --window-sec.")
+    parser.add_argument("--min-window-sec", type=float, default=1.0,
+                        help="Shortest window --adaptive-chunks may choose (default: 1.0).")
+    parser.add_argument("--max-window-sec", type=float, default=8.0,
+                        help="Longest window --adaptive-chunks may choose (default: 8.0).")
+    parser.add_argument("--hop-sec", type=float,
+                        help="Step between window starts; shorter than --window-sec makes windows overlap and stitches their transcripts.")
+    parser.add_argument("--vad", action="store_true",
+                        help="Skip silent audio with voice-activity detection before invoking whisper.cpp.")
+    parser.add_argument("--vad-threshold-db", type=float, default=-45.0,
+                        help="VAD speech level threshold in dBFS (default: -45).")
+    parser.add_argument("--vad-hangover-ms", type=int, default=300,
+                        help="Audio kept after speech ends before VAD treats it as silence (default: 300).")
+    parser.add_argument("--keep-chunks", action="store_true",
+                        help="Write each captured chunk to src/chunks/ as a .wav file instead of passing audio in memory.")
+    parser.add_argument("--queue-size", type=int, default=4,
+                        help="GUI mode: captured chunks allowed to wait for transcription before --overflow applies (0 = unbounded).")
+    parser.add_argument("--overflow", type=str, default="coalesce", choices=["block", "drop-oldest", "coalesce", "skip-to-live"],
+                        help="GUI mode: what to do when the chunk queue is full (default: coalesce).")
+    parser.add_argument("--history-chars", type=int, default=20000,
+                        help="Characters of transcript the overlay keeps scrollable (default: 20000).")
+    parser.add_argument("--live-output", type=str,
+                        help="GUI mode: append segments to this file as they are transcribed (format from its extension).")
+    parser.add_argument("--cache-dir", type=str,
+                        help="Reuse transcriptions of identical audio from this directory (keyed by audio, model and language).")
+    parser.add_argument("--cache-max-mb", type=int, default=512,
+                        help="Size cap of --cache-dir in MB; least recently used entries are evicted (default: 512).")
+    parser.add_argument("--stdin-pcm", action="store_true",
+                        help="Transcribe raw little-endian int16 PCM read from stdin, printing one JSON line per segment.")
+    parser.add_argument("--sample-rate", type=int, default=16000,
+                        help="Sample rate of --stdin-pcm audio (default: 16000).")
+    parser.add_argument("--channels", type=int, default=1,
+                        help="Interleaved channel count of --stdin-pcm audio (default: 1).")
+    parser.add_argument("--pcm-streams", type=str, nargs="+", metavar="FILE",
+                        help="Transcribe several raw PCM files or FIFOs at once as separate streams sharing one worker pool "
+                             "(format from --sample-rate and --channels), printing JSON lines tagged with the stream.")
+    parser.add_argument("--split-channels", type=int, metavar="N",
+                        help="Capture N channels from the input device and transcribe each as a separate stream.")
+    parser.add_argument("--scheduler", type=str, default="deficit", choices=["fifo", "round-robin", "deficit"],
+                        help="How workers are shared between streams (with --pcm-streams or --split-channels, and within "
+                             "each priority class when serving): deficit weighs by audio length, round-robin by chunk count "
+                             "(default: deficit).")
+    parser.add_argument("--priority-mode", type=str, default="strict", choices=["strict", "weighted"],
+                        help="With --serve or --serve-http, how live chunks and batch uploads share workers: strict always "
+                             "serves live work first, weighted gives batch a small share (default: strict).")
+    parser.add_argument("--batch-workers", type=int,
+                        help="With --serve or --serve-http, the most workers batch work may occupy at once (default: all).")
+    parser.add_argument("--serve", action="store_true",
+                        help="Run as a long-lived sidecar answering length-prefixed requests on stdin/stdout.")
+    parser.add_argument("--serve-socket", type=str,
+                        help="With --serve, listen on this Unix socket path instead of stdin/stdout.")
+    parser.add_argument("--serve-http", type=int, metavar="PORT",
+                        help="Serve HTTP uploads and WebSocket PCM streams on this port (0 picks a free one).")
+    parser.add_argument("--serve-host", type=str, default="127.0.0.1",
+                        help="With --serve-http, the address to listen on (default: 127.0.0.1).")
+    parser.add_argument("--server-queue", type=int, default=8,
+                        help="With --serve-http, uploads that may wait for a worker before new uploads get 503 (default: 8).")
+    parser.add_argument("--max-upload-mb", type=int, default=200,
+                        help="With --serve-http, the largest accepted upload (default: 200).")
+    parser.add_argument("--max-streams", type=int, default=4,
+                        help="With --serve-http, concurrent WebSocket streams (default: 4).")
+    parser.add_argument("--stats", action="store_true",
+                        help="Time each pipeline stage and print RTF, p50/p95/p99 latencies and queue depths to stderr at the end.")
+    parser.add_argument("--stats-file", type=str,
+                        help="Write a metrics snapshot here (Prometheus text for .prom/.txt, JSON otherwise).")
+    parser.add_argument("--stats-interval", type=float, default=10.0,
+                        help="GUI mode: seconds between rewrites of --stats-file (default: 10).")
+    parser.add_argument("--trace-file", type=str,
+                        help="GUI and --stdin-pcm modes: record per-chunk capture-to-display latency and write it here "
+                             "(Chrome trace JSON, or one line per chunk for .jsonl).")
     args = parser.parse_args()
+    _start_stats(args)
+    _start_tracing(args)
 
     if args.save_transcript:
         # This branch is for saving transcripts from Rust backend
@@ -166,7 +592,17 @@ if __name__ == "__main__":
             sys.exit(1)
         sys.exit(0)
 
-    if args.input:
+    if args.serve_http is not None:
+        serve_http_main(args)
+    elif args.serve or args.serve_socket:
+        serve_main(args)
+    elif args.pcm_streams or args.split_channels:
+        sessions_main(args)
+    elif args.stdin_pcm:
+        stdin_pcm_main(args)
+    elif args.batch:
+        batch_main(args)
+    elif args.input:
         # CLI mode
         cli_main(args)
     else:
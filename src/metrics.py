@@ -0,0 +1,249 @@
+"""metrics.py -- Per-stage pipeline timings and queue depths for WhisperLite."""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Sequence
+
+# Upper bounds in seconds; the last bucket catches everything slower
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"),
+)
+DEPTH_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 1024, float("inf"))
+
+_NULL_TIMER = nullcontext()
+
+
+class Histogram:
+    """Counts of observations in fixed buckets, plus count, sum, min and max.
+
+    Percentiles are estimated by interpolating inside the bucket that holds
+    the requested rank, clamped to the observed min and max, so the memory
+    used does not grow with the number of observations.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum", "min", "max", "_lock")
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self.bounds = tuple(bounds)
+        self.counts = [0] * len(self.bounds)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[min(idx, len(self.counts) - 1)] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Estimate the ``q``-th percentile (0-100), or None without observations."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q / 100.0 * self.count
+            seen = 0
+            for idx, n in enumerate(self.counts):
+                if n and seen + n >= rank:
+                    lower = self.bounds[idx - 1] if idx else min(0.0, self.min)
+                    upper = self.bounds[idx]
+                    lower, upper = max(lower, self.min), min(upper, self.max)
+                    return lower + (upper - lower) * max(0.0, rank - seen) / n
+                seen += n
+            return self.max
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            count, total = self.count, self.sum
+            low, high = (self.min, self.max) if count else (None, None)
+            buckets = list(zip(self.bounds, self.counts))
+        return {
+            "count": count,
+            "sum": total,
+            "min": low,
+            "max": high,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "buckets": [["+Inf" if bound == float("inf") else bound, n] for bound, n in buckets],
+        }
+
+
+class _Timer:
+    __slots__ = ("_metrics", "_stage", "_start")
+
+    def __init__(self, metrics: "Metrics", stage: str) -> None:
+        self._metrics = metrics
+        self._stage = stage
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._metrics.observe(self._stage, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """
+    Registry of stage latencies, queue depths and counters.
+
+    Disabled by default: :meth:`time` then hands back a shared no-op
+    context manager and the record methods return immediately, so the
+    instrumented code paths cost one attribute check. Stage timings use
+    ``time.perf_counter``, which is monotonic.
+    """
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stages: Dict[str, Histogram] = {}
+            self._depths: Dict[str, Histogram] = {}
+            self._counters: Dict[str, float] = {}
+            self._started = time.perf_counter()
+
+    def enable(self) -> None:
+        """Start recording; the wall clock used for the real-time factor starts now."""
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def _histogram(self, table: Dict[str, Histogram], name: str, bounds) -> Histogram:
+        hist = table.get(name)
+        if hist is None:
+            with self._lock:
+                hist = table.setdefault(name, Histogram(bounds))
+        return hist
+
+    def time(self, stage: str):
+        """Context manager that records the duration of its block under ``stage``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self._histogram(self._stages, stage, LATENCY_BUCKETS).observe(seconds)
+
+    def depth(self, queue_name: str, value: int) -> None:
+        """Record the current length of a queue."""
+        if self.enabled:
+            self._histogram(self._depths, queue_name, DEPTH_BUCKETS).observe(value)
+
+    def add(self, counter: str, amount: float = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    @property
+    def elapsed_sec(self) -> float:
+        return time.perf_counter() - self._started
+
+    def snapshot(self) -> Dict:
+        """All recorded values as a JSON-serialisable dict."""
+        with self._lock:
+            stages = dict(self._stages)
+            depths = dict(self._depths)
+            counters = dict(self._counters)
+        wall = self.elapsed_sec
+        audio = counters.get("audio_seconds", 0.0)
+        return {
+            "wall_seconds": wall,
+            "audio_seconds": audio,
+            "rtf": wall / audio if audio else None,
+            "stages": {name: hist.snapshot() for name, hist in sorted(stages.items())},
+            "queues": {name: hist.snapshot() for name, hist in sorted(depths.items())},
+            "counters": dict(sorted(counters.items())),
+        }
+
+    def to_prometheus(self) -> str:
+        """The snapshot in the Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# TYPE whisperlite_wall_seconds gauge",
+            f"whisperlite_wall_seconds {snap['wall_seconds']:.6f}",
+            "# TYPE whisperlite_audio_seconds gauge",
+            f"whisperlite_audio_seconds {snap['audio_seconds']:.6f}",
+        ]
+        for metric, label, table in (
+            ("whisperlite_stage_seconds", "stage", snap["stages"]),
+            ("whisperlite_queue_depth", "queue", snap["queues"]),
+        ):
+            if not table:
+                continue
+            lines.append(f"# TYPE {metric} histogram")
+            for name, hist in table.items():
+                cumulative = 0
+                for bound, n in hist["buckets"]:
+                    cumulative += n
+                    lines.append(f'{metric}_bucket{{{label}="{name}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{label}="{name}"}} {hist["sum"]:.6f}')
+                lines.append(f'{metric}_count{{{label}="{name}"}} {hist["count"]}')
+        for name, value in snap["counters"].items():
+            metric = "whisperlite_" + re.sub(r"[^a-zA-Z0-9_]", "_", name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Write a snapshot to ``path``: Prometheus text for ``.prom``/``.txt``, JSON otherwise."""
+        if path.endswith((".prom", ".txt")):
+            text = self.to_prometheus()
+        else:
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        # Replace atomically so a scraper never reads a half-written file
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    def summary(self) -> str:
+        """Human-readable table of the real-time factor, stage percentiles and queue depths."""
+        snap = self.snapshot()
+        lines: List[str] = []
+        if snap["rtf"] is not None:
+            lines.append(
+                f"Pipeline: {snap['audio_seconds']:.1f} s audio in {snap['wall_seconds']:.1f} s "
+                f"(RTF {snap['rtf']:.3f})"
+            )
+        else:
+            lines.append(f"Pipeline: {snap['wall_seconds']:.1f} s wall time")
+        if snap["stages"]:
+            lines.append(f"{'stage':<22}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+            for name, hist in snap["stages"].items():
+                values = [hist[k] * 1000 for k in ("p50", "p95", "p99", "max")]
+                lines.append(f"{name:<22}{hist['count']:>8}" + "".join(f"{v:>10.2f}" for v in values))
+        if snap["queues"]:
+            lines.append(f"{'queue':<22}{'samples':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+            for name, hist in snap["queues"].items():
+                values = [hist[k] for k in ("p50", "p95", "p99", "max")]
+                lines.append(f"{name:<22}{hist['count']:>8}" + "".join(f"{v:>10.1f}" for v in values))
+        return "\n".join(lines)
+
+
+# Process-wide registry used by the instrumented modules
+METRICS = Metrics()
@@ -1,33 +1,238 @@
 from __future__ import annotations
 
+import io
 import os
 import json
+import time
 from datetime import datetime
-from typing import List, Dict
-
-def _format_time_srt(time_str: str) -> str:
-    """Converts VTT time format (HH:MM:SS.mmm) to SRT time format (HH:MM:SS,mmm)."""
-    return time_str.replace('.', ',')
-
-def _format_json(segments: List[Dict]) -> str:
-    """Formats a list of segments into a JSON string."""
-    # Ensure times are in SRT-like format for consistency if needed, or keep as is
-    # For now, assuming the 'start' and 'end' from transcriber are suitable.
-    # If transcriber outputs HH:MM:SS.mmm, JSON will keep it.
-    # If SRT needs HH:MM:SS,mmm, it's handled in _format_srt.
-    return json.dumps(segments, indent=4, ensure_ascii=False)
-
-def _format_srt(segments: List[Dict]) -> str:
-    """Formats a list of segments into an SRT string."""
-    srt_content = []
-    for i, segment in enumerate(segments):
-        start_srt = _format_time_srt(segment["start"])
-        end_srt = _format_time_srt(segment["end"])
-        srt_content.append(f"{i + 1}")
-        srt_content.append(f"{start_srt} --> {end_srt}")
-        srt_content.append(segment["text"])
-        srt_content.append("") # Empty line separates entries
-    return "\n".join(srt_content)
+from typing import Any, Dict, IO, Iterable, List, Mapping, Optional, Type, Union
+
+from segments import Segment, format_timestamp
+
+SegmentLike = Union[Segment, Mapping]
+
+# Segments buffered between writes when saving a finished transcript
+SAVE_FLUSH_EVERY = 256
+
+
+class TranscriptWriter:
+    """
+    Appends segments to a transcript file as they arrive.
+
+    The file is opened once. Formatted segments are buffered and written in
+    a single call whenever ``flush_every`` segments have accumulated or
+    ``flush_interval_sec`` has passed since the last flush. With both set to
+    ``None`` everything is written in one go on :meth:`close`. Subclasses
+    supply the per-format ``_header``, ``_format`` and ``_footer``, and may
+    override ``_prepare``, which turns each incoming segment into what
+    ``_format`` receives (a :class:`Segment` by default).
+    ``path`` may also be an open text stream, which is left open on close.
+    """
+
+    extension = ""
+
+    def __init__(
+        self,
+        path: Union[str, IO[str]],
+        flush_every: Optional[int] = 1,
+        flush_interval_sec: Optional[float] = None,
+    ) -> None:
+        self.flush_every = flush_every
+        self.flush_interval_sec = flush_interval_sec
+        self.count = 0
+        self._pending: List[str] = []
+        self._pending_segments = 0
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self._owns_file = isinstance(path, str)
+        if not self._owns_file:
+            self.path = getattr(path, "name", "<stream>")
+            self._file: IO[str] = path
+        else:
+            self.path = path
+            try:
+                self._file = open(path, "w", encoding="utf-8")
+            except IOError as exc:
+                raise RuntimeError(f"Failed to write transcript to {path}: {exc}") from exc
+        self._emit(self._header())
+
+    def _header(self) -> str:
+        return ""
+
+    def _prepare(self, segment: SegmentLike) -> Any:
+        return Segment.coerce(segment)
+
+    def _format(self, segment: Segment, index: int) -> str:
+        raise NotImplementedError
+
+    def _footer(self) -> str:
+        return ""
+
+    def _emit(self, text: str) -> None:
+        if text:
+            self._pending.append(text)
+
+    def write(self, segment: SegmentLike) -> None:
+        """Append one segment, flushing if the cadence is due."""
+        self.count += 1
+        self._emit(self._format(self._prepare(segment), self.count))
+        self._pending_segments += 1
+        if self.flush_every is not None and self._pending_segments >= self.flush_every:
+            self.flush()
+        elif (self.flush_interval_sec is not None
+              and time.monotonic() - self._last_flush >= self.flush_interval_sec):
+            self.flush()
+
+    def write_many(self, segments: Iterable[SegmentLike]) -> None:
+        for segment in segments:
+            self.write(segment)
+
+    def flush(self) -> None:
+        """Write everything buffered so far and flush it to the OS."""
+        self._last_flush = time.monotonic()
+        self._pending_segments = 0
+        if not self._pending:
+            return
+        content = "".join(self._pending)
+        self._pending = []
+        try:
+            self._file.write(content)
+            self._file.flush()
+        except IOError as exc:
+            raise RuntimeError(f"Failed to write transcript to {self.path}: {exc}") from exc
+
+    def close(self) -> None:
+        """Write the format's footer and any buffered segments, then close."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._emit(self._footer())
+            self.flush()
+        finally:
+            if self._owns_file:
+                self._file.close()
+
+    def __enter__(self) -> "TranscriptWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TxtWriter(TranscriptWriter):
+    """Plain text: an optional header, then segment texts joined by spaces."""
+
+    extension = "txt"
+
+    def __init__(self, path: Union[str, IO[str]], header: str = "", **kwargs) -> None:
+        self._header_text = header
+        self._started = False
+        super().__init__(path, **kwargs)
+
+    def _header(self) -> str:
+        return self._header_text
+
+    def _format(self, segment: Segment, index: int) -> str:
+        return self._text(segment.text)
+
+    def write_text(self, text: str) -> None:
+        """Append free text that is not tied to a segment (e.g. a joined transcript)."""
+        self._emit(self._text(text))
+
+    def _text(self, text: str) -> str:
+        if not text:
+            return ""
+        separator = " " if self._started else ""
+        self._started = True
+        return separator + text
+
+
+def _json_value(segment: Any) -> Any:
+    """Segments as JSON: a :class:`Segment` as its dict, anything else (extra keys included) unchanged."""
+    return segment.to_dict() if isinstance(segment, Segment) else segment
+
+
+class JsonWriter(TranscriptWriter):
+    """A JSON array of segment objects, closed off by :meth:`close`."""
+
+    extension = "json"
+
+    def _prepare(self, segment: SegmentLike) -> Any:
+        return _json_value(segment)
+
+    def _format(self, segment: Any, index: int) -> str:
+        item = json.dumps(segment, indent=4, ensure_ascii=False)
+        item = "\n".join("    " + line for line in item.splitlines())
+        return ("[\n" if index == 1 else ",\n") + item
+
+    def _footer(self) -> str:
+        return "\n]" if self.count else "[]"
+
+
+class JsonlWriter(TranscriptWriter):
+    """One JSON object per line; every flushed line is complete on its own."""
+
+    extension = "jsonl"
+
+    def _prepare(self, segment: SegmentLike) -> Any:
+        return _json_value(segment)
+
+    def _format(self, segment: Any, index: int) -> str:
+        return json.dumps(segment, ensure_ascii=False) + "\n"
+
+
+class SrtWriter(TranscriptWriter):
+    """SubRip cues numbered as they are written."""
+
+    extension = "srt"
+
+    def _format(self, segment: Segment, index: int) -> str:
+        start = format_timestamp(segment.start_ms or 0, ",")
+        end = format_timestamp(segment.end_ms or 0, ",")
+        separator = "\n" if index > 1 else ""
+        return f"{separator}{index}\n{start} --> {end}\n{segment.text}\n"
+
+
+class VttWriter(TranscriptWriter):
+    """WebVTT cues after the ``WEBVTT`` header."""
+
+    extension = "vtt"
+
+    def _header(self) -> str:
+        return "WEBVTT\n\n"
+
+    def _format(self, segment: Segment, index: int) -> str:
+        start = format_timestamp(segment.start_ms or 0)
+        end = format_timestamp(segment.end_ms or 0)
+        return f"{start} --> {end}\n{segment.text}\n\n"
+
+
+WRITERS: Dict[str, Type[TranscriptWriter]] = {
+    cls.extension: cls for cls in (TxtWriter, JsonWriter, JsonlWriter, SrtWriter, VttWriter)
+}
+
+
+def open_writer(path: Union[str, IO[str]], file_format: str, **kwargs) -> TranscriptWriter:
+    """Open a streaming writer for ``file_format`` ('txt', 'json', 'jsonl', 'srt', 'vtt')."""
+    try:
+        writer_cls = WRITERS[file_format]
+    except KeyError:
+        raise ValueError(f"Unsupported file format: {file_format}") from None
+    return writer_cls(path, **kwargs)
+
+
+def format_transcript(segments: Iterable[SegmentLike], file_format: str = "txt") -> str:
+    """Render ``segments`` as a complete ``file_format`` document in memory."""
+    buffer = io.StringIO()
+    with open_writer(buffer, file_format, flush_every=None) as writer:
+        writer.write_many(segments)
+    return buffer.getvalue()
+
+
+def _txt_header(timestamp: datetime) -> str:
+    return f"WhisperLite Transcript - Generated on {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+
 
 def save_transcript(
     segments: List[Dict],
@@ -40,7 +245,7 @@ def save_transcript(
 ) -> str:
     """
     Writes transcript data to a timestamped file in output_dir.
-    Supports 'txt', 'json', and 'srt' formats.
+    Supports 'txt', 'json', 'jsonl', 'srt' and 'vtt' formats.
     Returns the path to the saved file.
     """
     os.makedirs(output_dir, exist_ok=True)
@@ -53,25 +258,19 @@ def save_transcript(
     else:
         base_filename = f"{username}_{timestamp.strftime('%Y%m%d_%H%M%S')}"
         extension = file_format
-    
-    content = ""
 
-    if extension == "txt":
-        header = f"WhisperLite Transcript - Generated on {timestamp.strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-        content = header + full_text
-    elif extension == "json":
-        content = _format_json(segments)
-    elif extension == "srt":
-        content = _format_srt(segments)
-    else:
+    if extension not in WRITERS:
         raise ValueError(f"Unsupported file format: {extension}")
 
     filename = f"{base_filename}.{extension}"
     path = os.path.join(output_dir, filename)
 
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(content)
-    except IOError as exc:
-        raise RuntimeError(f"Failed to write transcript to {path}: {exc}") from exc
-    return path
\ No newline at end of file
+    # Stream to disk in batches so memory stays flat however long the transcript is
+    if extension == "txt":
+        writer = TxtWriter(path, header=_txt_header(timestamp), flush_every=SAVE_FLUSH_EVERY)
+        with writer:
+            writer.write_text(full_text)
+    else:
+        with open_writer(path, extension, flush_every=SAVE_FLUSH_EVERY) as writer:
+            writer.write_many(segments)
+    return path
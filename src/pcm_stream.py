@@ -0,0 +1,198 @@
+"""pcm_stream.py -- Transcribe raw PCM piped into stdin (``--stdin-pcm``)."""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import BinaryIO, Deque, List, Optional, TextIO, Tuple
+
+import numpy as np
+
+from audio_chunk import AudioChunk
+from metrics import METRICS
+from resample import TARGET_RATE, AudioConverter
+from segments import Segment
+from tracing import TRACER, ChunkTrace
+
+logger = logging.getLogger("PcmStream")
+
+
+@dataclass
+class PcmStreamStats:
+    """Totals for one stdin stream."""
+
+    frames: int = 0
+    chunks: int = 0
+    segments: int = 0
+    failed_chunks: int = 0
+
+
+class PcmChunker:
+    """
+    Turn consecutive blocks of interleaved int16 PCM into :class:`AudioChunk` s.
+
+    Counts frames so each chunk lands at its offset on the source timeline,
+    downmixes and resamples to 16 kHz mono when the source is not, and runs
+    ``vad`` over the result. Shared by every front end that cuts raw PCM
+    into chunks (stdin, WebSocket streams, :mod:`session_manager` streams).
+    """
+
+    def __init__(self, sample_rate: int = 16000, channels: int = 1, vad=None) -> None:
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.vad = vad
+        self.converter = AudioConverter(sample_rate, channels)
+        self.frame_bytes = 2 * channels
+        self.frames = 0
+        self.chunks = 0
+
+    @property
+    def offset_ms(self) -> int:
+        """Where the next chunk starts on the source timeline."""
+        return self.frames * 1000 // self.sample_rate
+
+    def chunk(self, pcm, final: bool = False, trace: Optional[ChunkTrace] = None) -> Optional[AudioChunk]:
+        """
+        Build the next chunk from ``pcm`` (whole frames only).
+
+        ``final`` marks the last block of the source, whose chunk also gets
+        the converter's look-ahead tail. Returns ``None`` when ``vad`` judges
+        the chunk silent; it still counts towards :attr:`chunks`.
+        """
+        frames = len(pcm) // self.frame_bytes
+        offset_ms = self.offset_ms
+        self.frames += frames
+        self.chunks += 1
+        METRICS.add("audio_seconds", frames / self.sample_rate)
+        if self.converter.needed:
+            samples = self.converter.process(np.frombuffer(pcm, dtype="<i2").reshape(-1, self.channels))
+            if final:
+                samples = np.concatenate((samples, self.converter.flush()))
+            chunk = AudioChunk(self.chunks, samples.tobytes(), TARGET_RATE, 1, offset_ms, trace)
+        else:
+            chunk = AudioChunk(self.chunks, pcm, self.sample_rate, self.channels, offset_ms, trace)
+        if self.vad is not None:
+            return self.vad.process(chunk)
+        return chunk
+
+
+def _fill(stream: BinaryIO, view: memoryview) -> int:
+    """Read into ``view`` until it is full or the stream ends; returns bytes read."""
+    filled = 0
+    while filled < len(view):
+        n = stream.readinto(view[filled:])
+        if not n:
+            break
+        filled += n
+    return filled
+
+
+def stream_pcm(
+    stream: BinaryIO,
+    transcriber,
+    out: TextIO,
+    sample_rate: int = 16000,
+    channels: int = 1,
+    chunk_sec: float = 1.5,
+    vad=None,
+    controller=None,
+) -> PcmStreamStats:
+    """
+    Transcribe little-endian int16 PCM from ``stream`` until it ends.
+
+    Audio is read straight into a small pool of reusable chunk buffers with
+    ``readinto``; a buffer goes back to the pool once its chunk has been
+    transcribed. When every buffer is in flight the loop waits for the
+    oldest chunk before reading on, so a slow transcriber blocks the writer
+    through the pipe instead of growing memory. Each segment is written to
+    ``out`` as one JSON line, in timeline order, as soon as its chunk is done.
+    Audio that is not 16 kHz mono is downmixed and resampled per chunk.
+    With a :class:`ChunkController` the chunk length follows the controller,
+    which is fed the time each chunk took to transcribe.
+    """
+    chunker = PcmChunker(sample_rate, channels, vad)
+    if chunker.converter.needed:
+        logger.info(f"Converting {sample_rate} Hz, {channels} channel audio to 16 kHz mono")
+
+    stats = PcmStreamStats()
+    frame_bytes = 2 * channels
+    chunk_bytes = max(1, int(sample_rate * chunk_sec)) * frame_bytes
+    buffer_bytes = chunk_bytes
+    if controller is not None:
+        buffer_bytes = max(1, int(sample_rate * controller.max_sec)) * frame_bytes
+    free: List[bytearray] = [bytearray(buffer_bytes) for _ in range(2 * transcriber.concurrency)]
+    in_flight: Deque[Tuple[bytearray, object]] = deque()
+    # Completion times by chunk number; a chunk cannot start before the one
+    # ``concurrency`` places earlier has finished, so that bounds its queue wait
+    finished_at = {}
+    finished_lock = threading.Lock()
+
+    def timed(number: int, audio_sec: float, submitted: float):
+        def record(_future) -> None:
+            done = time.monotonic()
+            earliest = number - transcriber.concurrency
+            with finished_lock:
+                finished_at[number] = done
+                started = max(submitted, finished_at.get(earliest, submitted))
+                for old in [k for k in finished_at if k <= earliest]:
+                    del finished_at[old]
+            controller.record(audio_sec, done - started)
+        return record
+
+    def collect() -> None:
+        buf, future = in_flight.popleft()
+        try:
+            segments = future.result() or []
+        except Exception as exc:
+            logger.error(f"Failed to transcribe chunk: {exc}")
+            stats.failed_chunks += 1
+            segments = []
+        for segment in segments:
+            out.write(json.dumps(Segment.coerce(segment).to_dict(), ensure_ascii=False) + "\n")
+        out.flush()
+        TRACER.finish_segments(segments, "emitted")
+        stats.segments += len(segments)
+        free.append(buf)
+
+    while True:
+        # Write out finished chunks before blocking on the next read
+        while in_flight and in_flight[0][1].done():
+            collect()
+        if not free:
+            collect()  # backpressure: stop reading until a buffer is released
+        buf = free.pop()
+        if controller is not None:
+            backlog = len(in_flight) - transcriber.concurrency
+            chunk_bytes = max(1, int(sample_rate * controller.update(backlog))) * frame_bytes
+        n = _fill(stream, memoryview(buf)[:chunk_bytes])
+        # Stdin is the capture boundary here: the chunk is complete once its last byte is read
+        trace = ChunkTrace(stats.chunks + 1)
+        n -= n % frame_bytes  # a torn sample can only occur at end of stream
+        if n == 0:
+            # A converter's look-ahead tail (under a millisecond) is dropped here
+            # rather than sent to whisper.cpp as a chunk of its own
+            free.append(buf)
+            break
+
+        pcm = buf if n == len(buf) else memoryview(buf)[:n]
+        # A short read means end of stream, so the chunk gets the converter's tail
+        chunk = chunker.chunk(pcm, final=n < chunk_bytes, trace=trace)
+        stats.chunks, stats.frames = chunker.chunks, chunker.frames
+        if chunk is None:
+            free.append(buf)
+            continue
+        submitted = time.monotonic()
+        future = transcriber.submit(chunk, priority="live")
+        if controller is not None:
+            future.add_done_callback(timed(stats.chunks, chunk.duration_sec, submitted))
+        in_flight.append((buf, future))
+        if METRICS.enabled:
+            METRICS.depth("stdin.in_flight", len(in_flight))
+
+    while in_flight:
+        collect()
+    return stats
@@ -0,0 +1,132 @@
+"""resample.py -- Streaming downmix and sample-rate conversion to whisper.cpp's 16 kHz mono."""
+
+from __future__ import annotations
+
+from math import gcd
+
+import numpy as np
+
+TARGET_RATE = 16000
+
+
+def downmix(samples: np.ndarray) -> np.ndarray:
+    """Average interleaved ``(frames, channels)`` samples to a float32 mono signal."""
+    if samples.ndim == 1:
+        return samples.astype(np.float32)
+    if samples.shape[1] == 1:
+        return samples[:, 0].astype(np.float32)
+    return samples.mean(axis=1, dtype=np.float32)
+
+
+class StreamingResampler:
+    """
+    Polyphase windowed-sinc resampler for audio that arrives in blocks.
+
+    The rate ratio is reduced to ``up / down``; output sample ``n`` sits at
+    input position ``n * down / up`` and is computed with the filter phase
+    for that fractional position. The bank holds ``up`` Kaiser-windowed sinc
+    phases of ``2 * half_width`` taps, low-passed at ``rolloff`` times the
+    lower Nyquist rate. The last input samples are kept between calls to
+    :meth:`process`, so block boundaries are seamless and the output is the
+    same however the input is split. :meth:`flush` drains the filter tail.
+    """
+
+    def __init__(
+        self,
+        src_rate: int,
+        dst_rate: int = TARGET_RATE,
+        zero_crossings: int = 8,
+        rolloff: float = 0.95,
+        beta: float = 8.0,
+    ) -> None:
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        g = gcd(src_rate, dst_rate)
+        self.up = dst_rate // g
+        self.down = src_rate // g
+
+        # Cutoff in cycles per input sample; widen the kernel when decimating
+        cutoff = 0.5 * rolloff * min(1.0, dst_rate / src_rate)
+        self.half_width = int(np.ceil(zero_crossings * max(1.0, src_rate / dst_rate)))
+        self._offsets = np.arange(-self.half_width + 1, self.half_width + 1)
+        phases = np.arange(self.up)[:, None] / self.up
+        t = phases - self._offsets[None, :]
+        window = np.i0(beta * np.sqrt(np.clip(1.0 - (t / self.half_width) ** 2, 0.0, 1.0))) / np.i0(beta)
+        bank = 2 * cutoff * np.sinc(2 * cutoff * t) * window
+        self._bank = (bank / bank.sum(axis=1, keepdims=True)).astype(np.float32)
+
+        self.reset()
+
+    def reset(self) -> None:
+        # Zero history before the first sample; _start is the input index of _buffer[0]
+        self._buffer = np.zeros(self.half_width - 1, dtype=np.float32)
+        self._start = -(self.half_width - 1)
+        self._next_out = 0
+        self._total_in = 0
+
+    @property
+    def passthrough(self) -> bool:
+        return self.up == self.down
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """Resample the next block of mono samples; returns float32 output."""
+        samples = np.asarray(samples, dtype=np.float32)
+        if self.passthrough:
+            return samples
+        self._total_in += len(samples)
+        self._buffer = np.concatenate((self._buffer, samples))
+        return self._drain(self._start + len(self._buffer) - 1 - self.half_width)
+
+    def flush(self) -> np.ndarray:
+        """Return the outputs still held back by the filter's look-ahead."""
+        if self.passthrough:
+            return np.zeros(0, dtype=np.float32)
+        expected = -(-self._total_in * self.up // self.down)
+        self._buffer = np.concatenate((self._buffer, np.zeros(self.half_width + 1, dtype=np.float32)))
+        out = self._drain(self._start + len(self._buffer) - 1 - self.half_width)
+        return out[:max(0, expected - (self._next_out - len(out)))]
+
+    def _drain(self, last_base: int) -> np.ndarray:
+        """Compute every output whose filter window ends at or before the buffer end."""
+        if last_base < 0:
+            return np.zeros(0, dtype=np.float32)
+        end = ((last_base + 1) * self.up - 1) // self.down + 1
+        if end <= self._next_out:
+            return np.zeros(0, dtype=np.float32)
+
+        n = np.arange(self._next_out, end, dtype=np.int64)
+        base = n * self.down // self.up
+        phase = n * self.down % self.up
+        taps = self._buffer[(base - self._start)[:, None] + self._offsets[None, :]]
+        out = np.einsum("ij,ij->i", taps, self._bank[phase])
+
+        self._next_out = end
+        # Keep only the history the next output still needs
+        keep_from = end * self.down // self.up - self.half_width + 1
+        drop = keep_from - self._start
+        if drop > 0:
+            self._buffer = self._buffer[drop:]
+            self._start = keep_from
+        return out
+
+
+class AudioConverter:
+    """Downmix and resample int16 blocks to 16 kHz mono int16, keeping state across blocks."""
+
+    def __init__(self, src_rate: int, channels: int, dst_rate: int = TARGET_RATE) -> None:
+        self.channels = channels
+        self.resampler = StreamingResampler(src_rate, dst_rate)
+
+    @property
+    def needed(self) -> bool:
+        return self.channels != 1 or not self.resampler.passthrough
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        return _to_int16(self.resampler.process(downmix(block)))
+
+    def flush(self) -> np.ndarray:
+        return _to_int16(self.resampler.flush())
+
+
+def _to_int16(samples: np.ndarray) -> np.ndarray:
+    return np.clip(np.rint(samples), -32768, 32767).astype(np.int16)
@@ -0,0 +1,154 @@
+"""result_cache.py -- Content-addressed on-disk cache of chunk transcriptions."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+from audio_chunk import AudioChunk
+from segments import Segment
+
+logger = logging.getLogger("ResultCache")
+
+# Bump when the stored layout or the meaning of cached segments changes
+_CACHE_VERSION = 1
+
+
+@dataclass
+class CacheStats:
+    """Counters for one cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return f"Cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), {self.evictions} evicted"
+
+
+def model_identity(model_path: str) -> str:
+    """Identify a model file by path, size and modification time (without hashing it)."""
+    st = os.stat(model_path)
+    return f"{os.path.realpath(model_path)}:{st.st_size}:{st.st_mtime_ns}"
+
+
+class ResultCache:
+    """
+    Segments for previously transcribed audio, stored under ``directory``.
+
+    Entries are keyed by a BLAKE2b hash of the chunk's PCM and format plus a
+    ``context`` string describing everything else that affects the output
+    (model identity, language, decode flags). Segments are stored relative
+    to the chunk start, so the same audio hits at any position in a file.
+    The total size is capped at ``max_bytes``; the least recently used
+    entries are evicted first.
+    """
+
+    def __init__(self, directory: str, context: str, max_bytes: int = 512 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._context = f"v{_CACHE_VERSION}|{context}".encode("utf-8")
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self) -> None:
+        found = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(root, name))
+                except OSError:
+                    continue
+                found.append((st.st_mtime_ns, name[:-5], st.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def key(self, chunk: AudioChunk) -> str:
+        digest = hashlib.blake2b(self._context, digest_size=20)
+        digest.update(f"|{chunk.sample_rate}|{chunk.channels}|".encode("ascii"))
+        digest.update(chunk.pcm)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[List[Segment]]:
+        """Return cached chunk-relative segments, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            segments = [Segment(s.get("start_ms"), s.get("end_ms"), s.get("text", "")) for s in data]
+        except (OSError, ValueError, TypeError, AttributeError):
+            with self._lock:
+                self.stats.misses += 1
+            return None
+        try:
+            os.utime(path)  # recency survives restarts through the mtime
+        except OSError:
+            pass
+        with self._lock:
+            self.stats.hits += 1
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return segments
+
+    def put(self, key: str, segments: List[Segment]) -> None:
+        """Store chunk-relative segments, evicting old entries past the size cap."""
+        payload = json.dumps(
+            [{"start_ms": s.start_ms, "end_ms": s.end_ms, "text": s.text} for s in segments],
+            ensure_ascii=False,
+        ).encode("utf-8")
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so a crash never leaves a torn entry behind
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except OSError as exc:
+            logger.warning(f"Could not write cache entry {key}: {exc}")
+            return
+
+        with self._lock:
+            self._total_bytes += len(payload) - self._entries.pop(key, 0)
+            self._entries[key] = len(payload)
+            self.stats.stores += 1
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+                self.stats.evictions += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.remove(self._path(old_key))
+            except OSError:
+                pass
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
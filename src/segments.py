@@ -0,0 +1,116 @@
+"""segments.py -- Compact transcript segments and timestamp helpers for WhisperLite."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+
+def parse_timestamp(time_str: str) -> int:
+    """Converts ``HH:MM:SS.mmm`` (or SRT-style ``HH:MM:SS,mmm``) to milliseconds."""
+    clock, _, millis = time_str.strip().replace(",", ".").partition(".")
+    parts = [int(p) for p in clock.split(":")]
+    while len(parts) < 3:
+        parts.insert(0, 0)
+    hours, minutes, seconds = parts
+    return ((hours * 60 + minutes) * 60 + seconds) * 1000 + int(millis.ljust(3, "0")[:3] or 0)
+
+
+def format_timestamp(ms: int, separator: str = ".") -> str:
+    """Converts milliseconds to ``HH:MM:SS.mmm`` (use ``separator=","`` for SRT)."""
+    ms = max(0, int(ms))
+    seconds, millis = divmod(ms, 1000)
+    minutes, seconds = divmod(seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}{separator}{millis:03d}"
+
+
+class Segment:
+    """
+    One transcribed span with integer millisecond times on the session timeline.
+
+    Times stay numeric until output; ``segment["start"]`` and ``to_dict()``
+    format them as ``HH:MM:SS.mmm`` for code that still expects the dict
+    shape. Either time may be ``None`` when the source did not provide it.
+    """
+
+    __slots__ = ("start_ms", "end_ms", "text", "trace")
+
+    def __init__(
+        self, start_ms: Optional[int], end_ms: Optional[int], text: str, trace: Any = None
+    ) -> None:
+        self.start_ms = start_ms
+        self.end_ms = end_ms
+        self.text = text
+        # ChunkTrace of the captured chunk this segment came from, if any
+        self.trace = trace
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Segment":
+        start = data.get("start")
+        end = data.get("end")
+        return cls(
+            parse_timestamp(start) if start is not None else None,
+            parse_timestamp(end) if end is not None else None,
+            data.get("text", ""),
+        )
+
+    @classmethod
+    def coerce(cls, value: Union["Segment", Mapping[str, Any]]) -> "Segment":
+        """Return ``value`` as a Segment, converting dict-shaped segments."""
+        return value if isinstance(value, Segment) else cls.from_dict(value)
+
+    def to_dict(self) -> Dict[str, str]:
+        data = {}
+        if self.start_ms is not None:
+            data["start"] = format_timestamp(self.start_ms)
+        if self.end_ms is not None:
+            data["end"] = format_timestamp(self.end_ms)
+        data["text"] = self.text
+        return data
+
+    def shifted(self, offset_ms: int) -> "Segment":
+        return Segment(
+            self.start_ms + offset_ms if self.start_ms is not None else None,
+            self.end_ms + offset_ms if self.end_ms is not None else None,
+            self.text,
+            self.trace,
+        )
+
+    def __getitem__(self, key: str) -> str:
+        if key == "text":
+            return self.text
+        if key == "start" and self.start_ms is not None:
+            return format_timestamp(self.start_ms)
+        if key == "end" and self.end_ms is not None:
+            return format_timestamp(self.end_ms)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Segment):
+            return (self.start_ms, self.end_ms, self.text) == (other.start_ms, other.end_ms, other.text)
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Segment({self.start_ms}, {self.end_ms}, {self.text!r})"
+
+
+def as_dicts(segments: Iterable[Union[Segment, Mapping[str, Any]]]) -> List[Dict]:
+    """Format segments as ``{"start", "end", "text"}`` dicts for output."""
+    return [s.to_dict() if isinstance(s, Segment) else dict(s) for s in segments]
+
+
+def rebase_segments(segments: List[Segment], offset_ms: int) -> List[Segment]:
+    """Shifts chunk-relative segment times onto a global timeline starting ``offset_ms`` earlier."""
+    if not offset_ms:
+        return segments
+    return [Segment.coerce(s).shifted(offset_ms) for s in segments]
@@ -0,0 +1,274 @@
+"""session_manager.py -- Transcribe several audio sources at once over one shared worker pool."""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from metrics import METRICS
+from pcm_stream import PcmChunker, _fill
+from transcript_buffer import TranscriptBuffer
+
+try:
+    import sounddevice as sd
+except Exception:  # ModuleImport or portaudio missing; only device capture needs it
+    sd = None  # type: ignore
+
+logger = logging.getLogger("SessionManager")
+
+SegmentsCallback = Callable[[str, List], None]
+
+
+@dataclass
+class StreamStats:
+    """Totals for one stream."""
+
+    frames: int = 0
+    chunks: int = 0
+    silent_chunks: int = 0
+    dropped_chunks: int = 0
+    segments: int = 0
+
+    def summary(self, name: str, sample_rate: int) -> str:
+        return (
+            f"Stream {name}: {self.frames / sample_rate:.1f}s audio, {self.chunks} chunks "
+            f"({self.silent_chunks} silent, {self.dropped_chunks} dropped), {self.segments} segments"
+        )
+
+
+class TranscriptionStream:
+    """
+    One source with its own timeline, chunking and :class:`TranscriptBuffer`.
+
+    :meth:`feed` takes interleaved int16 PCM at ``sample_rate``/``channels``
+    from a single producer thread, cuts it into ``chunk_sec`` chunks and
+    submits each to the shared transcriber under this stream's name. At most
+    ``max_in_flight`` chunks are outstanding: beyond that ``feed`` waits
+    (``block=True``) or drops the chunk.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        transcriber,
+        sample_rate: int = 16000,
+        channels: int = 1,
+        chunk_sec: float = 1.5,
+        vad=None,
+        max_in_flight: int = 2,
+        on_segments: Optional[SegmentsCallback] = None,
+    ) -> None:
+        self.name = name
+        self.transcriber = transcriber
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.on_segments = on_segments
+        self.buffer = TranscriptBuffer()
+        self.stats = StreamStats()
+        self._chunker = PcmChunker(sample_rate, channels, vad)
+        self._frame_bytes = self._chunker.frame_bytes
+        self._chunk_bytes = max(1, int(sample_rate * chunk_sec)) * self._frame_bytes
+        self._pending = bytearray()
+        self._slots = threading.Semaphore(max_in_flight)
+        self._max_in_flight = max_in_flight
+
+    def feed(self, pcm: bytes, block: bool = True) -> None:
+        """Add audio; every complete chunk is submitted for transcription."""
+        self._pending += pcm
+        while len(self._pending) >= self._chunk_bytes:
+            chunk_pcm = bytes(self._pending[:self._chunk_bytes])
+            del self._pending[:self._chunk_bytes]
+            self._submit(chunk_pcm, block)
+
+    def flush(self) -> None:
+        """Submit the audio left over after the last complete chunk."""
+        tail = len(self._pending) - len(self._pending) % self._frame_bytes
+        if tail:
+            self._submit(bytes(self._pending[:tail]), block=True, final=True)
+        self._pending.clear()
+
+    def wait(self) -> None:
+        """Block until every submitted chunk has been delivered to the buffer."""
+        for _ in range(self._max_in_flight):
+            self._slots.acquire()
+        for _ in range(self._max_in_flight):
+            self._slots.release()
+
+    def _submit(self, pcm: bytes, block: bool, final: bool = False) -> None:
+        chunk = self._chunker.chunk(pcm, final)
+        self.stats.chunks, self.stats.frames = self._chunker.chunks, self._chunker.frames
+        if chunk is None:
+            self.stats.silent_chunks += 1
+            return
+        if not self._slots.acquire(blocking=block):
+            self.stats.dropped_chunks += 1
+            METRICS.add("sessions.dropped_chunks")
+            return
+        try:
+            self.transcriber.submit(chunk, callback=self._deliver, stream=self.name, priority="live")
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _deliver(self, segments) -> None:
+        try:
+            if segments:
+                self.buffer.append(segments)
+                self.stats.segments += len(segments)
+                if self.on_segments is not None:
+                    self.on_segments(self.name, segments)
+        finally:
+            self._slots.release()
+
+
+class SessionManager:
+    """
+    Run N independent :class:`TranscriptionStream` s against one transcriber.
+
+    The transcriber's worker pool is shared; build it with a fair scheduler
+    (``WhisperTranscriber(..., scheduler=DeficitScheduler())``) so a stream
+    with a backlog cannot starve the others. Streams can be fed directly,
+    read from PCM pipes or files (:meth:`add_pcm_source`), or taken from the
+    channels of one multi-channel input device (:meth:`capture_device_channels`).
+    ``make_vad`` builds a detector per stream; with it, quiet streams cost
+    almost nothing, so a few workers can serve many of them.
+    """
+
+    def __init__(
+        self,
+        transcriber,
+        chunk_sec: float = 1.5,
+        make_vad: Optional[Callable[[], object]] = None,
+        on_segments: Optional[SegmentsCallback] = None,
+    ) -> None:
+        self.transcriber = transcriber
+        self.chunk_sec = chunk_sec
+        self.make_vad = make_vad
+        self.on_segments = on_segments
+        self.streams: Dict[str, TranscriptionStream] = {}
+        self._readers: List[threading.Thread] = []
+        self._device_stream = None
+        self._device_blocks: Optional[queue.Queue] = None
+        self._device_feeder: Optional[threading.Thread] = None
+
+    def add_stream(self, name: str, sample_rate: int = 16000, channels: int = 1) -> TranscriptionStream:
+        if name in self.streams:
+            raise ValueError(f"Stream {name!r} already exists")
+        stream = TranscriptionStream(
+            name,
+            self.transcriber,
+            sample_rate,
+            channels,
+            self.chunk_sec,
+            vad=self.make_vad() if self.make_vad else None,
+            max_in_flight=max(2, self.transcriber.concurrency),
+            on_segments=self.on_segments,
+        )
+        self.streams[name] = stream
+        return stream
+
+    def add_pcm_source(
+        self, name: str, source: BinaryIO, sample_rate: int = 16000, channels: int = 1
+    ) -> TranscriptionStream:
+        """Read ``source`` on its own thread until it ends; a slow pool blocks the reader."""
+        stream = self.add_stream(name, sample_rate, channels)
+        block = bytearray(stream._chunk_bytes)
+
+        def read() -> None:
+            try:
+                while True:
+                    n = _fill(source, memoryview(block))
+                    if n:
+                        stream.feed(bytes(block[:n]))
+                    if n < len(block):
+                        break
+                stream.flush()
+            except Exception as exc:
+                logger.error(f"Stream {name} failed: {exc}")
+
+        reader = threading.Thread(target=read, name=f"stream-{name}", daemon=True)
+        reader.start()
+        self._readers.append(reader)
+        return stream
+
+    def capture_device_channels(
+        self,
+        channels: int,
+        sample_rate: int = 16000,
+        device=None,
+        names: Optional[Sequence[str]] = None,
+    ) -> List[TranscriptionStream]:
+        """
+        Open one input stream with ``channels`` channels and transcribe each channel separately.
+
+        The audio callback only copies each block onto a queue; a feeder
+        thread splits it into channels and feeds the streams, so resampling,
+        VAD and submitting never run on PortAudio's real-time thread.
+        """
+        if sd is None:
+            raise RuntimeError("Audio capture unavailable: sounddevice missing")
+        names = list(names or [f"ch{i + 1}" for i in range(channels)])
+        if len(names) != channels:
+            raise ValueError("Need one name per channel")
+        streams = [self.add_stream(name, sample_rate, 1) for name in names]
+        blocks: queue.Queue = queue.Queue()
+
+        def callback(indata, frames, time_info, status) -> None:
+            if status:
+                logger.warning(f"Stream status: {status}")
+            with METRICS.time("capture.callback"):
+                blocks.put_nowait(indata.copy())
+
+        def feed() -> None:
+            while True:
+                block = blocks.get()
+                if block is None:
+                    return
+                for i, stream in enumerate(streams):
+                    try:
+                        # A stream that falls behind drops chunks rather than holding up the others
+                        stream.feed(np.ascontiguousarray(block[:, i]).tobytes(), block=False)
+                    except Exception as exc:
+                        logger.error(f"Stream {stream.name} failed: {exc}")
+
+        self._device_stream = sd.InputStream(
+            samplerate=sample_rate, device=device, channels=channels, dtype="int16", callback=callback
+        )
+        self._device_blocks = blocks
+        self._device_feeder = threading.Thread(target=feed, name="device-feeder", daemon=True)
+        self._device_feeder.start()
+        self._device_stream.start()
+        logger.info(f"Capturing {channels} channels as separate streams")
+        return streams
+
+    def wait(self) -> None:
+        """Wait for every PCM source to end and its chunks to be transcribed."""
+        for reader in self._readers:
+            reader.join()
+        for stream in self.streams.values():
+            stream.wait()
+
+    def close(self) -> None:
+        """Stop device capture, flush partial chunks and wait for outstanding results."""
+        if self._device_stream is not None:
+            self._device_stream.stop()
+            self._device_stream.close()
+            self._device_stream = None
+        if self._device_feeder is not None:
+            # Feed the blocks captured before the stop, then let the feeder exit
+            self._device_blocks.put(None)
+            self._device_feeder.join()
+            self._device_feeder = None
+        for reader in self._readers:
+            reader.join()
+        for stream in self.streams.values():
+            stream.flush()
+        self.wait()
+
+    def summary(self) -> str:
+        return "\n".join(stream.stats.summary(name, stream.sample_rate) for name, stream in self.streams.items())
@@ -0,0 +1,295 @@
+"""sidecar.py -- Long-lived request server for the desktop shell (``--serve``).
+
+One warm Python process answers many requests instead of spawning an
+interpreter per save or per transcription. Requests and responses are
+frames of the form::
+
+    >I header length | >I payload length | JSON header | binary payload
+
+The header carries ``id`` and ``op`` (``save``, ``transcribe_chunk``,
+``status`` or ``shutdown``); the payload is raw little-endian int16 PCM for
+``transcribe_chunk`` and empty otherwise. Every response echoes the request
+``id`` with ``ok`` and either the result fields or ``error``. Transcriptions
+may finish out of order when a worker pool is configured.
+"""
+
+from __future__ import annotations
+
+import getpass
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import asdict
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
+
+from audio_chunk import AudioChunk
+from metrics import METRICS
+from output_writer import save_transcript
+from segments import as_dicts
+
+logger = logging.getLogger("Sidecar")
+
+_FRAME_HEADER = struct.Struct(">II")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+Reply = Callable[[Dict[str, Any]], None]
+
+
+def _read_exact(stream: BinaryIO, size: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        block = stream.read(size - len(data))
+        if not block:
+            return None
+        data += block
+    return bytes(data)
+
+
+def read_frame(stream: BinaryIO) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Read one frame; returns ``None`` at a clean end of stream."""
+    prefix = _read_exact(stream, _FRAME_HEADER.size)
+    if prefix is None:
+        return None
+    header_len, payload_len = _FRAME_HEADER.unpack(prefix)
+    if header_len + payload_len > MAX_FRAME_BYTES:
+        raise RuntimeError(f"Frame of {header_len + payload_len} bytes exceeds the {MAX_FRAME_BYTES} byte limit")
+    raw_header = _read_exact(stream, header_len)
+    payload = _read_exact(stream, payload_len) if payload_len else b""
+    if raw_header is None or payload is None:
+        raise RuntimeError("Stream ended in the middle of a frame")
+    return json.loads(raw_header.decode("utf-8")), payload
+
+
+def write_frame(stream: BinaryIO, header: Dict[str, Any], payload: bytes = b"") -> None:
+    """Write one frame and flush it."""
+    raw_header = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    stream.write(_FRAME_HEADER.pack(len(raw_header), len(payload)) + raw_header + payload)
+    stream.flush()
+
+
+class SidecarServer:
+    """
+    Dispatch framed requests to a lazily created, shared transcriber.
+
+    ``make_transcriber`` is called on the first ``transcribe_chunk`` request,
+    so processes that only save transcripts never load a model.
+    """
+
+    def __init__(
+        self,
+        make_transcriber: Optional[Callable[[], Any]] = None,
+        output_dir: str = ".",
+    ) -> None:
+        self.make_transcriber = make_transcriber
+        self.output_dir = output_dir
+        self.requests = 0
+        self._in_flight = 0
+        self._transcriber = None
+        self._chunk_counter = 0
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._listener: Optional[socket.socket] = None
+        self._handlers: Dict[str, Callable[[Dict[str, Any], bytes, Reply], None]] = {
+            "save": self._op_save,
+            "transcribe_chunk": self._op_transcribe_chunk,
+            "status": self._op_status,
+            "shutdown": self._op_shutdown,
+        }
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def handle(self, header: Dict[str, Any], payload: bytes, send: Reply) -> None:
+        """Run one request; ``send`` receives the response (possibly later)."""
+        request_id = header.get("id")
+
+        def reply(result: Dict[str, Any]) -> None:
+            send({"id": request_id, "ok": "error" not in result, **result})
+
+        with self._lock:
+            self.requests += 1
+        op = str(header.get("op", "")).replace("-", "_")
+        handler = self._handlers.get(op)
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown op: {header.get('op')!r}")
+            handler(header, payload, reply)
+        except Exception as exc:
+            logger.error(f"Request {request_id} ({op}) failed: {exc}")
+            send({"id": request_id, "ok": False, "error": str(exc)})
+
+    def _op_save(self, header: Dict[str, Any], payload: bytes, reply: Reply) -> None:
+        segments = header.get("segments", [])
+        full_text = header.get("full_text")
+        if full_text is None:
+            full_text = " ".join(s.get("text", "") for s in segments)
+        path = save_transcript(
+            segments,
+            full_text,
+            header.get("username") or getpass.getuser(),
+            datetime.now(),
+            header.get("output_dir") or self.output_dir,
+            header.get("format", "txt"),
+            header.get("output_filename"),
+        )
+        reply({"path": path})
+
+    def _get_transcriber(self):
+        with self._lock:
+            if self._transcriber is None:
+                if self.make_transcriber is None:
+                    raise RuntimeError("No model configured for transcription")
+                self._transcriber = self.make_transcriber()
+            return self._transcriber
+
+    def _op_transcribe_chunk(self, header: Dict[str, Any], payload: bytes, reply: Reply) -> None:
+        transcriber = self._get_transcriber()
+        with self._lock:
+            self._chunk_counter += 1
+            self._in_flight += 1
+            index = self._chunk_counter
+        chunk = AudioChunk(
+            index,
+            payload,
+            int(header.get("sample_rate", 16000)),
+            int(header.get("channels", 1)),
+            int(header.get("offset_ms", 0)),
+        )
+
+        def done(future: Future) -> None:
+            with self._lock:
+                self._in_flight -= 1
+            try:
+                segments = future.result()
+            except Exception as exc:
+                reply({"segments": [], "error": str(exc)})
+                return
+            reply({"segments": as_dicts(segments or [])})
+
+        try:
+            future = transcriber.submit(
+                chunk, timeout=float(header.get("timeout", 10.0)), priority=header.get("priority", "live")
+            )
+        except Exception:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(done)
+
+    def _op_status(self, header: Dict[str, Any], payload: bytes, reply: Reply) -> None:
+        with self._lock:
+            transcriber = self._transcriber
+            status = {
+                "pid": os.getpid(),
+                "uptime_sec": round(time.monotonic() - self._started, 3),
+                "requests": self.requests,
+                "in_flight": self._in_flight,
+                "model_loaded": transcriber is not None,
+                "concurrency": transcriber.concurrency if transcriber is not None else 0,
+                "cache": asdict(transcriber.cache.stats) if getattr(transcriber, "cache", None) else None,
+                "metrics": METRICS.snapshot() if METRICS.enabled else None,
+            }
+        # Reply outside the lock so a slow client cannot hold up other requests
+        reply(status)
+
+    def _op_shutdown(self, header: Dict[str, Any], payload: bytes, reply: Reply) -> None:
+        reply({})
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop accepting requests; the serve loops return after their current frame."""
+        self._stop.set()
+
+    def close(self) -> None:
+        """Finish queued transcriptions and release the transcriber."""
+        with self._lock:
+            transcriber, self._transcriber = self._transcriber, None
+        if transcriber is not None:
+            transcriber.close()
+
+    def serve_stream(self, rfile: BinaryIO, wfile: BinaryIO) -> None:
+        """
+        Answer frames from ``rfile`` on ``wfile`` until EOF or ``shutdown``.
+        Returns once every request read so far has been answered, so replies
+        still running in the pool are not lost when the client half-closes.
+        """
+        write_lock = threading.Lock()
+        answered = threading.Condition()
+        pending = 0
+
+        def send(response: Dict[str, Any]) -> None:
+            with write_lock:
+                write_frame(wfile, response)
+
+        def request_send() -> Reply:
+            replied = False
+
+            def send_once(response: Dict[str, Any]) -> None:
+                nonlocal pending, replied
+                try:
+                    send(response)
+                finally:
+                    with answered:
+                        if not replied:
+                            replied = True
+                            pending -= 1
+                            answered.notify_all()
+            return send_once
+
+        while not self.stopping:
+            try:
+                frame = read_frame(rfile)
+            except (RuntimeError, ValueError) as exc:
+                send({"id": None, "ok": False, "error": f"Bad frame: {exc}"})
+                break
+            if frame is None:
+                break
+            with answered:
+                pending += 1
+            self.handle(frame[0], frame[1], request_send())
+
+        with answered:
+            answered.wait_for(lambda: pending == 0)
+
+    def serve_unix(self, path: str) -> None:
+        """Serve each connection to the Unix socket at ``path`` on its own thread."""
+        if not hasattr(socket, "AF_UNIX"):
+            raise RuntimeError("Unix sockets are not supported on this platform")
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen()
+        # Poll so a shutdown request from any connection ends the accept loop
+        listener.settimeout(0.5)
+        self._listener = listener
+        logger.info(f"Serving on {path}")
+        try:
+            while not self.stopping:
+                try:
+                    conn, _ = listener.accept()
+                except socket.timeout:
+                    continue
+                except OSError:
+                    break  # closed by shutdown()
+                conn.settimeout(None)
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            listener.close()
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn, conn.makefile("rb") as rfile, conn.makefile("wb") as wfile:
+            try:
+                self.serve_stream(rfile, wfile)
+            except OSError as exc:
+                logger.warning(f"Connection closed: {exc}")
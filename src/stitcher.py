@@ -0,0 +1,114 @@
+"""stitcher.py -- Merge segments from overlapping audio windows."""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Union
+
+from segments import Segment
+
+_WORD_CHARS = re.compile(r"[^\w']+")
+
+
+def _normalize(word: str) -> str:
+    return _WORD_CHARS.sub("", word.lower())
+
+
+class SegmentStitcher:
+    """
+    Combine transcripts of overlapping windows into one non-repeating stream.
+
+    Windows must be added in timeline order with absolute segment times.
+    Where two windows overlap, the previous window keeps the first half of
+    the overlap and the new window the second half. Words that both windows
+    transcribed across that cut are then removed from the new window by
+    aligning the end of the emitted text with the start of the new text.
+    Segments that reach into the overlap of the *next* window are held back
+    until it arrives (or until :meth:`flush`).
+    """
+
+    def __init__(self, overlap_ms: int, max_match_words: int = 8) -> None:
+        self.overlap_ms = overlap_ms
+        self.max_match_words = max_match_words
+        self._held: List[Segment] = []
+        self._prev_end_ms: Optional[int] = None
+        self._recent_words: List[str] = []
+        self._last_end_ms = 0
+
+    def add(
+        self, segments: List[Union[Segment, Dict]], window_start_ms: int, window_end_ms: int
+    ) -> List[Segment]:
+        """Add one window's segments and return the segments that are now final."""
+        emitted: List[Segment] = []
+        candidates = [Segment.coerce(s) for s in segments]
+
+        if self._prev_end_ms is not None:
+            if window_start_ms < self._prev_end_ms:
+                cut = (window_start_ms + self._prev_end_ms) // 2
+            else:
+                cut = window_start_ms
+            self._emit([s for s in self._held if s.start_ms < cut], emitted)
+            candidates = [s for s in candidates if s.end_ms > cut]
+        self._held = []
+
+        candidates = self._drop_repeated_words(candidates)
+
+        hold_from = window_end_ms - self.overlap_ms
+        ready = [s for s in candidates if s.end_ms <= hold_from]
+        self._held = [s for s in candidates if s.end_ms > hold_from]
+        self._emit(ready, emitted)
+        self._prev_end_ms = window_end_ms
+        return emitted
+
+    def flush(self) -> List[Segment]:
+        """Release every held segment, e.g. at the end of a file or session."""
+        emitted: List[Segment] = []
+        self._emit(self._held, emitted)
+        self._held = []
+        return emitted
+
+    def _emit(self, segments: List[Segment], out: List[Segment]) -> None:
+        for segment in segments:
+            out.append(segment)
+            self._last_end_ms = max(self._last_end_ms, segment.end_ms)
+            self._recent_words.extend(w for w in map(_normalize, segment.text.split()) if w)
+        del self._recent_words[:-self.max_match_words]
+
+    def _drop_repeated_words(self, candidates: List[Segment]) -> List[Segment]:
+        """Strip the longest prefix of ``candidates`` that repeats the emitted tail."""
+        if not candidates or not self._recent_words:
+            return candidates
+
+        new_words: List[str] = []
+        for segment in candidates:
+            new_words.extend(w for w in map(_normalize, segment.text.split()) if w)
+            if len(new_words) >= self.max_match_words:
+                break
+
+        # A single repeated word only counts when the new text overlaps emitted audio
+        overlaps = candidates[0].start_ms < self._last_end_ms
+        min_match = 1 if overlaps else 2
+        matched = 0
+        for k in range(min(len(new_words), len(self._recent_words)), min_match - 1, -1):
+            if self._recent_words[-k:] == new_words[:k]:
+                matched = k
+                break
+        if not matched:
+            return candidates
+
+        result = []
+        remaining = matched
+        for segment in candidates:
+            if remaining == 0:
+                result.append(segment)
+                continue
+            tokens = segment.text.split()
+            drop = 0
+            while drop < len(tokens) and remaining > 0:
+                if _normalize(tokens[drop]):
+                    remaining -= 1
+                drop += 1
+            if drop < len(tokens):
+                start_ms = min(max(segment.start_ms, self._last_end_ms), segment.end_ms)
+                result.append(Segment(start_ms, segment.end_ms, " ".join(tokens[drop:]), segment.trace))
+        return result
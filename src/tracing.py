@@ -0,0 +1,163 @@
+"""tracing.py -- Per-chunk latency traces from audio capture to displayed text."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from metrics import METRICS, Histogram, LATENCY_BUCKETS
+
+
+class ChunkTrace:
+    """
+    Identity and timeline of one captured chunk.
+
+    ``captured_at`` is the ``time.monotonic()`` instant the chunk's last
+    sample was captured, i.e. the earliest moment all of its audio could
+    be transcribed. ``marks`` records later stages as ``(stage, instant)``
+    pairs. The same trace object is shared by the chunk and every segment
+    transcribed from it.
+    """
+
+    __slots__ = ("chunk_id", "captured_at", "marks", "done")
+
+    def __init__(self, chunk_id: int, captured_at: Optional[float] = None) -> None:
+        self.chunk_id = chunk_id
+        self.captured_at = time.monotonic() if captured_at is None else captured_at
+        self.marks: List[Tuple[str, float]] = []
+        self.done = False
+
+    def to_dict(self) -> Dict:
+        stages = {stage: round((at - self.captured_at) * 1000, 3) for stage, at in self.marks}
+        return {"chunk_id": self.chunk_id, "captured_at": self.captured_at, "stages_ms": stages}
+
+    def __repr__(self) -> str:
+        return f"ChunkTrace({self.chunk_id}, {self.captured_at:.3f})"
+
+
+def traces_of(segments: Iterable) -> List[ChunkTrace]:
+    """Distinct traces attached to ``segments``, in first-seen order."""
+    seen: Dict[int, ChunkTrace] = {}
+    for segment in segments:
+        trace = getattr(segment, "trace", None)
+        if trace is not None and id(trace) not in seen:
+            seen[id(trace)] = trace
+    return list(seen.values())
+
+
+class LatencyTracer:
+    """
+    Collects finished chunk traces and their speech-to-screen latency.
+
+    Chunks are tagged at capture whether or not tracing is on; marking
+    stages and keeping finished traces only happens while :attr:`enabled`
+    is set. A trace finishes the first time any of its segments reaches its
+    final stage (the overlay, or stdout for ``--stdin-pcm``). Its latency
+    is recorded here and as the ``speech_to_screen`` stage in
+    :data:`metrics.METRICS`. Only the most recent ``max_traces`` traces are
+    kept for export.
+    """
+
+    def __init__(self, enabled: bool = False, max_traces: int = 100_000) -> None:
+        self.enabled = enabled
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self._finished: Deque[ChunkTrace] = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.latency = Histogram(LATENCY_BUCKETS)
+            self._finished.clear()
+            self._started = time.monotonic()
+
+    def mark(self, trace: Optional[ChunkTrace], stage: str) -> None:
+        """Record that ``trace``'s chunk reached ``stage`` now."""
+        if self.enabled and trace is not None and not trace.done:
+            trace.marks.append((stage, time.monotonic()))
+
+    def mark_segments(self, segments: Iterable, stage: str) -> None:
+        if self.enabled:
+            for trace in traces_of(segments):
+                self.mark(trace, stage)
+
+    def finish(self, trace: Optional[ChunkTrace], stage: str = "displayed") -> Optional[float]:
+        """Close ``trace`` at ``stage``; returns its latency in seconds (None if not traced)."""
+        if not self.enabled or trace is None or trace.done:
+            return None
+        now = time.monotonic()
+        trace.marks.append((stage, now))
+        trace.done = True
+        latency = now - trace.captured_at
+        self.latency.observe(latency)
+        METRICS.observe("speech_to_screen", latency)
+        with self._lock:
+            self._finished.append(trace)
+        return latency
+
+    def finish_segments(self, segments: Iterable, stage: str = "displayed") -> None:
+        if self.enabled:
+            for trace in traces_of(segments):
+                self.finish(trace, stage)
+
+    @property
+    def finished(self) -> List[ChunkTrace]:
+        with self._lock:
+            return list(self._finished)
+
+    def summary(self) -> str:
+        count = self.latency.count
+        if not count:
+            return "Speech-to-screen: no traced chunks"
+        p50, p95, p99 = (self.latency.percentile(q) * 1000 for q in (50, 95, 99))
+        return (
+            f"Speech-to-screen over {count} chunks: p50 {p50:.0f} ms, p95 {p95:.0f} ms, "
+            f"p99 {p99:.0f} ms, max {self.latency.max * 1000:.0f} ms"
+        )
+
+    def chrome_trace(self) -> Dict:
+        """Finished traces in the Chrome trace-event format (chrome://tracing, Perfetto)."""
+        events = []
+        for trace in self.finished:
+            previous, previous_at = "captured", trace.captured_at
+            for stage, at in trace.marks:
+                events.append({
+                    "name": f"{previous} -> {stage}",
+                    "cat": "chunk",
+                    "ph": "X",
+                    "ts": round((previous_at - self._started) * 1e6, 1),
+                    "dur": round(max(0.0, at - previous_at) * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": trace.chunk_id,
+                    "args": {"chunk_id": trace.chunk_id},
+                })
+                previous, previous_at = stage, at
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, path: str) -> None:
+        """Write finished traces: one JSON line per chunk for ``.jsonl``, Chrome trace JSON otherwise."""
+        if path.endswith(".jsonl"):
+            text = "".join(json.dumps(trace.to_dict()) + "\n" for trace in self.finished)
+        else:
+            text = json.dumps(self.chrome_trace()) + "\n"
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+
+# Process-wide tracer used by capture, transcription and display
+TRACER = LatencyTracer()
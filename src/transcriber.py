@@ -1,15 +1,28 @@
 """
 transcriber.py — WhisperLite
-Handles streaming transcription of .wav audio chunks using whisper.cpp subprocess.
+Handles streaming transcription of .wav or in-memory PCM audio chunks using whisper.cpp subprocess.
 - Cross-platform: Windows/macOS/Linux
 - Handles error logging, GPU support, and multiple models
 """
 
 import os
+import socket
 import subprocess
 import shutil
 import logging
-from typing import Optional
+import threading
+import time
+import uuid
+import http.client
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from audio_chunk import AudioChunk
+from metrics import METRICS
+from result_cache import ResultCache, model_identity
+from segments import Segment, parse_timestamp, rebase_segments
+from tracing import TRACER
+from worker_pool import DEFAULT_PRIORITY, TranscriptionPool, background_command, current_priority
 
 # Configure logging
 logging.basicConfig(
@@ -19,18 +32,319 @@ logging.basicConfig(
 )
 logger = logging.getLogger("Transcriber")
 
+# A chunk is either a path to a .wav file or PCM held in memory
+Chunk = Union[str, AudioChunk]
+
+
+class VttStreamParser:
+    """
+    Incremental parser for whisper.cpp output, fed one line (or fragment) at a time.
+
+    Understands WebVTT cues (a ``start --> end`` timing line, optionally
+    followed by cue settings, then one or more text lines up to a blank
+    line) and the ``[start --> end]  text`` lines whisper.cpp prints to
+    stdout as it decodes. Multi-line cue text is joined with spaces. A cue
+    is complete at the blank line that ends it, at the next timing line, or
+    at :meth:`close`. Completed segments are returned from :meth:`feed_line`
+    and passed to ``on_segment`` if given.
+    """
+
+    def __init__(self, on_segment: Optional[Callable[[Segment], None]] = None) -> None:
+        self.on_segment = on_segment
+        self._cue: Optional[list] = None  # [start_ms, end_ms, text lines, saw a line after timing]
+        self._partial = ""
+
+    def feed(self, data: str) -> List[Segment]:
+        """Parse an arbitrary piece of output; an unfinished last line is kept for later."""
+        lines = (self._partial + data).split("\n")
+        self._partial = lines.pop()
+        segments: List[Segment] = []
+        for line in lines:
+            segments.extend(self.feed_line(line))
+        return segments
+
+    def feed_line(self, line: str) -> List[Segment]:
+        """Parse one complete line of output."""
+        line = line.strip()
+        segments: List[Segment] = []
+        if "-->" in line:
+            self._finish(segments)
+            if line.startswith("[") and "]" in line:
+                # whisper.cpp's own progress format: the whole segment is on one line
+                times, _, text = line[1:].partition("]")
+                parsed = self._parse_timing(times, line)
+                if parsed is not None:
+                    self._emit(Segment(parsed[0], parsed[1], text.strip()), segments)
+            else:
+                parsed = self._parse_timing(line, line)
+                if parsed is not None:
+                    self._cue = [parsed[0], parsed[1], [], False]
+        elif self._cue is not None:
+            self._cue[3] = True
+            if line:
+                self._cue[2].append(line)
+            else:
+                self._finish(segments)
+        return segments
+
+    def close(self) -> List[Segment]:
+        """Flush the last cue once the output has ended."""
+        segments: List[Segment] = []
+        if self._partial:
+            segments.extend(self.feed_line(self._partial))
+            self._partial = ""
+        if self._cue is not None and not self._cue[3]:
+            logger.error("Malformed VTT output: cue timing without text at end of output")
+            self._cue = None
+        self._finish(segments)
+        return segments
+
+    def _parse_timing(self, times: str, line: str) -> Optional[tuple]:
+        try:
+            start_str, end_str = times.split("-->")
+            return parse_timestamp(start_str), parse_timestamp(end_str.split()[0])
+        except (ValueError, IndexError):
+            logger.error(f"Could not parse time string: {line}")
+            return None
+
+    def _finish(self, out: List[Segment]) -> None:
+        if self._cue is not None:
+            start_ms, end_ms, lines, _ = self._cue
+            self._cue = None
+            self._emit(Segment(start_ms, end_ms, " ".join(lines)), out)
+
+    def _emit(self, segment: Segment, out: List[Segment]) -> None:
+        out.append(segment)
+        if self.on_segment is not None:
+            self.on_segment(segment)
+
+
+def iter_vtt(lines: Iterable[str]) -> Iterator[Segment]:
+    """Yield segments from an iterable of output lines as soon as each one is complete."""
+    parser = VttStreamParser()
+    for line in lines:
+        yield from parser.feed_line(line)
+    yield from parser.close()
+
+
+def parse_vtt(text: str) -> List[Segment]:
+    """
+    Parse whisper.cpp VTT output into segments.
+    Args:
+        text: Raw VTT text as printed by whisper.cpp.
+
+    Returns:
+        List of Segment objects with millisecond times; malformed cues are skipped.
+    """
+    with METRICS.time("vtt.parse"):
+        return list(iter_vtt(text.splitlines()))
+
+
+def to_source_timeline(chunk: "Chunk", segments: List[Dict], mark: bool = True) -> List[Dict]:
+    """
+    Shift segments of an in-memory chunk onto its source's timeline and tag them with its trace.
+    ``mark=False`` skips the chunk's "transcribed" trace mark, for callers that
+    convert segments one at a time and mark the chunk once at the end.
+    """
+    if isinstance(chunk, AudioChunk):
+        segments = rebase_segments(segments, chunk.offset_ms)
+        if chunk.trace is not None:
+            segments = [Segment.coerce(s) for s in segments]
+            for segment in segments:
+                segment.trace = chunk.trace
+            if mark:
+                TRACER.mark(chunk.trace, "transcribed")
+    return segments
+
+
+def _find_free_port(host: str) -> int:
+    """Ask the OS for an unused TCP port on ``host``."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind((host, 0))
+        return sock.getsockname()[1]
+
+
+class WhisperServerWorker:
+    """
+    A long-lived whisper.cpp ``server`` process that keeps the model loaded.
+    Chunks are posted to its ``/inference`` endpoint over a keep-alive
+    connection, so only the first request pays for loading the model.
+    """
+
+    def __init__(
+        self,
+        server_bin: str,
+        model_path: str,
+        language: str = "en",
+        use_gpu: bool = False,
+        host: str = "127.0.0.1",
+        startup_timeout: float = 60.0,
+    ):
+        self.server_bin = server_bin
+        self.model_path = model_path
+        self.language = language
+        self.use_gpu = use_gpu
+        self.host = host
+        self.port: Optional[int] = None
+        self.startup_timeout = startup_timeout
+        self._process: Optional[subprocess.Popen] = None
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> None:
+        """Spawn the server and wait until it accepts connections."""
+        self.port = _find_free_port(self.host)
+        cmd = [
+            self.server_bin,
+            "-m", self.model_path,
+            "--host", self.host,
+            "--port", str(self.port),
+            "--language", self.language,
+        ]
+        if not self.use_gpu:
+            cmd.append("--no-gpu")
+
+        logger.debug(f"Starting whisper.cpp server: {' '.join(cmd)}")
+        self._process = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(
+                    f"whisper.cpp server exited during startup (code {self._process.returncode})"
+                )
+            try:
+                with socket.create_connection((self.host, self.port), timeout=0.5):
+                    logger.info(f"whisper.cpp server ready on {self.host}:{self.port}")
+                    return
+            except OSError:
+                time.sleep(0.1)
+        self.close()
+        raise RuntimeError("whisper.cpp server did not start in time")
+
+    def transcribe(self, chunk: Chunk, timeout: float = 10.0) -> List[Dict]:
+        """Send one chunk to the server and return its parsed segments."""
+        if not self.alive:
+            logger.warning("whisper.cpp server not running; restarting worker.")
+            self._drop_connection()
+            self.start()
+
+        if isinstance(chunk, AudioChunk):
+            TRACER.mark(chunk.trace, "inference_start")
+            with METRICS.time("wav.encode"):
+                audio = chunk.to_wav_bytes()
+        else:
+            with open(chunk, "rb") as f:
+                audio = f.read()
+
+        boundary = uuid.uuid4().hex
+        body = b"".join([
+            f"--{boundary}\r\n".encode(),
+            b'Content-Disposition: form-data; name="file"; filename="chunk.wav"\r\n',
+            b"Content-Type: audio/wav\r\n\r\n",
+            audio,
+            f"\r\n--{boundary}\r\n".encode(),
+            b'Content-Disposition: form-data; name="response_format"\r\n\r\n',
+            b"vtt",
+            f"\r\n--{boundary}--\r\n".encode(),
+        ])
+        headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+        if self._conn is None:
+            self._conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        self._conn.timeout = timeout
+        try:
+            with METRICS.time("server.inference"):
+                self._conn.request("POST", "/inference", body=body, headers=headers)
+                response = self._conn.getresponse()
+                payload = response.read().decode("utf-8", errors="replace")
+        except Exception:
+            self._drop_connection()
+            raise
+        if response.status != 200:
+            raise RuntimeError(f"whisper.cpp server returned HTTP {response.status}: {payload.strip()}")
+        return to_source_timeline(chunk, parse_vtt(payload))
+
+    def close(self) -> None:
+        """Terminate the server process."""
+        self._drop_connection()
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+
+    def _drop_connection(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class _OneShotBackend:
+    """Pool backend that spawns one whisper.cpp process per chunk."""
+
+    def __init__(self, transcriber: "WhisperTranscriber"):
+        self.transcriber = transcriber
+
+    def transcribe(self, chunk: Chunk, timeout: float = 10.0) -> List[Dict]:
+        return self.transcriber._run_whisper(chunk, timeout)
+
+
+class _CachedBackend:
+    """Pool backend that answers from the result cache before asking ``backend``."""
+
+    def __init__(self, backend, transcriber: "WhisperTranscriber"):
+        self.backend = backend
+        self.transcriber = transcriber
+
+    def transcribe(self, chunk: Chunk, timeout: float = 10.0) -> List[Dict]:
+        return self.transcriber._transcribe_cached(chunk, lambda: self.backend.transcribe(chunk, timeout))
+
+    def close(self) -> None:
+        close = getattr(self.backend, "close", None)
+        if close is not None:
+            close()
+
+
 class WhisperTranscriber:
     """
     Encapsulates interaction with whisper.cpp for real-time transcription.
     """
 
-    def __init__(self, model_path: str, use_gpu: bool = False, whisper_bin: Optional[str] = None, language: str = "en"):
+    def __init__(
+        self,
+        model_path: str,
+        use_gpu: bool = False,
+        whisper_bin: Optional[str] = None,
+        language: str = "en",
+        workers: int = 0,
+        server_bin: Optional[str] = None,
+        jobs: int = 1,
+        cache_dir: Optional[str] = None,
+        cache_max_bytes: int = 512 * 1024 * 1024,
+        scheduler=None,
+    ):
         """
         Args:
             model_path: Path to .bin model file
             use_gpu: Attempt GPU acceleration if available
             whisper_bin: Path to whisper.cpp binary (optional; auto-detected if None)
             language: Language code to use (default: "en")
+            workers: Number of persistent whisper.cpp server workers; 0 spawns one process per chunk
+            server_bin: Path to the whisper.cpp server binary (optional; auto-detected if None)
+            jobs: Chunks transcribed concurrently by one-shot processes when workers is 0
+            cache_dir: Directory of a result cache keyed by audio, model and language (optional)
+            cache_max_bytes: Size cap of the result cache; least recently used entries go first
+            scheduler: How the worker pool picks between streams (see worker_pool); given
+                without workers or jobs, a pool of one one-shot backend is used so that
+                concurrent streams are still scheduled
         """
         # Auto-detect binary if not provided
         self.whisper_bin = whisper_bin or shutil.which("main") or shutil.which("whisper")
@@ -46,53 +360,217 @@ class WhisperTranscriber:
         self.model_path = model_path
         self.use_gpu = use_gpu
         self.language = language
+        self.workers = workers
+        self._pool: Optional[TranscriptionPool] = None
+        self._scheduler = scheduler
+        self.cache: Optional[ResultCache] = None
+        if cache_dir:
+            context = f"{model_identity(model_path)}|language={language}|vtt"
+            self.cache = ResultCache(cache_dir, context, max_bytes=cache_max_bytes)
+
+        if workers > 0:
+            self._pool = self._start_pool(workers, server_bin)
+        elif jobs > 1 or scheduler is not None:
+            self._pool = self._make_pool([_OneShotBackend(self) for _ in range(jobs)])
+
+        logger.info(f"Initialized WhisperTranscriber with model {model_path}, GPU={use_gpu}, workers={workers}, jobs={jobs}")
+
+    @property
+    def concurrency(self) -> int:
+        """Number of chunks that can be transcribed at the same time."""
+        return self._pool.size if self._pool is not None else 1
+
+    def _start_pool(self, workers: int, server_bin: Optional[str]) -> TranscriptionPool:
+        server_bin = server_bin or shutil.which("whisper-server") or shutil.which("server")
+        if not server_bin:
+            error_msg = "whisper.cpp server binary not found. Please ensure it is in your PATH or specify its location."
+            logger.error(error_msg)
+            raise FileNotFoundError(error_msg)
+
+        backends: List[WhisperServerWorker] = []
+        try:
+            for _ in range(workers):
+                worker = WhisperServerWorker(server_bin, self.model_path, self.language, self.use_gpu)
+                worker.start()
+                backends.append(worker)
+        except Exception:
+            for worker in backends:
+                worker.close()
+            raise
+        return self._make_pool(backends)
 
-        logger.info(f"Initialized WhisperTranscriber with model {model_path}, GPU={use_gpu}")
+    def _make_pool(self, backends: list) -> TranscriptionPool:
+        if self.cache is not None:
+            # Lookups run on the pool threads so cached results keep submission order
+            backends = [_CachedBackend(backend, self) for backend in backends]
+        return TranscriptionPool(backends, scheduler=self._scheduler)
 
-    def transcribe_chunk(self, chunk_path: str, timeout: float = 10.0) -> str:
+    def _transcribe_cached(self, chunk: Chunk, run: Callable[[], List[Segment]]) -> List[Segment]:
+        """Return cached segments for ``chunk`` or call ``run`` and remember its result."""
+        if self.cache is None or not isinstance(chunk, AudioChunk):
+            return run()
+        with METRICS.time("cache.lookup"):
+            key = self.cache.key(chunk)
+            cached = self.cache.get(key)
+        if cached is not None:
+            return to_source_timeline(chunk, cached)
+        segments = run()
+        # Empty output is not cached: it may come from a timeout or a crash
+        if segments:
+            self.cache.put(key, rebase_segments(segments, -chunk.offset_ms))
+        return segments
+
+    def submit(
+        self,
+        chunk: Chunk,
+        callback: Optional[Callable[[List[Dict]], None]] = None,
+        timeout: float = 10.0,
+        on_segment: Optional[Callable[[Segment], None]] = None,
+        stream=None,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> Future:
+        """
+        Queue a chunk for transcription without waiting for the result.
+        Callbacks fire in submission order (per ``stream`` with a worker
+        pool). Without a pool the chunk is transcribed synchronously and an
+        already-completed future is returned. ``on_segment`` receives each
+        segment once, before ``callback``; see :meth:`transcribe_chunk`.
+        ``priority`` ('live', 'interactive' or 'batch') orders work in a pool
+        built with a ``PriorityScheduler``.
         """
-        Transcribe a single .wav audio chunk file with whisper.cpp.
+        if self._pool is not None:
+            if on_segment is not None:
+                callback = _delivering(on_segment, callback)
+            return self._pool.submit(chunk, callback=callback, timeout=timeout, stream=stream, priority=priority)
+
+        future: Future = Future()
+        segments = self.transcribe_chunk(chunk, timeout=timeout, on_segment=on_segment, priority=priority)
+        future.set_result(segments)
+        if callback is not None:
+            callback(segments)
+        return future
+
+    def close(self) -> None:
+        """Shut down persistent workers, if any."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def transcribe_chunk(
+        self,
+        chunk: Chunk,
+        timeout: float = 10.0,
+        on_segment: Optional[Callable[[Segment], None]] = None,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> str:
+        """
+        Transcribe a single audio chunk with whisper.cpp.
         Args:
-            chunk_path: Path to audio .wav file.
+            chunk: Path to audio .wav file, or an in-memory AudioChunk.
             timeout: Timeout for the subprocess in seconds.
+            on_segment: Called with each segment exactly once. With a one-shot
+                process the segments are parsed from whisper.cpp's stdout and
+                delivered while it is still running; otherwise they are
+                delivered when the chunk is done.
+            priority: Priority class of the chunk in the worker pool; without
+                a pool the chunk runs right away in the calling thread.
 
         Returns:
             Transcript string, or empty string on error.
         """
-        if not os.path.isfile(chunk_path):
-            logger.error(f"Chunk not found: {chunk_path}")
+        if not isinstance(chunk, AudioChunk) and not os.path.isfile(chunk):
+            logger.error(f"Chunk not found: {chunk}")
             return ""
 
-        # Build whisper.cpp command
+        if self._pool is not None:
+            try:
+                segments = self._pool.submit(chunk, timeout=timeout, priority=priority).result()
+            except Exception as ex:
+                logger.error(f"Worker pool failed to transcribe {chunk}: {ex}")
+                segments = []
+            if on_segment is not None:
+                _delivering(on_segment)(segments)
+            return segments
+
+        if on_segment is None:
+            return self._transcribe_cached(chunk, lambda: self._run_whisper(chunk, timeout))
+
+        streamed = []
+
+        def deliver(segment: Segment) -> None:
+            streamed.append(segment)
+            on_segment(segment)
+
+        segments = self._transcribe_cached(chunk, lambda: self._run_whisper(chunk, timeout, deliver))
+        if not streamed:
+            _delivering(on_segment)(segments)  # answered from the cache
+        return segments
+
+    def build_command(self, source: str) -> List[str]:
+        """
+        whisper.cpp command line for ``source``; ``"-"`` makes whisper.cpp read the WAV from stdin.
+        Stdin input is parsed from stdout only: ``--output-vtt`` would write ``-.vtt`` into
+        the working directory for every chunk, and parallel processes would race on it.
+        """
         cmd = [
             self.whisper_bin,
             "-m", self.model_path,
-            "-f", chunk_path,
+            "-f", source,
             "--language", self.language,
-            "--output-vtt",  # output VTT file (stdout will also be captured)
-            "--print-colors", "false"
         ]
+        if source != "-":
+            cmd.append("--output-vtt")  # output VTT file (stdout will also be captured)
+        cmd += ["--print-colors", "false"]
         if self.use_gpu:
             cmd.append("--gpu")
         # Add more flags if your build supports faster or partial inference
+        return cmd
 
+    def _run_whisper(
+        self, chunk: Chunk, timeout: float, on_segment: Optional[Callable[[Segment], None]] = None
+    ) -> List[Dict]:
+        """Run one whisper.cpp process over ``chunk`` and parse its VTT output."""
+        if isinstance(chunk, AudioChunk):
+            TRACER.mark(chunk.trace, "inference_start")
+        with METRICS.time("wav.encode"):
+            wav_bytes = chunk.to_wav_bytes() if isinstance(chunk, AudioChunk) else None
+
+        cmd = self.build_command("-" if wav_bytes is not None else chunk)
+        if current_priority() == "batch":
+            cmd = background_command(cmd)
         logger.debug(f"Running: {' '.join(cmd)}")
 
-        try:
-            # Use subprocess to run whisper.cpp, capturing output
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                universal_newlines=True,
-                bufsize=1
-            )
+        if on_segment is not None:
+            return self._stream_whisper(cmd, chunk, wav_bytes, timeout, on_segment)
 
-            transcript_lines = []
-            err_lines = []
+        try:
+            if wav_bytes is None:
+                # Use subprocess to run whisper.cpp, capturing output
+                with METRICS.time("whisper.spawn"):
+                    process = subprocess.Popen(
+                        cmd,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE,
+                        universal_newlines=True,
+                        bufsize=1
+                    )
 
-            # Read all stdout and stderr
-            stdout, stderr = process.communicate(timeout=timeout)
+                # Read all stdout and stderr
+                with METRICS.time("whisper.inference"):
+                    stdout, stderr = process.communicate(timeout=timeout)
+            else:
+                # Pipe the in-memory WAV through stdin; nothing is written to disk
+                with METRICS.time("whisper.spawn"):
+                    process = subprocess.Popen(
+                        cmd,
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.PIPE
+                    )
+                with METRICS.time("whisper.inference"):
+                    raw_out, raw_err = process.communicate(input=wav_bytes, timeout=timeout)
+                stdout = raw_out.decode("utf-8", errors="replace")
+                stderr = raw_err.decode("utf-8", errors="replace")
 
             if stderr:
                 for line in stderr.splitlines():
@@ -103,34 +581,12 @@ class WhisperTranscriber:
                 return []
 
             # Parse VTT output
-            segments = []
-            lines = stdout.splitlines()
-            i = 0
-            while i < len(lines):
-                line = lines[i].strip()
-                if "-->" in line:
-                    try:
-                        time_str = line
-                        text_line = lines[i + 1].strip()
-                        
-                        start_time_str, end_time_str = time_str.split(" --> ")
-                        
-                        segments.append({
-                            "start": start_time_str,
-                            "end": end_time_str,
-                            "text": text_line
-                        })
-                        i += 1 # Skip text line
-                    except IndexError:
-                        logger.error(f"Malformed VTT output near: {line}")
-                    except ValueError:
-                        logger.error(f"Could not parse time string: {line}")
-                i += 1
-            
+            segments = parse_vtt(stdout)
+
             if not segments:
                 logger.warning("No segments parsed from VTT output.")
 
-            return segments
+            return to_source_timeline(chunk, segments)
 
         except subprocess.TimeoutExpired:
             process.kill()
@@ -140,6 +596,103 @@ class WhisperTranscriber:
             logger.exception(f"Failed to invoke whisper.cpp or parse output: {ex}")
             return []
 
+    def _stream_whisper(
+        self,
+        cmd: List[str],
+        chunk: Chunk,
+        wav_bytes: Optional[bytes],
+        timeout: float,
+        on_segment: Callable[[Segment], None],
+    ) -> List[Segment]:
+        """
+        Run whisper.cpp and parse its stdout line by line while it runs.
+
+        Each segment goes to ``on_segment`` as soon as its cue is complete.
+        Stdin is fed and stderr drained on helper threads, so neither pipe
+        can fill up and stall the process; a timer kills it at ``timeout``.
+        Segments delivered before a timeout or failure are kept.
+        """
+        segments: List[Segment] = []
+
+        def deliver(segment: Segment) -> None:
+            segment = to_source_timeline(chunk, [segment], mark=False)[0]
+            segments.append(segment)
+            on_segment(segment)
+
+        parser = VttStreamParser(deliver)
+        stderr_lines: List[str] = []
+        timed_out = threading.Event()
+        try:
+            with METRICS.time("whisper.spawn"):
+                process = subprocess.Popen(
+                    cmd,
+                    stdin=subprocess.PIPE if wav_bytes is not None else subprocess.DEVNULL,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                )
+        except Exception as ex:
+            logger.exception(f"Failed to invoke whisper.cpp: {ex}")
+            return []
+
+        def expire() -> None:
+            timed_out.set()
+            process.kill()
+
+        def drain_stderr() -> None:
+            stderr_lines.extend(process.stderr.read().decode("utf-8", errors="replace").splitlines())
+
+        helpers = [threading.Thread(target=drain_stderr, daemon=True)]
+        if wav_bytes is not None:
+            helpers.append(threading.Thread(target=_write_and_close, args=(process.stdin, wav_bytes), daemon=True))
+        timer = threading.Timer(timeout, expire)
+        timer.daemon = True
+        timer.start()
+        for helper in helpers:
+            helper.start()
+        try:
+            with METRICS.time("whisper.inference"):
+                for raw in process.stdout:
+                    parser.feed_line(raw.decode("utf-8", errors="replace"))
+                parser.close()
+                process.wait()
+        except Exception as ex:
+            process.kill()
+            logger.exception(f"Failed to read whisper.cpp output: {ex}")
+        finally:
+            timer.cancel()
+            for helper in helpers:
+                helper.join(timeout=1)
+
+        for line in stderr_lines:
+            logger.error(f"whisper.cpp stderr: {line.strip()}")
+        if timed_out.is_set():
+            logger.error("whisper.cpp process timed out.")
+        elif not segments:
+            logger.warning("No segments parsed from whisper.cpp output.")
+        if isinstance(chunk, AudioChunk):
+            TRACER.mark(chunk.trace, "transcribed")
+        return segments
+
+
+def _write_and_close(pipe, data: bytes) -> None:
+    try:
+        pipe.write(data)
+        pipe.close()
+    except OSError:
+        pass  # the process exited (or was killed) before reading all of its input
+
+
+def _delivering(
+    on_segment: Callable[[Segment], None], then: Optional[Callable[[List[Dict]], None]] = None
+) -> Callable[[List[Dict]], None]:
+    """Wrap a segment-list callback so ``on_segment`` sees each segment first."""
+    def deliver(segments: List[Dict]) -> None:
+        for segment in segments:
+            on_segment(Segment.coerce(segment))
+        if then is not None:
+            then(segments)
+    return deliver
+
 # Example usage/test
 if __name__ == "__main__":
     # Update these paths as needed for your environment
@@ -3,39 +3,180 @@
 from __future__ import annotations
 
 import threading
-from collections import deque
-from datetime import datetime
-from typing import Deque, List, Dict
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, List, Mapping, NamedTuple, Union
+
+from metrics import METRICS
+from segments import Segment, as_dicts
+from tracing import TRACER
+
+# Compact the backing list once this many evicted segments pile up at its head
+_COMPACT_AFTER = 1024
+
+
+class TranscriptDelta(NamedTuple):
+    """Result of :meth:`TranscriptBuffer.read_since`.
+
+    ``segments`` arrived after the given cursor, and ``cursor`` is the value
+    to pass next time. When ``reset`` is true the caller's view is stale
+    (the buffer was cleared, reordered, or the cursor fell behind eviction).
+    The caller should then drop what it has and use ``segments``, which then
+    holds the complete current contents.
+    """
+
+    segments: List[Segment]
+    cursor: int
+    reset: bool
+
 
 class TranscriptBuffer:
-    """Thread-safe append-only transcript buffer."""
+    """Thread-safe transcript buffer kept sorted by segment start time.
+
+    Segments are stored as compact :class:`Segment` objects with integer
+    millisecond times, next to an ``array`` of start times that serves as
+    the index for :meth:`get_range`. Dict-shaped segments are converted on
+    append and formatted back only when read with :meth:`get_segments`.
+
+    Every appended segment also gets a sequence number. :attr:`version`
+    only ever grows, and :meth:`read_since` returns just the segments
+    appended after a cursor, so pollers pay per new segment, not per
+    session length.
+    """
 
     def __init__(self, maxlen: int | None = None):
-        self._buffer: Deque[Dict] = deque(maxlen=maxlen)
+        self._maxlen = maxlen
+        self._segments: List[Segment] = []
+        self._starts = array("q")  # sort key of each entry in _segments
+        self._head = 0  # entries before this index have been evicted
         self._lock = threading.RLock()
 
-    def append(self, segments: List[Dict]) -> None:
+        # Arrival-ordered log for cursor reads; _arrivals[0] has sequence number _base
+        self._arrivals: List[Segment] = []
+        self._base = 0
+        self._reset_version = 0  # cursors older than this must resync
+
+        # Cached full text (joined from ``_text_count`` segments) plus texts appended since
+        self._text = ""
+        self._text_count = 0
+        self._text_pending: List[str] = []
+        self._text_valid = True
+
+    @property
+    def version(self) -> int:
+        """Sequence number after the most recent change; never decreases."""
+        with self._lock:
+            return self._base + len(self._arrivals)
+
+    def append(self, segments: List[Union[Segment, Mapping]]) -> None:
         """Appends a list of new segments to the buffer."""
+        with METRICS.time("buffer.append"), self._lock:
+            reordered = False
+            for value in segments:
+                segment = Segment.coerce(value)
+                last = self._starts[-1] if len(self._starts) > self._head else 0
+                # Untimed segments keep their arrival position
+                key = segment.start_ms if segment.start_ms is not None else last
+                if key >= last:
+                    self._segments.append(segment)
+                    self._starts.append(key)
+                    if self._text_valid:
+                        # Once invalid, full_text() rebuilds from the segments instead
+                        self._text_pending.append(segment.text)
+                else:
+                    pos = bisect_right(self._starts, key, self._head)
+                    self._segments.insert(pos, segment)
+                    self._starts.insert(pos, key)
+                    reordered = True
+                self._arrivals.append(segment)
+            if reordered:
+                self._reset_version = self._base + len(self._arrivals)
+                self._invalidate_text()
+            self._evict()
+        TRACER.mark_segments(segments, "buffered")
+
+    def _evict(self) -> None:
+        if self._maxlen is not None:
+            head = max(self._head, len(self._segments) - self._maxlen)
+            if head != self._head:
+                self._head = head
+                self._invalidate_text()
+            excess = len(self._arrivals) - self._maxlen
+            if excess > _COMPACT_AFTER:
+                del self._arrivals[:excess]
+                self._base += excess
+        if self._head > _COMPACT_AFTER and self._head * 2 > len(self._segments):
+            del self._segments[:self._head]
+            del self._starts[:self._head]
+            self._head = 0
+
+    def _invalidate_text(self) -> None:
+        self._text_valid = False
+        self._text_pending = []
+
+    def read_since(self, cursor: int) -> TranscriptDelta:
+        """Returns the segments appended after ``cursor`` (in arrival order)."""
+        with self._lock:
+            version = self._base + len(self._arrivals)
+            if cursor < self._reset_version or cursor < self._base or cursor > version:
+                return TranscriptDelta(self._segments[self._head:], version, True)
+            return TranscriptDelta(self._arrivals[cursor - self._base:], version, False)
+
+    def get_range(self, start_ms: int, end_ms: int) -> List[Segment]:
+        """Returns segments overlapping ``[start_ms, end_ms)`` via a bisect on the time index."""
         with self._lock:
-            self._buffer.extend(segments)
+            lo = bisect_left(self._starts, start_ms, self._head)
+            hi = bisect_left(self._starts, end_ms, lo)
+            # Include a segment that started earlier but is still running at start_ms
+            if lo > self._head:
+                previous = self._segments[lo - 1]
+                if previous.end_ms is not None and previous.end_ms > start_ms:
+                    lo -= 1
+            return self._segments[lo:hi]
 
     def get_segments(self) -> List[Dict]:
         """Returns all stored segments."""
         with self._lock:
-            return list(self._buffer)
+            return as_dicts(self._segments[self._head:])
 
     def full_text(self) -> str:
-        """Returns the full concatenated text from all segments."""
+        """Returns the full concatenated text from all segments.
+
+        The joined text is cached; only texts appended since the last call
+        are joined onto it, and an unchanged buffer returns the cache as is.
+        """
         with self._lock:
-            return " ".join([s["text"] for s in self._buffer])
+            if not self._text_valid:
+                self._text = " ".join([s.text for s in self._segments[self._head:]])
+                self._text_count = len(self._segments) - self._head
+                self._text_pending = []
+                self._text_valid = True
+            elif self._text_pending:
+                # Keyed on the segment count, not on the text, so empty texts keep their separators
+                parts = [self._text] if self._text_count else []
+                parts.extend(self._text_pending)
+                self._text = " ".join(parts)
+                self._text_count += len(self._text_pending)
+                self._text_pending = []
+            return self._text
 
     def clear(self) -> List[Dict]:
         """Clears the buffer and returns the cleared segments."""
         with self._lock:
-            segments = list(self._buffer)
-            self._buffer.clear()
+            segments = as_dicts(self._segments[self._head:])
+            self._segments = []
+            self._starts = array("q")
+            self._head = 0
+            # Clearing consumes a sequence number so every existing cursor resyncs
+            self._base += len(self._arrivals) + 1
+            self._arrivals = []
+            self._reset_version = self._base
+            self._text = ""
+            self._text_count = 0
+            self._text_pending = []
+            self._text_valid = True
             return segments
 
     def __len__(self) -> int:
         with self._lock:
-            return len(self._buffer)
+            return len(self._segments) - self._head
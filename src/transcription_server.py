@@ -0,0 +1,760 @@
+"""transcription_server.py -- Local HTTP and WebSocket transcription server (``--serve-http``).
+
+Lets other processes on the machine share one warm transcriber::
+
+    POST /transcribe?format=txt|json|jsonl|srt|vtt
+        Body: an audio file, either raw or as the ``file`` field of a
+        multipart/form-data upload. Replies with the transcript.
+    GET /stream?sample_rate=16000&channels=1&chunk_sec=1.5
+        WebSocket. Binary messages carry little-endian int16 PCM; each
+        segment comes back as a JSON text message ``{"start", "end",
+        "text"}`` as soon as it is transcribed. Sending the text message
+        ``{"event": "end"}`` flushes the remaining audio and is answered by
+        ``{"event": "done", ...}`` before the server closes the socket.
+    GET /health
+        Queue depth, limits and request counters as JSON.
+
+Everything runs on one asyncio event loop using only the standard library.
+Uploads are batch work: they wait in a bounded queue for an executor
+thread, and when the queue is full new uploads are refused with ``503`` and
+a ``Retry-After`` header instead of piling up. Stream chunks are live work
+and skip that queue: they go straight to the transcriber's worker pool, so
+queued or running uploads can never hold them up, and a chunk the
+transcriber refuses is dropped with a ``dropped`` event. Uploads, headers
+and WebSocket messages are size-limited, and idle connections time out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import heapq
+import itertools
+import json
+import logging
+import os
+import struct
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from file_transcriber import FileTranscript, transcribe_file
+from metrics import METRICS
+from output_writer import WRITERS, format_transcript
+from pcm_stream import PcmChunker
+from segments import Segment, format_timestamp
+from worker_pool import DEFAULT_PRIORITY, PRIORITIES
+
+logger = logging.getLogger("TranscriptionServer")
+
+_WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_CONTINUATION, _TEXT, _BINARY, _CLOSE, _PING, _PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+_CONTENT_TYPES = {
+    "txt": "text/plain; charset=utf-8",
+    "json": "application/json",
+    "jsonl": "application/x-ndjson",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+}
+_REASONS = {
+    101: "Switching Protocols",
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    408: "Request Timeout",
+    411: "Length Required",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+@dataclass
+class ServerLimits:
+    """Limits applied to every request; anything over a limit is refused, not queued."""
+
+    queue_size: int = 8  # uploads waiting for a free executor thread
+    max_upload_bytes: int = 200 * 1024 * 1024
+    max_header_bytes: int = 16 * 1024
+    max_streams: int = 4  # concurrent WebSocket sessions
+    max_message_bytes: int = 1024 * 1024  # one WebSocket message
+    stream_in_flight: int = 4  # chunks of one stream queued or running before its socket stops being read
+    read_timeout_sec: float = 30.0  # headers and upload body
+    idle_timeout_sec: float = 60.0  # gap between WebSocket messages
+    chunk_timeout_sec: float = 10.0  # passed to the transcriber per chunk
+
+
+@dataclass
+class ServerStats:
+    """Request counters for ``/health`` and the shutdown summary."""
+
+    requests: int = 0
+    uploads: int = 0
+    streams: int = 0
+    rejected: int = 0
+    dropped_chunks: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"HTTP server: {self.requests} requests, {self.uploads} uploads, {self.streams} streams, "
+            f"{self.rejected} rejected as overloaded, {self.dropped_chunks} stream chunks dropped"
+        )
+
+
+class HttpError(Exception):
+    """An error answered with ``status`` and a JSON ``{"error": message}`` body."""
+
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _overloaded() -> HttpError:
+    return HttpError(503, "Server is busy; retry later", {"Retry-After": "1"})
+
+
+class WebSocketError(Exception):
+    """A protocol violation; the connection is closed with ``code``."""
+
+    def __init__(self, code: int, reason: str) -> None:
+        super().__init__(reason)
+        self.code = code
+        self.reason = reason
+
+
+class WebSocketClosed(Exception):
+    """The peer closed the connection."""
+
+    def __init__(self, code: int) -> None:
+        super().__init__(f"WebSocket closed ({code})")
+        self.code = code
+
+
+def _apply_mask(data: bytes, mask: bytes) -> bytes:
+    if not data:
+        return b""
+    repeated = np.frombuffer((mask * (len(data) // 4 + 1))[:len(data)], dtype=np.uint8)
+    return (np.frombuffer(data, dtype=np.uint8) ^ repeated).tobytes()
+
+
+class WebSocket:
+    """
+    Minimal RFC 6455 endpoint over an asyncio stream pair.
+
+    Handles fragmented messages, ping/pong and the closing handshake; no
+    extensions. ``client=True`` masks outgoing frames (and expects unmasked
+    ones), as a client must.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        max_message_bytes: int = 1024 * 1024,
+        client: bool = False,
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.max_message_bytes = max_message_bytes
+        self.client = client
+        self.closed = False
+        self._send_lock = asyncio.Lock()
+
+    async def _read_frame(self) -> Tuple[bool, int, bytes]:
+        first, second = await self.reader.readexactly(2)
+        fin, opcode, length = bool(first & 0x80), first & 0x0F, second & 0x7F
+        if first & 0x70:
+            raise WebSocketError(1002, "Extensions are not supported")
+        if bool(second & 0x80) == self.client:
+            raise WebSocketError(1002, "Client frames must be masked and server frames must not be")
+        if length == 126:
+            (length,) = struct.unpack(">H", await self.reader.readexactly(2))
+        elif length == 127:
+            (length,) = struct.unpack(">Q", await self.reader.readexactly(8))
+        if opcode >= _CLOSE and (length > 125 or not fin):
+            raise WebSocketError(1002, "Bad control frame")
+        if length > self.max_message_bytes:
+            raise WebSocketError(1009, "Message too large")
+        mask = b"" if self.client else await self.reader.readexactly(4)
+        payload = await self.reader.readexactly(length)
+        return fin, opcode, _apply_mask(payload, mask) if mask else payload
+
+    async def receive(self) -> Union[str, bytes]:
+        """Return the next text (``str``) or binary (``bytes``) message."""
+        fragments: List[bytes] = []
+        size = 0
+        message_opcode = None
+        while True:
+            fin, opcode, payload = await self._read_frame()
+            if opcode == _PING:
+                await self._send_frame(_PONG, payload)
+                continue
+            if opcode == _PONG:
+                continue
+            if opcode == _CLOSE:
+                code = struct.unpack(">H", payload[:2])[0] if len(payload) >= 2 else 1005
+                if not self.closed:
+                    self.closed = True
+                    await self._send_frame(_CLOSE, payload[:2])
+                raise WebSocketClosed(code)
+            if opcode == _CONTINUATION:
+                if message_opcode is None:
+                    raise WebSocketError(1002, "Continuation without a message")
+            elif opcode in (_TEXT, _BINARY) and message_opcode is None:
+                message_opcode = opcode
+            else:
+                raise WebSocketError(1002, f"Unexpected opcode {opcode}")
+            size += len(payload)
+            if size > self.max_message_bytes:
+                raise WebSocketError(1009, "Message too large")
+            fragments.append(payload)
+            if fin:
+                data = b"".join(fragments)
+                if message_opcode == _BINARY:
+                    return data
+                try:
+                    return data.decode("utf-8")
+                except UnicodeDecodeError:
+                    raise WebSocketError(1007, "Text message is not UTF-8") from None
+
+    async def _send_frame(self, opcode: int, payload: bytes) -> None:
+        length = len(payload)
+        mask_bit = 0x80 if self.client else 0
+        header = bytearray([0x80 | opcode])
+        if length < 126:
+            header.append(mask_bit | length)
+        elif length < 1 << 16:
+            header.append(mask_bit | 126)
+            header += struct.pack(">H", length)
+        else:
+            header.append(mask_bit | 127)
+            header += struct.pack(">Q", length)
+        if self.client:
+            mask = os.urandom(4)
+            header += mask
+            payload = _apply_mask(payload, mask)
+        async with self._send_lock:
+            self.writer.write(bytes(header) + payload)
+            await self.writer.drain()
+
+    async def send(self, message: Union[str, bytes]) -> None:
+        if isinstance(message, str):
+            await self._send_frame(_TEXT, message.encode("utf-8"))
+        else:
+            await self._send_frame(_BINARY, bytes(message))
+
+    async def send_json(self, value: Dict[str, Any]) -> None:
+        await self.send(json.dumps(value, ensure_ascii=False))
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        """Send a close frame and wait briefly for the peer's reply."""
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            await self._send_frame(_CLOSE, struct.pack(">H", code) + reason.encode("utf-8")[:123])
+            while True:
+                _, opcode, _ = await asyncio.wait_for(self._read_frame(), 1.0)
+                if opcode == _CLOSE:
+                    return
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, WebSocketError):
+            pass
+
+
+async def websocket_connect(host: str, port: int, target: str = "/stream", **kwargs) -> WebSocket:
+    """Open a client WebSocket to ``target`` on ``host:port``."""
+    reader, writer = await asyncio.open_connection(host, port)
+    key = base64.b64encode(os.urandom(16)).decode("ascii")
+    writer.write((
+        f"GET {target} HTTP/1.1\r\nHost: {host}:{port}\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n"
+    ).encode("latin-1"))
+    await writer.drain()
+    head = (await reader.readuntil(b"\r\n\r\n")).decode("latin-1")
+    status = head.split(" ", 2)[1]
+    if status != "101":
+        body = await reader.read()
+        writer.close()
+        raise HttpError(int(status), body.decode("utf-8", errors="replace") or head.splitlines()[0])
+    return WebSocket(reader, writer, client=True, **kwargs)
+
+
+def _accept_key(key: str) -> str:
+    return base64.b64encode(hashlib.sha1((key + _WS_GUID).encode("ascii")).digest()).decode("ascii")
+
+
+def _number(query: Dict[str, str], name: str, default, low, high):
+    try:
+        value = type(default)(query.get(name, default))
+    except ValueError:
+        raise HttpError(400, f"{name} must be a number") from None
+    if not low <= value <= high:
+        raise HttpError(400, f"{name} must be between {low} and {high}")
+    return value
+
+
+def _uploaded_file(body: bytes, content_type: str) -> bytes:
+    """The ``file`` field of a multipart/form-data body (or its first file)."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    files = [part for part in message.iter_parts() if part.get_filename() or part.get_param("name", header="content-disposition") == "file"]
+    named = [part for part in files if part.get_param("name", header="content-disposition") == "file"]
+    if not files:
+        raise HttpError(400, "Multipart upload has no file field")
+    return (named or files)[0].get_payload(decode=True) or b""
+
+
+class _JobQueue:
+    """Bounded job queue that hands out live and interactive jobs before batch jobs.
+
+    At most ``batch_limit`` batch jobs are handed out at a time; :meth:`done`
+    returns a slot.
+    """
+
+    def __init__(self, maxsize: int, batch_limit: int) -> None:
+        self.maxsize = maxsize
+        self.batch_limit = batch_limit
+        self.running_batch = 0
+        self._heap: List[Tuple[int, int, str, Any]] = []
+        self._order = itertools.count()
+        self._changed = asyncio.Event()
+
+    def qsize(self) -> int:
+        return len(self._heap)
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._heap)
+
+    def put_nowait(self, item: Any, priority: str = DEFAULT_PRIORITY) -> None:
+        if self.full():
+            raise asyncio.QueueFull
+        heapq.heappush(self._heap, (PRIORITIES.index(priority), next(self._order), priority, item))
+        self._changed.set()
+
+    async def get(self) -> Tuple[str, Any]:
+        while True:
+            # Batch sorts last, so a batch job at the head means only batch jobs are queued
+            if self._heap and (self._heap[0][2] != "batch" or self.running_batch < self.batch_limit):
+                _, _, priority, item = heapq.heappop(self._heap)
+                if priority == "batch":
+                    self.running_batch += 1
+                return priority, item
+            self._changed.clear()
+            await self._changed.wait()
+
+    def done(self, priority: str) -> None:
+        if priority == "batch":
+            self.running_batch -= 1
+            self._changed.set()
+
+
+class TranscriptionServer:
+    """
+    Serve ``transcriber`` over HTTP and WebSocket on ``host:port``.
+
+    ``port=0`` picks a free port; the bound port is in :attr:`port` after
+    :meth:`start`. Uploads are transcribed on ``transcriber.concurrency``
+    executor threads; stream chunks are handed to ``transcriber.submit``
+    from the event loop, so it must queue work rather than run it inline.
+    Build the transcriber with a ``PriorityScheduler`` so its workers take
+    live chunks before the chunks of running uploads.
+    """
+
+    def __init__(
+        self,
+        transcriber,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        limits: Optional[ServerLimits] = None,
+        default_format: str = "txt",
+        chunk_sec: float = 1.5,
+    ) -> None:
+        self.transcriber = transcriber
+        self.host = host
+        self.port = port
+        self.limits = limits or ServerLimits()
+        self.default_format = default_format
+        self.chunk_sec = chunk_sec
+        self.concurrency = max(1, transcriber.concurrency)
+        self.stats = ServerStats()
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="transcribe")
+        self._queue: Optional[_JobQueue] = None
+        self._workers: List[asyncio.Task] = []
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._open_streams = 0
+
+    async def start(self) -> None:
+        """Bind the listening socket and start the job workers."""
+        self._queue = _JobQueue(self.limits.queue_size, batch_limit=self.concurrency)
+        self._workers = [asyncio.ensure_future(self._work()) for _ in range(self.concurrency)]
+        # The reader limit caps how far readuntil() looks for the end of the headers
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=self.limits.max_header_bytes
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"Serving on http://{self.host}:{self.port}")
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop listening and abandon queued jobs; running chunks finish in the background."""
+        if self._server is not None:
+            self._server.close()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._executor.shutdown(wait=False)
+
+    # -- Job queue --------------------------------------------------------
+
+    def _enqueue(self, run: Callable[[], Any], priority: str = DEFAULT_PRIORITY) -> asyncio.Future:
+        """Queue ``run`` for a worker thread; raises a 503 :class:`HttpError` when the queue is full."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((run, future, time.perf_counter()), priority)
+        except asyncio.QueueFull:
+            self.stats.rejected += 1
+            METRICS.add("server.rejected")
+            raise _overloaded() from None
+        METRICS.depth("server.queue", self._queue.qsize())
+        return future
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            priority, (run, future, queued_at) = await self._queue.get()
+            METRICS.observe(f"server.wait.{priority}", time.perf_counter() - queued_at)
+            try:
+                if future.cancelled():
+                    continue  # the client went away while the job was queued
+                with METRICS.time("server.job"):
+                    result = await loop.run_in_executor(self._executor, run)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self._queue.done(priority)
+
+    # -- HTTP -------------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                request = await asyncio.wait_for(_read_head(reader), self.limits.read_timeout_sec)
+            except asyncio.TimeoutError:
+                raise HttpError(408, "Timed out reading the request") from None
+            if request is None:
+                return
+            self.stats.requests += 1
+            method, target, headers = request
+            url = urlsplit(target)
+            query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            routes = {"/health": ("GET", self._health), "/transcribe": ("POST", self._upload), "/stream": ("GET", self._stream)}
+            if url.path not in routes:
+                raise HttpError(404, f"No such endpoint: {url.path}")
+            expected, handler = routes[url.path]
+            if method != expected:
+                raise HttpError(405, f"{url.path} expects {expected}", {"Allow": expected})
+            await handler(reader, writer, headers, query)
+        except HttpError as exc:
+            if exc.status == 503:
+                logger.warning("Overloaded; refusing request")
+            await _respond_json(writer, exc.status, {"error": str(exc)}, exc.headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as exc:
+            logger.exception(f"Request failed: {exc}")
+            try:
+                await _respond_json(writer, 500, {"error": str(exc)})
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _health(self, reader, writer, headers, query) -> None:
+        await _respond_json(writer, 200, {
+            "status": "ok",
+            "queued": self._queue.qsize(),
+            "queue_size": self.limits.queue_size,
+            "concurrency": self.concurrency,
+            "open_streams": self._open_streams,
+            "max_streams": self.limits.max_streams,
+            **asdict(self.stats),
+        })
+
+    async def _upload(self, reader, writer, headers, query) -> None:
+        file_format = query.get("format", self.default_format)
+        if file_format not in WRITERS:
+            raise HttpError(400, f"Unsupported format {file_format!r}; expected one of {', '.join(WRITERS)}")
+        if "content-length" not in headers:
+            raise HttpError(411, "Content-Length is required")
+        try:
+            length = int(headers["content-length"])
+        except ValueError:
+            raise HttpError(400, "Bad Content-Length") from None
+        if length > self.limits.max_upload_bytes:
+            raise HttpError(413, f"Uploads are limited to {self.limits.max_upload_bytes} bytes")
+        # Shed load before receiving the body, not after
+        if self._queue.full():
+            self.stats.rejected += 1
+            METRICS.add("server.rejected")
+            raise _overloaded()
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), self.limits.read_timeout_sec)
+        except asyncio.TimeoutError:
+            raise HttpError(408, "Timed out reading the upload") from None
+
+        content_type = headers.get("content-type", "")
+        audio = _uploaded_file(body, content_type) if content_type.startswith("multipart/form-data") else body
+        if not audio:
+            raise HttpError(400, "Empty upload")
+        self.stats.uploads += 1
+        try:
+            transcript = await self._enqueue(lambda: self._transcribe_upload(audio), "batch")
+        except (RuntimeError, ValueError) as exc:
+            # soundfile reports undecodable input as a RuntimeError
+            raise HttpError(400, f"Could not transcribe the upload: {exc}") from None
+        document = format_transcript(transcript.segments, file_format).encode("utf-8")
+        await _respond(writer, 200, document, _CONTENT_TYPES[file_format], {
+            "X-Audio-Duration": f"{transcript.duration_sec:.3f}",
+            "X-Failed-Chunks": str(transcript.failed_chunks),
+        })
+
+    def _transcribe_upload(self, audio: bytes) -> FileTranscript:
+        fd, path = tempfile.mkstemp(suffix=".upload")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            return transcribe_file(path, self.transcriber, chunk_sec=self.chunk_sec, priority="batch")
+        finally:
+            os.unlink(path)
+
+    async def _stream(self, reader, writer, headers, query) -> None:
+        key = headers.get("sec-websocket-key")
+        if headers.get("upgrade", "").lower() != "websocket" or not key:
+            raise HttpError(400, "Expected a WebSocket upgrade")
+        sample_rate = _number(query, "sample_rate", 16000, 8000, 192000)
+        channels = _number(query, "channels", 1, 1, 8)
+        chunk_sec = _number(query, "chunk_sec", float(self.chunk_sec), 0.5, 30.0)
+        if self._open_streams >= self.limits.max_streams:
+            self.stats.rejected += 1
+            METRICS.add("server.rejected")
+            raise _overloaded()
+
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {_accept_key(key)}\r\n\r\n"
+        ).encode("latin-1"))
+        await writer.drain()
+        self.stats.streams += 1
+        self._open_streams += 1
+        try:
+            ws = WebSocket(reader, writer, self.limits.max_message_bytes)
+            await _StreamSession(self, ws, sample_rate, channels, chunk_sec).run()
+        finally:
+            self._open_streams -= 1
+
+
+class _StreamSession:
+    """One WebSocket stream: cut PCM into chunks, submit them and relay segments in order."""
+
+    def __init__(self, server: TranscriptionServer, ws: WebSocket, sample_rate: int, channels: int, chunk_sec: float):
+        self.server = server
+        self.ws = ws
+        self.chunker = PcmChunker(sample_rate, channels)
+        self.frame_bytes = self.chunker.frame_bytes
+        self.chunk_bytes = max(1, int(sample_rate * chunk_sec)) * self.frame_bytes
+        self.pending = bytearray()
+        self.segments = 0
+        self.dropped = 0
+        # (job future, segment queue) per chunk, in timeline order; None ends the stream
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.slots = asyncio.Semaphore(server.limits.stream_in_flight)
+        self.jobs: List[asyncio.Future] = []
+
+    async def run(self) -> None:
+        sender = asyncio.ensure_future(self._relay_all())
+        try:
+            while True:
+                message = await asyncio.wait_for(self.ws.receive(), self.server.limits.idle_timeout_sec)
+                if isinstance(message, bytes):
+                    await self._feed(message)
+                elif _is_end(message):
+                    break
+                else:
+                    await self.ws.send_json({"event": "error", "message": 'Expected PCM or {"event": "end"}'})
+            if self.pending:
+                await self._submit(bytes(self.pending), final=True)
+            await self.outbox.put(None)
+            await sender
+            await self.ws.close(1000)
+        except WebSocketClosed:
+            pass  # the client hung up; nothing more can be sent
+        except asyncio.TimeoutError:
+            await self.ws.close(1008, "Idle timeout")
+        except WebSocketError as exc:
+            await self.ws.close(exc.code, exc.reason)
+        finally:
+            sender.cancel()
+            for job in self.jobs:
+                job.cancel()
+
+    async def _feed(self, data: bytes) -> None:
+        self.pending += data
+        while len(self.pending) >= self.chunk_bytes:
+            pcm = bytes(self.pending[:self.chunk_bytes])
+            del self.pending[:self.chunk_bytes]
+            await self._submit(pcm)
+
+    async def _submit(self, pcm: bytes, final: bool = False) -> None:
+        pcm = pcm[:len(pcm) - len(pcm) % self.frame_bytes]
+        if not pcm:
+            return
+        offset_ms = self.chunker.offset_ms
+        chunk = self.chunker.chunk(pcm, final)
+        end_ms = self.chunker.offset_ms
+
+        # Backpressure: stop reading this socket while too many of its chunks are outstanding
+        await self.slots.acquire()
+        loop = asyncio.get_running_loop()
+        segments: asyncio.Queue = asyncio.Queue()
+        job = loop.create_future()
+        # Live chunks go straight to the worker pool; only uploads take executor threads
+        try:
+            future = self.server.transcriber.submit(
+                chunk,
+                timeout=self.server.limits.chunk_timeout_sec,
+                on_segment=lambda s: loop.call_soon_threadsafe(segments.put_nowait, s),
+                callback=lambda _: loop.call_soon_threadsafe(lambda: _settle(job, future)),
+                priority="live",
+            )
+        except RuntimeError as exc:
+            logger.warning(f"Dropping stream chunk: {exc}")
+            self.slots.release()
+            self.dropped += 1
+            self.server.stats.dropped_chunks += 1
+            await self.ws.send_json({"event": "dropped", "start": format_timestamp(offset_ms), "end": format_timestamp(end_ms)})
+            return
+        self.jobs.append(job)
+        await self.outbox.put((job, segments))
+
+    async def _relay_all(self) -> None:
+        while True:
+            item = await self.outbox.get()
+            if item is None:
+                break
+            job, segments = item
+            try:
+                await self._relay(job, segments)
+            finally:
+                self.slots.release()
+                self.jobs.remove(job)
+        await self.ws.send_json({
+            "event": "done",
+            "chunks": self.chunker.chunks,
+            "segments": self.segments,
+            "dropped_chunks": self.dropped,
+        })
+
+    async def _relay(self, job: asyncio.Future, segments: asyncio.Queue) -> None:
+        """Send the chunk's segments as they arrive, until its job is done."""
+        while not job.done():
+            getter = asyncio.ensure_future(segments.get())
+            await asyncio.wait((getter, job), return_when=asyncio.FIRST_COMPLETED)
+            if not getter.done():
+                getter.cancel()
+                break
+            await self._send_segment(getter.result())
+        # Segments are queued on the loop before the job completes, so none are left behind
+        while not segments.empty():
+            await self._send_segment(segments.get_nowait())
+        if not job.cancelled() and job.exception() is not None:
+            await self.ws.send_json({"event": "error", "message": str(job.exception())})
+
+    async def _send_segment(self, segment) -> None:
+        self.segments += 1
+        await self.ws.send_json(Segment.coerce(segment).to_dict())
+
+
+def _settle(job: asyncio.Future, future: Future) -> None:
+    """Copy the outcome of a finished transcriber future onto ``job`` unless it was cancelled."""
+    if job.done():
+        return
+    if future.exception() is not None:
+        job.set_exception(future.exception())
+    else:
+        job.set_result(future.result())
+
+
+def _is_end(message: str) -> bool:
+    try:
+        return json.loads(message).get("event") == "end"
+    except (ValueError, AttributeError):
+        return False
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str]]]:
+    """Read the request line and headers; None if the client closed without sending any."""
+    try:
+        raw = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise HttpError(431, "Request headers too large") from None
+    except asyncio.IncompleteReadError as exc:
+        if not exc.partial:
+            return None
+        raise HttpError(400, "Incomplete request") from None
+    lines = raw.decode("latin-1").split("\r\n")
+    try:
+        method, target, _version = lines[0].split(" ", 2)
+    except ValueError:
+        raise HttpError(400, "Malformed request line") from None
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise HttpError(400, "Malformed header")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+async def _respond(
+    writer: asyncio.StreamWriter,
+    status: int,
+    body: bytes,
+    content_type: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    lines = [
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        "Connection: close",
+    ]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+
+
+async def _respond_json(writer, status: int, value: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+    await _respond(writer, status, json.dumps(value).encode("utf-8"), "application/json", headers)
@@ -0,0 +1,145 @@
+"""vad.py -- Lightweight voice-activity detection ahead of whisper.cpp."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+
+from audio_chunk import AudioChunk
+
+
+@dataclass
+class VADStats:
+    """Running totals of how much audio the detector let through or dropped."""
+
+    chunks_total: int = 0
+    chunks_skipped: int = 0
+    audio_ms: int = 0
+    skipped_ms: int = 0
+
+    @property
+    def skipped_ratio(self) -> float:
+        return self.skipped_ms / self.audio_ms if self.audio_ms else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"VAD skipped {self.skipped_ms / 1000:.1f}s of {self.audio_ms / 1000:.1f}s audio "
+            f"({self.skipped_ratio:.0%}, {self.chunks_skipped}/{self.chunks_total} chunks)"
+        )
+
+
+class VoiceActivityDetector:
+    """
+    Energy plus zero-crossing-rate detector working on fixed-size frames.
+
+    A frame counts as speech when its level reaches ``threshold_db`` (dBFS),
+    or when it is within ``zcr_margin_db`` of it and its zero-crossing rate
+    is at least ``zcr_threshold`` (quiet fricatives). Speech is then widened
+    by ``pre_roll_ms`` before and ``hangover_ms`` after, and the hangover
+    carries over into the next chunk.
+
+    :meth:`process` returns ``None`` for silent chunks; otherwise it returns
+    the chunk trimmed to its speech span with ``offset_ms`` adjusted, so
+    segment times on the source timeline stay correct.
+    """
+
+    def __init__(
+        self,
+        threshold_db: float = -45.0,
+        zcr_threshold: float = 0.25,
+        zcr_margin_db: float = 10.0,
+        frame_ms: int = 20,
+        hangover_ms: int = 300,
+        pre_roll_ms: int = 100,
+    ) -> None:
+        self.threshold_db = threshold_db
+        self.zcr_threshold = zcr_threshold
+        self.zcr_margin_db = zcr_margin_db
+        self.frame_ms = frame_ms
+        self.hangover_ms = hangover_ms
+        self.pre_roll_ms = pre_roll_ms
+        self.stats = VADStats()
+        self._hangover_left = 0
+
+    def reset(self) -> None:
+        """Forget hangover state and statistics, e.g. before a new input."""
+        self.stats = VADStats()
+        self._hangover_left = 0
+
+    def speech_mask(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """Return a per-frame boolean speech mask for mono int16 ``samples``."""
+        frame_len = max(1, sample_rate * self.frame_ms // 1000)
+        n_frames = -(-len(samples) // frame_len)
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+
+        padded = np.zeros(n_frames * frame_len, dtype=np.float32)
+        padded[:len(samples)] = samples
+        frames = padded.reshape(n_frames, frame_len)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        level_db = 20.0 * np.log10(np.maximum(rms, 1e-9) / 32768.0)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / float(frame_len)
+
+        speech = (level_db >= self.threshold_db) | (
+            (level_db >= self.threshold_db - self.zcr_margin_db) & (zcr >= self.zcr_threshold)
+        )
+
+        hang = self.hangover_ms // self.frame_ms
+        pre = self.pre_roll_ms // self.frame_ms
+        mask = self._dilate(speech, before=pre, after=hang)
+
+        # Hangover left over from the previous chunk keeps its first frames open
+        carried = self._hangover_left
+        mask[:min(carried, n_frames)] = True
+
+        voiced = np.flatnonzero(speech)
+        left = hang - (n_frames - 1 - int(voiced[-1])) if len(voiced) else 0
+        self._hangover_left = max(0, left, carried - n_frames)
+        return mask
+
+    @staticmethod
+    def _dilate(mask: np.ndarray, before: int, after: int) -> np.ndarray:
+        """Widen every True run by ``before`` frames on the left and ``after`` on the right."""
+        if not mask.any() or (before == 0 and after == 0):
+            return mask
+        counts = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+        idx = np.arange(len(mask))
+        lo = np.clip(idx - after, 0, len(mask))
+        hi = np.clip(idx + before + 1, 0, len(mask))
+        return (counts[hi] - counts[lo]) > 0
+
+    def process(self, chunk: AudioChunk) -> Optional[AudioChunk]:
+        """Drop a silent chunk (``None``) or trim it to its speech span."""
+        samples = np.frombuffer(chunk.pcm, dtype="<i2")
+        if chunk.channels > 1:
+            samples = samples.reshape(-1, chunk.channels).mean(axis=1)
+
+        duration_ms = chunk.num_frames * 1000 // chunk.sample_rate
+        self.stats.chunks_total += 1
+        self.stats.audio_ms += duration_ms
+
+        mask = self.speech_mask(samples, chunk.sample_rate)
+        voiced = np.flatnonzero(mask)
+        if len(voiced) == 0:
+            self.stats.chunks_skipped += 1
+            self.stats.skipped_ms += duration_ms
+            return None
+
+        frame_len = max(1, chunk.sample_rate * self.frame_ms // 1000)
+        start = int(voiced[0]) * frame_len
+        end = min((int(voiced[-1]) + 1) * frame_len, chunk.num_frames)
+        if start == 0 and end == chunk.num_frames:
+            return chunk
+
+        bytes_per_frame = 2 * chunk.channels
+        start_ms = start * 1000 // chunk.sample_rate
+        self.stats.skipped_ms += duration_ms - (end - start) * 1000 // chunk.sample_rate
+        return replace(
+            chunk,
+            pcm=chunk.pcm[start * bytes_per_frame:end * bytes_per_frame],
+            offset_ms=chunk.offset_ms + start_ms,
+        )
@@ -0,0 +1,127 @@
+"""wav_mmap.py -- Zero-copy access to 16-bit PCM WAV files through a memory map."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator, Optional, Tuple
+
+import numpy as np
+
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def _find_pcm16_data(f: BinaryIO, file_size: int) -> Optional[Tuple[int, int, int, int]]:
+    """Return ``(samplerate, channels, data_offset, data_bytes)`` or None if not plain PCM16."""
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return None
+
+    fmt = None
+    while True:
+        chunk_header = f.read(8)
+        if len(chunk_header) < 8:
+            return None
+        chunk_id, size = chunk_header[:4], struct.unpack("<I", chunk_header[4:])[0]
+        if chunk_id == b"fmt ":
+            body = f.read(size)
+            if len(body) < 16:
+                return None
+            audio_format, channels, samplerate, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+            if audio_format == _WAVE_FORMAT_EXTENSIBLE and len(body) >= 26:
+                audio_format = struct.unpack("<H", body[24:26])[0]
+            fmt = (audio_format, channels, samplerate, block_align, bits)
+            if size % 2:
+                f.seek(1, os.SEEK_CUR)
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            audio_format, channels, samplerate, block_align, bits = fmt
+            if audio_format != _WAVE_FORMAT_PCM or bits != 16 or channels < 1 or block_align != 2 * channels:
+                return None
+            offset = f.tell()
+            # Streamed or oversized WAVs may carry a placeholder length
+            size = min(size, file_size - offset)
+            return samplerate, channels, offset, size - size % block_align
+        else:
+            f.seek(size + size % 2, os.SEEK_CUR)
+
+
+class MappedWav:
+    """
+    A PCM16 WAV file mapped read-only into memory.
+
+    :meth:`blocks` mirrors the parts of ``SoundFile.blocks`` used for
+    transcription, but yields numpy views straight into the mapping instead
+    of decoding into new arrays. Pages behind the read position are handed
+    back to the OS as reading advances, so resident memory stays flat even
+    for multi-gigabyte recordings.
+    """
+
+    def __init__(self, path: str, samplerate: int, channels: int, offset: int, size: int) -> None:
+        self.path = path
+        self.samplerate = samplerate
+        self.channels = channels
+        self.frames = size // (2 * channels)
+        self._offset = offset
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._samples = np.frombuffer(
+            self._mmap, dtype="<i2", count=self.frames * channels, offset=offset
+        ).reshape(self.frames, channels)
+
+    def blocks(
+        self, blocksize: int, overlap: int = 0, dtype: str = "int16", always_2d: bool = False
+    ) -> Iterator[np.ndarray]:
+        """Yield ``blocksize``-frame views that start every ``blocksize - overlap`` frames."""
+        if dtype != "int16":
+            raise ValueError("MappedWav only yields int16 blocks")
+        samples = self._samples if always_2d or self.channels > 1 else self._samples[:, 0]
+        step = max(1, blocksize - overlap)
+        pos = 0
+        while pos < self.frames:
+            end = min(pos + blocksize, self.frames)
+            yield samples[pos:end]
+            if end == self.frames:
+                break
+            self._release(pos)
+            pos += step
+
+    def _release(self, frame: int) -> None:
+        """Drop mapped pages wholly before ``frame``; they are re-read if touched again."""
+        if not hasattr(self._mmap, "madvise") or not hasattr(mmap, "MADV_DONTNEED"):
+            return
+        end = (self._offset + frame * 2 * self.channels) // mmap.PAGESIZE * mmap.PAGESIZE
+        if end > 0:
+            try:
+                self._mmap.madvise(mmap.MADV_DONTNEED, 0, end)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        self._samples = None
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # views are still in flight; the mapping is released with them
+
+    def __enter__(self) -> "MappedWav":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def map_pcm_wav(path: str) -> Optional[MappedWav]:
+    """Map ``path`` if it is an uncompressed 16-bit PCM WAV; otherwise return None."""
+    try:
+        file_size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            found = _find_pcm16_data(f, file_size)
+        if found is None or found[3] == 0:
+            return None
+        return MappedWav(path, *found)
+    except (OSError, ValueError, struct.error):
+        return None
@@ -0,0 +1,387 @@
+"""worker_pool.py -- Long-lived transcription workers for WhisperLite."""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from metrics import METRICS
+
+logger = logging.getLogger("WorkerPool")
+
+SegmentCallback = Callable[[List[Dict]], None]
+
+# Priority classes, most urgent first
+PRIORITIES = ("live", "interactive", "batch")
+DEFAULT_PRIORITY = "interactive"
+
+# Niceness of whisper.cpp processes doing batch work
+BACKGROUND_NICE = 10
+
+_current = threading.local()
+
+
+class FifoScheduler:
+    """Hand out tasks strictly in submission order, whatever stream they belong to.
+
+    Schedulers decide which queued task a free worker takes next. ``put``
+    queues a task under a stream ``key``; ``get`` blocks until a task is
+    available and returns ``None`` once the scheduler is closed and empty.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._closed = False
+        self._size = 0
+        self._tasks: Deque[Any] = deque()
+
+    def put(self, task: Any, key: Hashable = None) -> None:
+        with self._cond:
+            self._push(task, key)
+            self._size += 1
+            self._cond.notify()
+
+    def get(self) -> Optional[Any]:
+        with self._cond:
+            while not self._size or not self._available():
+                if self._closed and not self._size:
+                    return None
+                self._cond.wait()
+            self._size -= 1
+            return self._pop()
+
+    def task_done(self, task: Any) -> None:
+        """Called by the pool once a task handed out by ``get`` has finished."""
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size
+
+    def close(self) -> None:
+        """Let ``get`` return ``None`` once the remaining tasks are handed out."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def _available(self) -> bool:
+        return True
+
+    def _push(self, task: Any, key: Hashable) -> None:
+        self._tasks.append(task)
+
+    def _pop(self) -> Any:
+        return self._tasks.popleft()
+
+
+class DeficitScheduler(FifoScheduler):
+    """Share workers fairly between streams with deficit round robin.
+
+    Each stream with queued work gets a turn in rotation and may spend
+    ``quantum`` of cost per turn; unspent credit carries over while the
+    stream stays busy. ``cost(task)`` defaults to the task's audio length
+    in seconds, so a stream sending long chunks gets the same share of
+    worker time as one sending short chunks, and a stream with a backlog
+    cannot hold up streams that only have a chunk or two waiting. Tasks of
+    one stream stay in submission order.
+    """
+
+    def __init__(self, quantum: float = 1.5, cost: Optional[Callable[[Any], float]] = None) -> None:
+        super().__init__()
+        self.quantum = quantum
+        self.cost = cost or _audio_seconds
+        self._queues: "OrderedDict[Hashable, Deque[Any]]" = OrderedDict()
+        self._deficit: Dict[Hashable, float] = {}
+
+    def _push(self, task: Any, key: Hashable) -> None:
+        if key not in self._queues:
+            self._queues[key] = deque()
+            self._deficit[key] = self.quantum  # a newly active stream starts its turn at the back
+        self._queues[key].append(task)
+
+    def _pop(self) -> Any:
+        while True:
+            key, tasks = next(iter(self._queues.items()))
+            cost = self.cost(tasks[0])
+            if self._deficit[key] >= cost:
+                self._deficit[key] -= cost
+                task = tasks.popleft()
+                if not tasks:
+                    # An idle stream keeps no credit
+                    del self._queues[key]
+                    del self._deficit[key]
+                return task
+            self._deficit[key] += self.quantum
+            self._queues.move_to_end(key)
+
+
+class RoundRobinScheduler(DeficitScheduler):
+    """One task per stream per turn, regardless of chunk length."""
+
+    def __init__(self) -> None:
+        super().__init__(quantum=1.0, cost=lambda task: 1.0)
+
+
+SCHEDULERS = {"fifo": FifoScheduler, "round-robin": RoundRobinScheduler, "deficit": DeficitScheduler}
+
+
+def make_scheduler(name: str) -> FifoScheduler:
+    """Build a scheduler by name ('fifo', 'round-robin' or 'deficit')."""
+    try:
+        return SCHEDULERS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown scheduler {name!r}; expected one of {', '.join(SCHEDULERS)}") from None
+
+
+class PriorityScheduler(FifoScheduler):
+    """Serve tasks by priority class: live, then interactive, then batch.
+
+    With ``mode="strict"`` a free worker always takes the most urgent class
+    that has work, so batch tasks only start while nothing else is waiting.
+    With ``mode="weighted"`` classes share workers in proportion to
+    ``weights`` (smooth weighted round robin), so batch work keeps moving
+    under a steady live load. ``batch_limit`` caps how many batch tasks run
+    at once, keeping the other workers free for live chunks the moment they
+    arrive; a running task is never interrupted. Within a class, streams
+    are shared by a scheduler from ``make_scheduler`` (deficit by default).
+    """
+
+    def __init__(
+        self,
+        mode: str = "strict",
+        weights: Optional[Dict[str, float]] = None,
+        batch_limit: Optional[int] = None,
+        scheduler: str = "deficit",
+        priority_of: Optional[Callable[[Any], str]] = None,
+    ) -> None:
+        if mode not in ("strict", "weighted"):
+            raise ValueError(f"Unknown priority mode {mode!r}; expected 'strict' or 'weighted'")
+        super().__init__()
+        self.mode = mode
+        self.weights = dict(weights or {"live": 8.0, "interactive": 4.0, "batch": 1.0})
+        self.batch_limit = batch_limit
+        self.priority_of = priority_of or _task_priority
+        self._classes = {priority: make_scheduler(scheduler) for priority in PRIORITIES}
+        self._queued = dict.fromkeys(PRIORITIES, 0)
+        self._running = dict.fromkeys(PRIORITIES, 0)
+        self._credit = dict.fromkeys(PRIORITIES, 0.0)
+
+    def task_done(self, task: Any) -> None:
+        with self._cond:
+            self._running[self.priority_of(task)] -= 1
+            self._cond.notify_all()
+
+    def _eligible(self) -> List[str]:
+        return [
+            priority for priority in PRIORITIES
+            if self._queued[priority]
+            and not (priority == "batch" and self.batch_limit is not None and self._running["batch"] >= self.batch_limit)
+        ]
+
+    def _available(self) -> bool:
+        return bool(self._eligible())
+
+    def _push(self, task: Any, key: Hashable) -> None:
+        priority = self.priority_of(task)
+        self._classes[priority]._push(task, key)
+        self._queued[priority] += 1
+
+    def _pop(self) -> Any:
+        eligible = self._eligible()
+        if self.mode == "strict":
+            chosen = eligible[0]
+        else:
+            total = 0.0
+            for priority in eligible:
+                self._credit[priority] += self.weights[priority]
+                total += self.weights[priority]
+            chosen = max(eligible, key=lambda priority: self._credit[priority])  # ties go to the more urgent class
+            self._credit[chosen] -= total
+        self._queued[chosen] -= 1
+        self._running[chosen] += 1
+        return self._classes[chosen]._pop()
+
+
+def current_priority() -> str:
+    """Priority class of the task the calling pool thread is working on."""
+    return getattr(_current, "priority", DEFAULT_PRIORITY)
+
+
+def background_command(cmd: List[str]) -> List[str]:
+    """Prefix ``cmd`` with ``nice`` (and ``ionice -c 3`` on Linux) so it yields CPU and disk to other work."""
+    if os.name != "posix" or os.getpriority(os.PRIO_PROCESS, 0) >= BACKGROUND_NICE:
+        return cmd  # already running in the background; children inherit it
+    prefix = []
+    nice = shutil.which("nice")
+    if nice:
+        prefix += [nice, "-n", str(BACKGROUND_NICE)]
+    ionice = shutil.which("ionice") if sys.platform.startswith("linux") else None
+    if ionice:
+        prefix += [ionice, "-c", "3"]
+    return prefix + cmd
+
+
+def lower_process_priority() -> None:
+    """Move this process, and the whisper.cpp processes it starts later, to background CPU and I/O priority."""
+    if os.name != "posix":
+        return
+    os.nice(max(0, BACKGROUND_NICE - os.nice(0)))
+    ionice = shutil.which("ionice") if sys.platform.startswith("linux") else None
+    if ionice:
+        subprocess.run(
+            [ionice, "-c", "3", "-p", str(os.getpid())],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False,
+        )
+    logger.info(f"Running at background priority (nice {os.nice(0)})")
+
+
+def _audio_seconds(task: Any) -> float:
+    # Tasks are the pool's tuples; chunks given as file paths count as one second
+    return getattr(task[2], "duration_sec", 1.0)
+
+
+def _task_priority(task: Any) -> str:
+    return task[7]
+
+
+class TranscriptionPool:
+    """Fan transcription requests out to a fixed set of long-lived backends.
+
+    Every backend is driven by its own thread and must provide
+    ``transcribe(chunk, timeout) -> List[Dict]`` (and optionally ``close()``).
+    Futures resolve as soon as their backend finishes, but callbacks are
+    always invoked in submission order so consumers such as
+    :class:`TranscriptBuffer` see segments in the order the audio arrived.
+
+    Chunks may be submitted for different ``stream`` keys. The ``scheduler``
+    (FIFO by default, see :class:`DeficitScheduler`) picks which stream a
+    free worker serves next, and callback order is kept per stream, so one
+    stream's backlog never delays another stream's results.
+    """
+
+    def __init__(
+        self, backends: Sequence[Any], timeout: float = 10.0, scheduler: Optional[FifoScheduler] = None
+    ) -> None:
+        if not backends:
+            raise ValueError("TranscriptionPool needs at least one backend")
+        self.timeout = timeout
+        self._backends = list(backends)
+        self._tasks = scheduler if scheduler is not None else FifoScheduler()
+        self._seqs: Dict[Hashable, "itertools.count[int]"] = {}
+        self._submit_lock = threading.Lock()
+        self._closed = False
+
+        # Reorder buffers: finished results wait here until all earlier ones of their stream are
+        # delivered. Each stream has its own lock, so a slow callback only holds up its own stream.
+        self._delivery_locks: Dict[Hashable, threading.Lock] = {}
+        self._next_delivery: Dict[Hashable, int] = {}
+        self._ready: Dict[Hashable, Dict[int, Tuple[Optional[SegmentCallback], List[Dict]]]] = {}
+
+        self._threads: List[threading.Thread] = []
+        for idx, backend in enumerate(self._backends):
+            thread = threading.Thread(
+                target=self._run, args=(backend,), name=f"whisper-worker-{idx}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    @property
+    def size(self) -> int:
+        """Number of backends serving this pool."""
+        return len(self._backends)
+
+    def submit(
+        self,
+        chunk: Any,
+        callback: Optional[SegmentCallback] = None,
+        timeout: Optional[float] = None,
+        stream: Hashable = None,
+        priority: str = DEFAULT_PRIORITY,
+    ) -> Future:
+        """Queue ``chunk`` for transcription and return a future for its segments.
+
+        ``callback`` receives the segment list (``[]`` on failure) once every
+        chunk previously submitted for the same ``stream`` has been delivered.
+        ``priority`` is one of :data:`PRIORITIES`; it only changes the order
+        of work with a :class:`PriorityScheduler`.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}; expected one of {', '.join(PRIORITIES)}")
+        future: Future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("TranscriptionPool is closed")
+            if stream not in self._seqs:
+                self._seqs[stream] = itertools.count()
+                self._next_delivery[stream] = 0
+                self._ready[stream] = {}
+                self._delivery_locks[stream] = threading.Lock()
+            seq = next(self._seqs[stream])
+            task = (stream, seq, chunk, timeout or self.timeout, callback, future, time.perf_counter(), priority)
+            self._tasks.put(task, stream)
+            if METRICS.enabled:
+                METRICS.depth("pool.pending", self._tasks.qsize())
+        return future
+
+    def close(self) -> None:
+        """Finish queued work, stop worker threads and release the backends."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._tasks.close()
+        for thread in self._threads:
+            thread.join()
+        for backend in self._backends:
+            close = getattr(backend, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as exc:
+                    logger.error(f"Failed to close backend {backend!r}: {exc}")
+
+    def _run(self, backend: Any) -> None:
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            stream, seq, chunk, timeout, callback, future, queued_at, priority = task
+            waited = time.perf_counter() - queued_at
+            METRICS.observe("pool.wait", waited)
+            METRICS.observe(f"pool.wait.{priority}", waited)
+            # Backends that start processes read this to run batch work in the background
+            _current.priority = priority
+            try:
+                with METRICS.time("pool.transcribe"):
+                    segments = backend.transcribe(chunk, timeout)
+                future.set_result(segments)
+            except Exception as exc:
+                logger.error(f"Transcription failed for chunk {chunk!r}: {exc}")
+                segments = []
+                future.set_exception(exc)
+            finally:
+                _current.priority = DEFAULT_PRIORITY
+                self._tasks.task_done(task)
+            self._deliver(stream, seq, callback, segments)
+
+    def _deliver(self, stream: Hashable, seq: int, callback: Optional[SegmentCallback], segments: List[Dict]) -> None:
+        ready = self._ready[stream]
+        with self._delivery_locks[stream]:
+            ready[seq] = (callback, segments)
+            while self._next_delivery[stream] in ready:
+                cb, result = ready.pop(self._next_delivery[stream])
+                self._next_delivery[stream] += 1
+                if cb is None:
+                    continue
+                try:
+                    cb(result)
+                except Exception as exc:
+                    logger.exception(f"Segment callback failed: {exc}")
@@ -0,0 +1,105 @@
+import asyncio
+import stat
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from async_transcriber import AsyncWhisperTranscriber
+from audio_chunk import AudioChunk
+
+FAKE_WHISPER = Path(__file__).resolve().parents[1] / "benchmarks" / "fake_whisper.py"
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="uses a shell wrapper around the fake binary")
+
+
+@pytest.fixture
+def transcriber_factory(tmp_path, monkeypatch):
+    monkeypatch.setenv("FAKE_WHISPER_LOAD_SEC", "0")
+    monkeypatch.setenv("FAKE_WHISPER_RTF", "0.1")
+    binary = tmp_path / "main"
+    binary.write_text(f"#!/bin/sh\nexec \"{sys.executable}\" \"{FAKE_WHISPER}\" \"$@\"\n")
+    binary.chmod(binary.stat().st_mode | stat.S_IEXEC)
+    model = tmp_path / "model.bin"
+    model.touch()
+    return lambda **kwargs: AsyncWhisperTranscriber(str(model), whisper_bin=str(binary), **kwargs)
+
+
+def seconds_of_audio(seconds, index=1, offset_ms=0):
+    return AudioChunk(index, b"\x00\x00" * int(16000 * seconds), offset_ms=offset_ms)
+
+
+def test_stream_yields_segments_on_source_timeline(transcriber_factory):
+    transcriber = transcriber_factory()
+
+    async def run():
+        return [s async for s in transcriber.stream(seconds_of_audio(3, offset_ms=5000))]
+
+    segments = asyncio.run(run())
+    assert [s["start"] for s in segments] == ["00:00:05.000", "00:00:06.000", "00:00:07.000"]
+    assert all(s.text for s in segments)
+
+
+def test_stream_marks_each_chunk_transcribed_once(transcriber_factory, monkeypatch):
+    from tracing import TRACER, ChunkTrace
+    monkeypatch.setattr(TRACER, "enabled", True)
+    transcriber = transcriber_factory()
+    chunk = AudioChunk(1, b"\x00\x00" * 16000 * 3, trace=ChunkTrace(1))
+
+    async def run():
+        return [s async for s in transcriber.stream(chunk)]
+
+    segments = asyncio.run(run())
+    assert len(segments) == 3 and all(s.trace is chunk.trace for s in segments)
+    assert [stage for stage, _ in chunk.trace.marks].count("transcribed") == 1
+
+
+def test_concurrency_limit_queues_extra_calls(transcriber_factory):
+    transcriber = transcriber_factory(concurrency=1)
+    finished = {}
+
+    async def one(i):
+        await transcriber.transcribe(seconds_of_audio(2, index=i))
+        finished[i] = time.monotonic()
+
+    async def run():
+        start = time.monotonic()
+        await asyncio.gather(one(1), one(2))
+        return start
+
+    start = asyncio.run(run())
+    # Each call takes at least 0.2 s of simulated inference; the second waits for the first
+    assert max(finished.values()) - start >= 0.4
+
+
+def test_cancellation_kills_the_process(transcriber_factory):
+    transcriber = transcriber_factory()
+
+    async def run():
+        task = asyncio.ensure_future(transcriber.transcribe(seconds_of_audio(30)))
+        while not transcriber._processes:
+            await asyncio.sleep(0.01)
+        process = next(iter(transcriber._processes))
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return process
+
+    process = asyncio.run(run())
+    assert process.returncode is not None
+    assert not transcriber._processes
+
+
+def test_deadline_keeps_segments_produced_in_time(transcriber_factory):
+    transcriber = transcriber_factory()
+
+    async def run():
+        return await transcriber.transcribe(seconds_of_audio(30), timeout=0.5)
+
+    start = time.monotonic()
+    segments = asyncio.run(run())
+    assert time.monotonic() - start < 2.5
+    assert len(segments) < 30
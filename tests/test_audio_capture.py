@@ -12,3 +12,90 @@ def test_audio_capture_chunk_size():
 def test_audio_capture_initialization():
     # TODO: Implement unit tests for audio_capture module
     assert True
+
+
+def test_in_memory_mode_queues_audio_chunks():
+    import numpy as np
+    from audio_chunk import AudioChunk
+
+    ac = AudioCapture(chunk_duration_sec=0.5, sample_rate=8000, in_memory=True)
+    block = np.ones((6000, 1), dtype="int16")
+    ac._callback(block, len(block), None, None)
+
+    chunk = ac.get_chunk(block=False)
+    assert isinstance(chunk, AudioChunk)
+    assert chunk.index == 1
+    assert chunk.num_frames == 4000
+    assert ac.get_chunk(block=False) is None
+    assert ac.get_last_chunk_path() is None
+
+
+def test_vad_drops_silent_chunks_before_queueing():
+    import numpy as np
+    from vad import VoiceActivityDetector
+
+    ac = AudioCapture(chunk_duration_sec=0.5, sample_rate=8000, in_memory=True, vad=VoiceActivityDetector())
+    ac._callback(np.zeros((4000, 1), dtype="int16"), 4000, None, None)
+    tone = (8000 * np.sin(np.arange(4000) / 3.0)).astype("int16").reshape(-1, 1)
+    ac._callback(tone, 4000, None, None)
+
+    chunk = ac.get_chunk(block=False)
+    assert chunk.index == 2
+    assert chunk.offset_ms == 500
+    assert ac.get_chunk(block=False) is None
+
+
+def test_hop_produces_overlapping_chunks():
+    import numpy as np
+
+    ac = AudioCapture(chunk_duration_sec=1.0, sample_rate=8000, in_memory=True, hop_sec=0.5)
+    samples = np.arange(16000, dtype="int16").reshape(-1, 1)
+    ac._callback(samples, len(samples), None, None)
+
+    chunks = [ac.get_chunk(block=False) for _ in range(3)]
+    assert [c.offset_ms for c in chunks] == [0, 500, 1000]
+    first = np.frombuffer(chunks[0].pcm, dtype="int16")
+    second = np.frombuffer(chunks[1].pcm, dtype="int16")
+    assert second[0] == first[4000]
+    assert ac.get_chunk(block=False) is None
+
+
+def test_chunks_are_tagged_with_capture_time(mocker):
+    import numpy as np
+
+    mocker.patch("audio_capture.time.monotonic", return_value=100.0)
+    ac = AudioCapture(chunk_duration_sec=0.5, sample_rate=8000, in_memory=True)
+    block = np.ones((6000, 1), dtype="int16")
+    ac._callback(block, len(block), None, None)
+
+    chunk = ac.get_chunk(block=False)
+    assert chunk.trace.chunk_id == 1
+    # 2000 frames arrived after the chunk's last sample, i.e. 250 ms later
+    assert chunk.trace.captured_at == 99.75
+
+
+def test_bounded_queue_drops_oldest_chunks():
+    import numpy as np
+
+    ac = AudioCapture(chunk_duration_sec=0.5, sample_rate=8000, in_memory=True, queue_size=2, overflow="drop-oldest")
+    block = np.ones((4000 * 5, 1), dtype="int16")
+    ac._callback(block, len(block), None, None)
+
+    assert [ac.get_chunk(block=False).index for _ in range(2)] == [4, 5]
+    assert ac.queue_stats.chunks_dropped == 3
+    assert ac.queue_stats.dropped_sec == 1.5
+
+
+def test_chunk_duration_can_change_while_capturing():
+    import numpy as np
+
+    ac = AudioCapture(chunk_duration_sec=1.0, sample_rate=8000, in_memory=True, hop_sec=0.75)
+    ac.set_chunk_duration(0.5)
+    assert (ac.frames_per_chunk, ac.frames_per_hop) == (4000, 2000)  # overlap stays 2000 frames
+
+    block = np.ones((8000, 1), dtype="int16")
+    ac._callback(block, len(block), None, None)
+    offsets = []
+    while (chunk := ac.get_chunk(block=False)) is not None:
+        offsets.append((chunk.offset_ms, chunk.num_frames))
+    assert offsets == [(0, 4000), (250, 4000), (500, 4000)]
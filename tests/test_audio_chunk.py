@@ -0,0 +1,29 @@
+import io
+import sys
+import wave
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from audio_chunk import AudioChunk
+
+
+def test_duration_and_frames():
+    chunk = AudioChunk(1, b"\x00\x00" * 8000, sample_rate=16000, channels=1)
+    assert chunk.num_frames == 8000
+    assert chunk.duration_sec == 0.5
+
+
+def test_stereo_frame_count():
+    chunk = AudioChunk(1, b"\x00\x00" * 3200, sample_rate=16000, channels=2)
+    assert chunk.num_frames == 1600
+
+
+def test_to_wav_bytes_roundtrip():
+    pcm = bytes(range(256)) * 4
+    chunk = AudioChunk(7, pcm, sample_rate=8000, channels=1)
+    with wave.open(io.BytesIO(chunk.to_wav_bytes()), "rb") as wf:
+        assert wf.getframerate() == 8000
+        assert wf.getnchannels() == 1
+        assert wf.getsampwidth() == 2
+        assert wf.readframes(wf.getnframes()) == pcm
@@ -0,0 +1,116 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from batch import JobLedger, SUMMARY_FILENAME, discover_inputs, run_batch
+
+
+class FakeTranscriber:
+    concurrency = 2
+
+    def __init__(self):
+        self.calls = 0
+
+    def submit(self, chunk, priority="interactive"):
+        from concurrent.futures import Future
+        self.calls += 1
+        future = Future()
+        future.set_result([{"start": "00:00:00.000", "end": "00:00:01.000", "text": f"chunk {chunk.index}"}])
+        return future
+
+
+def _write_wav(path, seconds=2.0):
+    sf.write(str(path), np.zeros((int(16000 * seconds), 1), dtype="int16"), 16000)
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    _write_wav(src / "a.wav")
+    _write_wav(src / "b.wav", seconds=1.0)
+    (src / "notes.txt").write_text("not audio")
+    return src
+
+
+def test_discover_directory(audio_dir):
+    inputs = discover_inputs(str(audio_dir))
+    assert [os.path.basename(p) for p in inputs] == ["a.wav", "b.wav"]
+
+
+def test_discover_manifest(audio_dir, tmp_path):
+    manifest = tmp_path / "list.txt"
+    manifest.write_text("# nightly\nin/b.wav\n\nin/a.wav  # first\n")
+    inputs = discover_inputs(str(manifest))
+    assert [os.path.basename(p) for p in inputs] == ["a.wav", "b.wav"]
+
+
+def test_discover_glob(audio_dir):
+    inputs = discover_inputs(str(audio_dir / "a*.wav"))
+    assert [os.path.basename(p) for p in inputs] == ["a.wav"]
+
+
+def test_discover_glob_without_matches(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        discover_inputs(str(tmp_path / "*.flac"))
+
+
+def test_run_batch_writes_transcripts_and_summary(audio_dir, tmp_path):
+    out = tmp_path / "out"
+    summary = run_batch(discover_inputs(str(audio_dir)), FakeTranscriber(), str(out), "json", "tester")
+
+    assert summary["totals"]["transcribed"] == 2
+    assert summary["totals"]["audio_sec"] == 3.0
+    assert json.loads((out / "a.json").read_text())[1]["text"] == "chunk 2"
+    on_disk = json.loads((out / SUMMARY_FILENAME).read_text())
+    assert [f["status"] for f in on_disk["files"]] == ["ok", "ok"]
+    assert on_disk["files"][0]["rtf"] is not None
+
+
+def test_run_batch_resumes_from_ledger(audio_dir, tmp_path):
+    out = tmp_path / "out"
+    inputs = discover_inputs(str(audio_dir))
+    run_batch(inputs, FakeTranscriber(), str(out), "txt", "tester")
+
+    again = FakeTranscriber()
+    summary = run_batch(inputs, again, str(out), "txt", "tester")
+    assert again.calls == 0
+    assert summary["totals"]["skipped"] == 2
+
+    # A modified file is transcribed again
+    _write_wav(audio_dir / "b.wav", seconds=1.5)
+    third = FakeTranscriber()
+    summary = run_batch(inputs, third, str(out), "txt", "tester")
+    assert summary["totals"]["transcribed"] == 1
+    assert third.calls == 1
+
+
+def test_failed_file_is_reported_and_retried(audio_dir, tmp_path):
+    out = tmp_path / "out"
+    broken = audio_dir / "broken.wav"
+    broken.write_bytes(b"not a wav")
+    inputs = discover_inputs(str(audio_dir))
+
+    summary = run_batch(inputs, FakeTranscriber(), str(out), "txt", "tester")
+    failed = [f for f in summary["files"] if f["status"] == "failed"]
+    assert [os.path.basename(f["input"]) for f in failed] == ["broken.wav"]
+    assert failed[0]["error"]
+
+    ledger = JobLedger(str(out / ".whisperlite_batch.jsonl"))
+    assert not ledger.is_done(str(broken))
+    assert ledger.is_done(str(audio_dir / "a.wav"))
+
+
+def test_ledger_ignores_torn_line(tmp_path):
+    path = tmp_path / "ledger.jsonl"
+    path.write_text('{"input": "/x.wav", "status": "ok"}\n{"input": "/y.w')
+    ledger = JobLedger(str(path))
+    assert ledger.get("/x.wav")["status"] == "ok"
+    assert ledger.get("/y.wav") is None
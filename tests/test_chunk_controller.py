@@ -0,0 +1,68 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from chunk_controller import ChunkController
+
+
+def feed(controller, overhead, rtf, lengths):
+    for length in lengths:
+        controller.record(length, overhead + rtf * length)
+
+
+def test_invalid_bounds_rejected():
+    with pytest.raises(ValueError):
+        ChunkController(min_sec=3.0, max_sec=2.0)
+
+
+def test_fit_separates_overhead_from_per_second_cost():
+    controller = ChunkController()
+    feed(controller, 0.3, 0.2, [1.0, 2.0, 1.5, 3.0, 1.2, 2.5] * 5)
+    overhead, rtf = controller.estimate
+    assert overhead == pytest.approx(0.3, abs=1e-6)
+    assert rtf == pytest.approx(0.2, abs=1e-6)
+
+
+def test_headroom_leads_to_shortest_sustainable_chunks():
+    controller = ChunkController(initial_sec=4.0, min_sec=0.5, max_sec=8.0)
+    feed(controller, 0.3, 0.2, [1.0, 2.0, 3.0, 4.0] * 5)
+    for _ in range(30):
+        duration = controller.update()
+    # overhead / (target_load - rtf) = 0.3 / 0.6
+    assert duration == pytest.approx(0.5)
+    assert controller.longest_sec == 4.0
+
+
+def test_more_workers_allow_shorter_chunks():
+    single = ChunkController(initial_sec=2.0, min_sec=0.2, concurrency=1)
+    pooled = ChunkController(initial_sec=2.0, min_sec=0.2, concurrency=4)
+    for controller in (single, pooled):
+        feed(controller, 1.0, 0.3, [1.0, 2.0, 3.0] * 5)
+        for _ in range(30):
+            controller.update()
+    assert pooled.duration_sec < single.duration_sec
+
+
+def test_falling_behind_moves_to_longer_chunks_gradually():
+    controller = ChunkController(initial_sec=1.0, min_sec=1.0, max_sec=8.0)
+    feed(controller, 0.5, 0.9, [1.0, 2.0] * 5)
+    assert controller.update() == 1.25  # at most 25% per step
+    for _ in range(30):
+        controller.update()
+    assert controller.duration_sec == 8.0
+
+
+def test_backlog_lengthens_chunks_even_when_model_has_headroom():
+    controller = ChunkController(initial_sec=2.0, min_sec=1.0, max_sec=8.0)
+    feed(controller, 0.0, 0.1, [2.0] * 5)
+    assert controller.update(backlog=3) == 2.5
+    assert controller.update(backlog=0) < 2.5
+
+
+def test_no_data_keeps_initial_duration():
+    controller = ChunkController(initial_sec=1.5)
+    assert controller.update(backlog=5) == 1.5
+    assert "final 1.50s" in controller.summary()
@@ -0,0 +1,130 @@
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from audio_chunk import AudioChunk
+from chunk_queue import ChunkQueue, coalesce_chunks
+from tracing import ChunkTrace
+
+
+def make_chunk(index, start_ms, ms=1000, rate=1000, value=None):
+    frames = ms * rate // 1000
+    sample = (index if value is None else value).to_bytes(2, "little", signed=True)
+    return AudioChunk(index, sample * frames, rate, 1, start_ms)
+
+
+def drain(q):
+    items = []
+    while True:
+        try:
+            items.append(q.get(block=False))
+        except queue.Empty:
+            return items
+
+
+def test_unknown_policy_rejected():
+    with pytest.raises(ValueError):
+        ChunkQueue(2, "newest-first")
+
+
+def test_unbounded_queue_keeps_everything():
+    q = ChunkQueue()
+    for i in range(10):
+        q.put(make_chunk(i, i * 1000))
+    assert q.qsize() == 10
+    assert q.stats.chunks_dropped == 0
+
+
+def test_drop_oldest_keeps_newest_chunks():
+    q = ChunkQueue(2, "drop-oldest")
+    for i in range(1, 5):
+        q.put(make_chunk(i, (i - 1) * 1000))
+    assert [c.index for c in drain(q)] == [3, 4]
+    assert q.stats.chunks_dropped == 2
+    assert q.stats.dropped_sec == pytest.approx(2.0)
+    assert q.stats.max_depth == 2
+
+
+def test_skip_to_live_discards_the_backlog():
+    q = ChunkQueue(3, "skip-to-live")
+    for i in range(1, 5):
+        q.put(make_chunk(i, (i - 1) * 1000))
+    assert [c.index for c in drain(q)] == [4]
+    assert q.stats.chunks_dropped == 3
+
+
+def test_coalesce_merges_oldest_contiguous_chunks():
+    q = ChunkQueue(2, "coalesce")
+    for i in range(1, 4):
+        q.put(make_chunk(i, (i - 1) * 1000))
+    merged, newest = drain(q)
+    assert merged.offset_ms == 0
+    assert merged.duration_sec == pytest.approx(2.0)
+    assert merged.pcm == make_chunk(1, 0).pcm + make_chunk(2, 1000).pcm
+    assert newest.index == 3
+    assert q.stats.chunks_coalesced == 1 and q.stats.chunks_dropped == 0
+
+
+def test_coalesce_removes_window_overlap_once():
+    first = make_chunk(1, 0, ms=1000, value=1)
+    second = make_chunk(2, 500, ms=1000, value=2)
+    second.trace = ChunkTrace(2)
+    merged = coalesce_chunks(first, second)
+    assert merged.duration_sec == pytest.approx(1.5)
+    assert merged.pcm == first.pcm + second.pcm[1000:]
+    assert merged.trace is second.trace
+
+
+def test_coalesce_falls_back_to_dropping_across_gaps_and_caps():
+    q = ChunkQueue(2, "coalesce")
+    q.put(make_chunk(1, 0))
+    q.put(make_chunk(2, 5000))  # gap: audio in between was dropped by VAD
+    q.put(make_chunk(3, 6000))
+    assert [c.index for c in drain(q)] == [2, 3]
+    assert q.stats.chunks_dropped == 1
+
+    capped = ChunkQueue(2, "coalesce", max_coalesce_sec=1.5)
+    for i in range(1, 4):
+        capped.put(make_chunk(i, (i - 1) * 1000))
+    assert capped.stats.chunks_coalesced == 0
+    assert capped.stats.chunks_dropped == 1
+
+
+def test_file_path_chunks_are_dropped_not_merged():
+    q = ChunkQueue(1, "coalesce", chunk_sec=1.5)
+    q.put("chunk_001.wav")
+    q.put("chunk_002.wav")
+    assert drain(q) == ["chunk_002.wav"]
+    assert q.stats.dropped_sec == pytest.approx(1.5)
+
+
+def test_block_waits_for_room():
+    q = ChunkQueue(1, "block")
+    q.put(make_chunk(1, 0))
+    with pytest.raises(queue.Full):
+        q.put(make_chunk(2, 1000), timeout=0.05)
+
+    threading.Timer(0.05, q.get).start()
+    start = time.monotonic()
+    q.put(make_chunk(3, 2000), timeout=2)
+    assert time.monotonic() - start < 1.5
+    assert [c.index for c in drain(q)] == [3]
+
+
+def test_close_releases_blocked_producer():
+    q = ChunkQueue(1, "block")
+    q.put(make_chunk(1, 0))
+    threading.Timer(0.05, q.close).start()
+    q.put(make_chunk(2, 1000), timeout=2)
+    assert q.qsize() == 2
+
+
+def test_get_times_out_when_empty():
+    with pytest.raises(queue.Empty):
+        ChunkQueue().get(timeout=0.01)
@@ -36,13 +36,12 @@ def test_display_initialization(display_window_fixture):
     # assert win.root.winfo_geometry().startswith("400x200")
 
 
-def test_label_configuration(display_window_fixture):
+def test_text_configuration(display_window_fixture):
     win = display_window_fixture
-    assert win.label.cget("justify") == "left"
-    assert win.label.cget("bg") == "black"
-    assert win.label.cget("fg") == "white"
-    assert win.label.cget("wraplength") == 380
-    assert win.label.cget("anchor") == "nw"
+    assert win.text.cget("bg") == "black"
+    assert win.text.cget("fg") == "white"
+    assert win.text.cget("wrap") == "word"
+    assert win.text.cget("state") == "disabled"
 
 
 def test_display_update(display_window_fixture):
@@ -51,7 +50,55 @@ def test_display_update(display_window_fixture):
     buffer.append([{"start": "00:00:00.000", "end": "00:00:01.000", "text": "hello"}])
     win.set_buffer(buffer)
     win._update_loop()  # manual update
-    assert win.text_var.get() == "hello"
+    assert win.displayed_text() == "hello"
+
+
+def test_display_appends_only_new_segments(display_window_fixture, mocker):
+    win = display_window_fixture
+    buffer = TranscriptBuffer()
+    buffer.append([{"text": "hello"}])
+    win.set_buffer(buffer)
+    win._update_loop()
+    buffer.append([{"text": "world"}])
+    win._update_loop()
+    assert win.displayed_text() == "hello world"
+
+    insert = mocker.spy(win.text, "insert")
+    win._update_loop()  # nothing new, no redraw
+    insert.assert_not_called()
+
+
+def test_display_caps_history(display_window_fixture):
+    win = display_window_fixture
+    win.history_chars = 12
+    buffer = TranscriptBuffer()
+    win.set_buffer(buffer)
+    for word in ["alpha", "beta", "gamma", "delta"]:
+        buffer.append([{"text": word}])
+        win._update_loop()
+    assert win.displayed_text() == "gamma delta"  # trimmed at a word boundary
+
+
+def test_trim_point_moves_forward_to_the_next_word():
+    from display import _word_boundary
+    text = "alpha beta\ngamma"
+    assert text[_word_boundary(text, 3):] == "beta\ngamma"  # mid-word: skip the rest of it
+    assert text[_word_boundary(text, 5):] == "beta\ngamma"  # on a space: drop it
+    assert text[_word_boundary(text, 6):] == "beta\ngamma"  # already at a word start
+    assert text[_word_boundary(text, 10):] == "gamma"  # line boundary
+    assert _word_boundary(text, len(text)) == len(text)
+
+
+def test_display_resets_after_buffer_clear(display_window_fixture):
+    win = display_window_fixture
+    buffer = TranscriptBuffer()
+    buffer.append([{"text": "old"}])
+    win.set_buffer(buffer)
+    win._update_loop()
+    buffer.clear()
+    buffer.append([{"text": "new"}])
+    win._update_loop()
+    assert win.displayed_text() == "new"
 
 
 def test_stop_invokes_callback(display_window_fixture):
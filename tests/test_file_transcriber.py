@@ -0,0 +1,94 @@
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from file_transcriber import transcribe_file
+from segments import format_timestamp
+from vad import VoiceActivityDetector
+
+
+class RecordingTranscriber:
+    """Returns one segment per chunk spanning the chunk, on the file's timeline."""
+
+    concurrency = 2
+
+    def __init__(self):
+        self.chunks = []
+
+    def submit(self, chunk, priority="interactive"):
+        self.chunks.append(chunk)
+        end_ms = chunk.offset_ms + int(chunk.duration_sec * 1000)
+        future = Future()
+        future.set_result([{"start": format_timestamp(chunk.offset_ms),
+                            "end": format_timestamp(end_ms),
+                            "text": f"c{chunk.index}"}])
+        return future
+
+
+@pytest.fixture
+def wav_path(tmp_path):
+    path = tmp_path / "in.wav"
+    t = np.arange(16000 * 4) / 16000
+    sf.write(str(path), (8000 * np.sin(2 * np.pi * 220 * t)).astype("int16"), 16000)
+    return str(path)
+
+
+def test_chunks_carry_file_offsets(wav_path):
+    transcriber = RecordingTranscriber()
+    result = transcribe_file(wav_path, transcriber, chunk_sec=1.5)
+    assert [c.offset_ms for c in transcriber.chunks] == [0, 1500, 3000]
+    assert [s["start"] for s in result.segments] == ["00:00:00.000", "00:00:01.500", "00:00:03.000"]
+    assert result.duration_sec == 4.0
+
+
+class WordPerSecondTranscriber(RecordingTranscriber):
+    """Emits one word for every whole second of audio inside the chunk."""
+
+    def submit(self, chunk, priority="interactive"):
+        self.chunks.append(chunk)
+        end_ms = chunk.offset_ms + int(chunk.duration_sec * 1000)
+        first = -(-chunk.offset_ms // 1000)
+        segments = [{"start": format_timestamp(k * 1000), "end": format_timestamp((k + 1) * 1000),
+                     "text": f"word{k}"}
+                    for k in range(first, end_ms // 1000)]
+        future = Future()
+        future.set_result(segments)
+        return future
+
+
+def test_overlapping_windows_are_stitched(wav_path):
+    transcriber = WordPerSecondTranscriber()
+    result = transcribe_file(wav_path, transcriber, chunk_sec=2.0, hop_sec=1.0)
+    # The last window already reaches the end of the file, so no tail-only window follows
+    assert [c.offset_ms for c in transcriber.chunks] == [0, 1000, 2000]
+    assert result.duration_sec == 4.0
+    assert [s["text"] for s in result.segments] == ["word0", "word1", "word2", "word3"]
+
+
+def test_vad_skips_silent_file(tmp_path):
+    path = tmp_path / "silence.wav"
+    sf.write(str(path), np.zeros(16000 * 3, dtype="int16"), 16000)
+    transcriber = RecordingTranscriber()
+    result = transcribe_file(str(path), transcriber, vad=VoiceActivityDetector())
+    assert transcriber.chunks == []
+    assert result.skipped_sec == 3.0
+
+
+def test_non_16k_stereo_input_is_converted(tmp_path):
+    path = tmp_path / "stereo48.wav"
+    t = np.arange(48000 * 4) / 48000
+    tone = (8000 * np.sin(2 * np.pi * 220 * t)).astype("int16")
+    sf.write(str(path), np.stack([tone, tone], axis=1), 48000)
+
+    transcriber = RecordingTranscriber()
+    result = transcribe_file(str(path), transcriber, chunk_sec=1.5)
+    assert [(c.sample_rate, c.channels) for c in transcriber.chunks] == [(16000, 1)] * 3
+    assert [c.offset_ms for c in transcriber.chunks] == [0, 1500, 3000]
+    assert sum(c.num_frames for c in transcriber.chunks) == 16000 * 4
+    assert result.duration_sec == 4.0
@@ -0,0 +1,92 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from metrics import METRICS, Histogram, Metrics
+from transcriber import parse_vtt
+from transcript_buffer import TranscriptBuffer
+
+
+@pytest.fixture
+def global_metrics():
+    METRICS.enable()
+    yield METRICS
+    METRICS.disable()
+    METRICS.reset()
+
+
+def test_histogram_percentiles_are_bucket_estimates():
+    hist = Histogram((1, 2, 5, 10, float("inf")))
+    for value in [0.5] * 50 + [3] * 45 + [8] * 5:
+        hist.observe(value)
+    assert hist.count == 100
+    assert hist.percentile(50) <= 1
+    assert 2 <= hist.percentile(95) <= 5
+    assert 5 <= hist.percentile(99) <= 8
+    assert hist.percentile(100) == 8
+
+
+def test_histogram_clamps_to_observed_range():
+    hist = Histogram((1, 10, float("inf")))
+    hist.observe(4)
+    hist.observe(4)
+    assert hist.percentile(50) == 4
+    assert Histogram((1,)).percentile(50) is None
+
+
+def test_disabled_metrics_record_nothing():
+    metrics = Metrics()
+    with metrics.time("stage"):
+        pass
+    metrics.observe("stage", 1.0)
+    metrics.depth("queue", 3)
+    metrics.add("audio_seconds", 2.0)
+    snap = metrics.snapshot()
+    assert snap["stages"] == {} and snap["queues"] == {} and snap["counters"] == {}
+
+
+def test_snapshot_reports_rtf_and_stage_percentiles():
+    metrics = Metrics(enabled=True)
+    for ms in (10, 20, 30, 40):
+        metrics.observe("whisper.inference", ms / 1000)
+    metrics.depth("pool.pending", 2)
+    metrics.add("audio_seconds", 100.0)
+    snap = metrics.snapshot()
+    assert snap["stages"]["whisper.inference"]["count"] == 4
+    assert snap["stages"]["whisper.inference"]["max"] == pytest.approx(0.04)
+    assert snap["queues"]["pool.pending"]["max"] == 2
+    assert snap["rtf"] == pytest.approx(snap["wall_seconds"] / 100.0)
+    summary = metrics.summary()
+    assert "RTF" in summary and "whisper.inference" in summary and "pool.pending" in summary
+
+
+def test_prometheus_buckets_are_cumulative():
+    metrics = Metrics(enabled=True)
+    metrics.observe("vtt.parse", 0.0002)
+    metrics.observe("vtt.parse", 0.2)
+    text = metrics.to_prometheus()
+    assert 'whisperlite_stage_seconds_bucket{stage="vtt.parse",le="+Inf"} 2' in text
+    assert 'whisperlite_stage_seconds_bucket{stage="vtt.parse",le="0.00025"} 1' in text
+    assert 'whisperlite_stage_seconds_count{stage="vtt.parse"} 2' in text
+
+
+def test_write_picks_format_from_extension(tmp_path):
+    metrics = Metrics(enabled=True)
+    metrics.observe("buffer.append", 0.001)
+    metrics.write(str(tmp_path / "stats.json"))
+    metrics.write(str(tmp_path / "stats.prom"))
+    assert json.loads((tmp_path / "stats.json").read_text())["stages"]["buffer.append"]["count"] == 1
+    assert "# TYPE whisperlite_stage_seconds histogram" in (tmp_path / "stats.prom").read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["stats.json", "stats.prom"]
+
+
+def test_instrumented_stages_record_into_global_registry(global_metrics):
+    parse_vtt("WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nHello\n")
+    TranscriptBuffer().append([{"start": "00:00:00.000", "end": "00:00:01.000", "text": "Hello"}])
+    stages = global_metrics.snapshot()["stages"]
+    assert stages["vtt.parse"]["count"] == 1
+    assert stages["buffer.append"]["count"] == 1
@@ -142,3 +142,76 @@ def test_save_transcript_io_error(
                 output_dir=sample_output_dir,
                 file_format="txt"
             )
+
+def test_save_transcript_vtt_and_jsonl(tmp_path, sample_segments, sample_timestamp):
+    vtt = save_transcript(sample_segments, "", "u", sample_timestamp, str(tmp_path), file_format="vtt")
+    assert Path(vtt).read_text(encoding="utf-8") == (
+        "WEBVTT\n\n"
+        "00:00:00.000 --> 00:00:03.500\nHello, this is a test.\n\n"
+        "00:00:04.100 --> 00:00:07.800\nWelcome to WhisperLite.\n\n"
+    )
+    jsonl = save_transcript(sample_segments, "", "u", sample_timestamp, str(tmp_path), file_format="jsonl")
+    lines = Path(jsonl).read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == sample_segments
+
+def test_save_transcript_json_empty(tmp_path, sample_timestamp):
+    path = save_transcript([], "", "u", sample_timestamp, str(tmp_path), file_format="json")
+    assert json.loads(Path(path).read_text(encoding="utf-8")) == []
+
+def test_srt_writer_streams_and_numbers_incrementally(tmp_path, sample_segments):
+    from output_writer import open_writer
+    path = tmp_path / "live.srt"
+    writer = open_writer(str(path), "srt")
+    writer.write(sample_segments[0])
+    # Each segment is on disk before the writer is closed
+    assert path.read_text(encoding="utf-8").startswith("1\n00:00:00,000 --> 00:00:03,500\n")
+    writer.write(sample_segments[1])
+    writer.close()
+    assert "\n2\n00:00:04,100 --> 00:00:07,800\n" in path.read_text(encoding="utf-8")
+
+def test_json_writer_matches_one_shot_output(tmp_path, sample_segments):
+    from output_writer import open_writer
+    path = tmp_path / "live.json"
+    with open_writer(str(path), "json", flush_every=None, flush_interval_sec=0.0) as writer:
+        writer.write_many(sample_segments)
+    assert path.read_text(encoding="utf-8") == json.dumps(sample_segments, indent=4, ensure_ascii=False)
+
+def test_writer_flush_cadence(tmp_path, sample_segments):
+    from output_writer import open_writer
+    path = tmp_path / "live.jsonl"
+    writer = open_writer(str(path), "jsonl", flush_every=2)
+    writer.write(sample_segments[0])
+    assert path.read_text(encoding="utf-8") == ""
+    writer.write(sample_segments[1])
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 2
+    writer.close()
+
+def test_format_transcript_renders_in_memory(sample_segments):
+    from output_writer import format_transcript
+    assert format_transcript(sample_segments, "txt") == "Hello, this is a test. Welcome to WhisperLite."
+    assert json.loads(format_transcript(sample_segments, "json")) == sample_segments
+    assert format_transcript(sample_segments, "srt").startswith("1\n00:00:00,000 --> 00:00:03,500\n")
+    with pytest.raises(ValueError):
+        format_transcript(sample_segments, "docx")
+
+def test_save_transcript_streams_long_transcripts_in_batches(tmp_path, sample_timestamp, mocker):
+    from output_writer import SAVE_FLUSH_EVERY, TranscriptWriter, format_transcript
+    segments = [
+        {"start": f"00:{i // 60:02d}:{i % 60:02d}.000", "end": f"00:{i // 60:02d}:{i % 60:02d}.500", "text": f"line {i}"}
+        for i in range(SAVE_FLUSH_EVERY * 2 + 10)
+    ]
+    flush = mocker.spy(TranscriptWriter, "flush")
+    path = save_transcript(segments, "", "u", sample_timestamp, str(tmp_path), file_format="json")
+    # Two full batches while writing, then the tail and footer on close
+    assert flush.call_count == 3
+    assert Path(path).read_text(encoding="utf-8") == format_transcript(segments, "json")
+
+def test_json_formats_keep_segment_dicts_unchanged(tmp_path, sample_timestamp):
+    segments = [
+        {"start": "00:00:00.000", "end": "00:00:01.000", "text": "Hi.", "speaker": "A", "confidence": 0.9},
+        ["not", "a", "dict"],
+    ]
+    path = save_transcript(segments, "", "u", sample_timestamp, str(tmp_path), file_format="json")
+    assert Path(path).read_text(encoding="utf-8") == json.dumps(segments, indent=4, ensure_ascii=False)
+    path = save_transcript(segments, "", "u", sample_timestamp, str(tmp_path), file_format="jsonl")
+    assert [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines()] == segments
@@ -0,0 +1,151 @@
+import io
+import json
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from pcm_stream import stream_pcm
+from segments import Segment
+
+
+class LazyFuture(Future):
+    """Completes only when its result is asked for, like a busy worker."""
+
+    def __init__(self, owner, chunk):
+        super().__init__()
+        self.owner = owner
+        self.chunk = chunk
+
+    def result(self, timeout=None):
+        if not self.done():
+            self.owner.outstanding -= 1
+            self.set_result([Segment(self.chunk.offset_ms, self.chunk.offset_ms + 100, f"{self.chunk.num_frames}")])
+        return super().result(timeout)
+
+
+class SlowTranscriber:
+    concurrency = 2
+
+    def __init__(self):
+        self.outstanding = 0
+        self.max_outstanding = 0
+        self.buffers = set()
+
+    def submit(self, chunk, callback=None, timeout=10.0, priority="interactive"):
+        self.outstanding += 1
+        self.max_outstanding = max(self.max_outstanding, self.outstanding)
+        self.buffers.add(id(chunk.pcm.obj if isinstance(chunk.pcm, memoryview) else chunk.pcm))
+        return LazyFuture(self, chunk)
+
+
+class CountingReader(io.BytesIO):
+    def __init__(self, data, transcriber):
+        super().__init__(data)
+        self.transcriber = transcriber
+        self.max_outstanding_at_read = 0
+
+    def readinto(self, buffer):
+        self.max_outstanding_at_read = max(self.max_outstanding_at_read, self.transcriber.outstanding)
+        return super().readinto(buffer)
+
+
+def test_stream_pcm_emits_json_lines_in_order():
+    transcriber = SlowTranscriber()
+    pcm = b"\x00\x00" * (2000 * 10 + 250)  # ten full 2000-frame chunks plus a tail
+    out = io.StringIO()
+    stats = stream_pcm(io.BytesIO(pcm), transcriber, out, chunk_sec=0.125)
+
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [line["text"] for line in lines] == ["2000"] * 10 + ["250"]
+    assert lines[3]["start"] == "00:00:00.375"
+    assert (stats.chunks, stats.frames, stats.segments) == (11, 20250, 11)
+
+
+def test_stream_pcm_reuses_buffers_and_applies_backpressure():
+    transcriber = SlowTranscriber()
+    reader = CountingReader(b"\x00\x00" * 2000 * 20, transcriber)
+    stream_pcm(reader, transcriber, io.StringIO(), chunk_sec=0.125)
+    # Never more chunks pending than buffers, and reads wait for a free buffer
+    assert transcriber.max_outstanding == 4
+    assert reader.max_outstanding_at_read <= 3
+    assert len(transcriber.buffers) == 4
+
+
+def test_stream_pcm_writes_finished_chunks_before_the_next_read():
+    class DoneTranscriber(SlowTranscriber):
+        def submit(self, chunk, callback=None, timeout=10.0, priority="interactive"):
+            future = Future()
+            future.set_result([Segment(chunk.offset_ms, chunk.offset_ms + 100, "x")])
+            return future
+
+    out = io.StringIO()
+    lines_at_read = []
+
+    class WatchingReader(io.BytesIO):
+        def readinto(self, buffer):
+            lines_at_read.append(len(out.getvalue().splitlines()))
+            return super().readinto(buffer)
+
+    stream_pcm(WatchingReader(b"\x00\x00" * 2000 * 3), DoneTranscriber(), out, chunk_sec=0.125)
+    # Each chunk's segment is out before the read of the following chunk starts
+    assert lines_at_read == [0, 1, 2, 3]
+
+
+def test_stream_pcm_drops_torn_trailing_sample():
+    transcriber = SlowTranscriber()
+    out = io.StringIO()
+    stats = stream_pcm(io.BytesIO(b"\x01\x00\x02\x00\x03"), transcriber, out, chunk_sec=0.125)
+    assert stats.frames == 2
+    assert json.loads(out.getvalue())["text"] == "2"
+
+
+def test_stream_pcm_converts_to_16k_mono():
+    transcriber = SlowTranscriber()
+    out = io.StringIO()
+    pcm = b"\x10\x00" * 2 * 48000  # one second of 48 kHz stereo
+    stream_pcm(io.BytesIO(pcm), transcriber, out, sample_rate=48000, channels=2, chunk_sec=0.5)
+    frames = [int(json.loads(line)["text"]) for line in out.getvalue().splitlines()]
+    # The stream ends on a chunk boundary, so the sub-millisecond filter tail is dropped
+    assert 16000 - 16 <= sum(frames) <= 16000
+    assert frames[0] < 8000
+
+
+def test_stream_pcm_follows_chunk_controller():
+    from chunk_controller import ChunkController
+
+    class ShrinkingController(ChunkController):
+        def update(self, backlog=0):
+            self._duration = max(self.min_sec, self._duration / 2)
+            return self._duration
+
+    transcriber = SlowTranscriber()
+    controller = ShrinkingController(initial_sec=0.5, min_sec=0.0625, max_sec=0.5)
+    out = io.StringIO()
+    stream_pcm(io.BytesIO(b"\x00\x00" * 8000), transcriber, out, controller=controller)
+
+    frames = [int(json.loads(line)["text"]) for line in out.getvalue().splitlines()]
+    assert frames[:3] == [4000, 2000, 1000]
+    assert sum(frames) == 8000
+    assert controller._n == len(frames)
+
+
+def test_pcm_chunker_places_converts_and_filters_chunks():
+    import numpy as np
+    from pcm_stream import PcmChunker
+
+    class DropSecond:
+        def process(self, chunk):
+            return None if chunk.index == 2 else chunk
+
+    chunker = PcmChunker(48000, 2, vad=DropSecond())
+    loud = np.full((48000, 2), 1000, dtype="<i2").tobytes()
+    first = chunker.chunk(loud)
+    assert (first.index, first.offset_ms, first.sample_rate, first.channels) == (1, 0, 16000, 1)
+    assert chunker.chunk(loud[:len(loud) // 2]) is None  # filtered, but still on the timeline
+    last = chunker.chunk(loud[:len(loud) // 2], final=True)
+    assert (last.index, last.offset_ms) == (3, 1500)
+    # The final chunk carries the resampler's tail, so the three add up to the whole input
+    assert first.num_frames + 8000 + last.num_frames == 16000 * 2
+    assert (chunker.chunks, chunker.frames, chunker.offset_ms) == (3, 96000, 2000)
@@ -0,0 +1,53 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pytest
+
+from resample import AudioConverter, StreamingResampler, downmix
+
+
+def _tone(rate, seconds=1.0, freq=440.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return (10000 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+
+@pytest.mark.parametrize("rate", [8000, 22050, 44100, 48000])
+def test_resampled_tone_matches_and_has_expected_length(rate):
+    resampler = StreamingResampler(rate)
+    out = np.concatenate([resampler.process(_tone(rate)), resampler.flush()])
+    assert len(out) == 16000
+    expected = _tone(16000)
+    assert np.abs(out[64:-64] - expected[64:-64]).max() < 10
+
+
+def test_output_does_not_depend_on_block_boundaries():
+    x = _tone(44100)
+    whole = StreamingResampler(44100)
+    reference = np.concatenate([whole.process(x), whole.flush()])
+
+    split = StreamingResampler(44100)
+    parts, pos = [], 0
+    for size in [1, 7, 1000, 3, 12345, 441]:
+        parts.append(split.process(x[pos:pos + size]))
+        pos += size
+    parts.append(split.process(x[pos:]))
+    parts.append(split.flush())
+    np.testing.assert_array_equal(np.concatenate(parts), reference)
+
+
+def test_downsampling_removes_content_above_new_nyquist():
+    resampler = StreamingResampler(48000)
+    out = np.concatenate([resampler.process(_tone(48000, freq=12000)), resampler.flush()])
+    assert np.abs(out[64:-64]).max() < 100  # 12 kHz would alias to 4 kHz at 16 kHz
+
+
+def test_converter_downmixes_int16_blocks():
+    converter = AudioConverter(16000, 2)
+    assert converter.needed
+    block = np.array([[100, 300], [-200, 0]], dtype=np.int16)
+    np.testing.assert_array_equal(converter.process(block), [200, -100])
+    assert not AudioConverter(16000, 1).needed
+    np.testing.assert_array_equal(downmix(np.array([1, 2], dtype=np.int16)), [1.0, 2.0])
@@ -0,0 +1,61 @@
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from audio_chunk import AudioChunk
+from result_cache import ResultCache
+from segments import Segment
+
+
+def test_roundtrip_and_stats(tmp_path):
+    cache = ResultCache(str(tmp_path), "model:1|language=en")
+    key = cache.key(AudioChunk(1, b"\x01\x02" * 100))
+    assert cache.get(key) is None
+    cache.put(key, [Segment(0, 900, "hello"), Segment(None, None, "untimed")])
+    assert cache.get(key) == [Segment(0, 900, "hello"), Segment(None, None, "untimed")]
+    assert (cache.stats.hits, cache.stats.misses, cache.stats.stores) == (1, 1, 1)
+    assert "1 hits" in cache.stats.summary()
+
+
+def test_key_covers_pcm_format_and_context(tmp_path):
+    cache = ResultCache(str(tmp_path), "ctx-a")
+    other = ResultCache(str(tmp_path), "ctx-b")
+    chunk = AudioChunk(1, b"\x00\x01" * 10)
+    assert cache.key(chunk) == cache.key(AudioChunk(9, b"\x00\x01" * 10, offset_ms=4000))
+    assert cache.key(chunk) != cache.key(AudioChunk(1, b"\x00\x01" * 10, sample_rate=8000))
+    assert cache.key(chunk) != cache.key(AudioChunk(1, b"\x00\x02" * 10))
+    assert cache.key(chunk) != other.key(chunk)
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), "ctx", max_bytes=200)
+    keys = [cache.key(AudioChunk(i, bytes([i, 0]) * 10)) for i in range(3)]
+    cache.put(keys[0], [Segment(0, 1, "a" * 40)])
+    cache.put(keys[1], [Segment(0, 1, "b" * 40)])
+    cache.get(keys[0])  # keys[1] is now the oldest
+    cache.put(keys[2], [Segment(0, 1, "c" * 40)])
+    assert cache.stats.evictions == 1
+    assert cache.size_bytes <= 200
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
+
+
+def test_index_is_rebuilt_from_disk(tmp_path):
+    cache = ResultCache(str(tmp_path), "ctx")
+    key = cache.key(AudioChunk(1, b"\x05\x00"))
+    cache.put(key, [Segment(0, 10, "persisted")])
+    reopened = ResultCache(str(tmp_path), "ctx")
+    assert len(reopened) == 1
+    assert reopened.size_bytes == cache.size_bytes
+    assert reopened.get(key)[0].text == "persisted"
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = ResultCache(str(tmp_path), "ctx")
+    key = cache.key(AudioChunk(1, b"\x05\x00"))
+    cache.put(key, [Segment(0, 10, "x")])
+    path = os.path.join(str(tmp_path), key[:2], f"{key}.json")
+    Path(path).write_text("{not json", encoding="utf-8")
+    assert cache.get(key) is None
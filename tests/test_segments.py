@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from segments import format_timestamp, parse_timestamp, rebase_segments
+
+
+def test_parse_timestamp():
+    assert parse_timestamp("00:00:00.000") == 0
+    assert parse_timestamp("01:02:03.456") == 3723456
+    assert parse_timestamp("00:00:01,500") == 1500
+
+
+def test_parse_timestamp_without_hours():
+    assert parse_timestamp("02:03.250") == 123250
+
+
+def test_format_timestamp():
+    assert format_timestamp(3723456) == "01:02:03.456"
+    assert format_timestamp(1500, separator=",") == "00:00:01,500"
+
+
+def test_rebase_segments_shifts_times():
+    segments = [{"start": "00:00:00.500", "end": "00:00:01.200", "text": "hi"}]
+    rebased = rebase_segments(segments, 90000)
+    assert rebased == [{"start": "00:01:30.500", "end": "00:01:31.200", "text": "hi"}]
+    assert segments[0]["start"] == "00:00:00.500"
+
+
+def test_rebase_segments_zero_offset_is_noop():
+    segments = [{"start": "00:00:00.500", "end": "00:00:01.200", "text": "hi"}]
+    assert rebase_segments(segments, 0) is segments
+
+
+def test_segment_from_dict_roundtrip():
+    from segments import Segment
+    data = {"start": "00:01:02.003", "end": "00:01:04.500", "text": "hi"}
+    segment = Segment.from_dict(data)
+    assert (segment.start_ms, segment.end_ms) == (62003, 64500)
+    assert segment.to_dict() == data
+    assert segment == data
+
+
+def test_segment_dict_style_access():
+    from segments import Segment
+    segment = Segment(1500, 2000, "hello")
+    assert segment["start"] == "00:00:01.500"
+    assert segment["text"] == "hello"
+    assert segment.get("missing") is None
+
+
+def test_untimed_segment_omits_times():
+    from segments import Segment
+    assert Segment.from_dict({"text": "one"}).to_dict() == {"text": "one"}
+
+
+def test_segment_uses_slots():
+    from segments import Segment
+    assert not hasattr(Segment(0, 1, "x"), "__dict__")
@@ -0,0 +1,148 @@
+import io
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pytest
+
+from segments import Segment
+from session_manager import SessionManager
+from vad import VoiceActivityDetector
+from worker_pool import TranscriptionPool, make_scheduler
+
+
+class ChunkBackend:
+    """One segment per chunk covering the chunk on its stream's timeline."""
+
+    def transcribe(self, chunk, timeout):
+        time.sleep(0.01)
+        end_ms = chunk.offset_ms + int(chunk.duration_sec * 1000)
+        return [Segment(chunk.offset_ms, end_ms, f"{chunk.sample_rate}:{chunk.index}")]
+
+
+class PooledTranscriber:
+    def __init__(self, workers):
+        self.concurrency = workers
+        self.pool = TranscriptionPool([ChunkBackend() for _ in range(workers)], scheduler=make_scheduler("deficit"))
+        self.streams = []
+
+    def submit(self, chunk, callback=None, timeout=10.0, stream=None, priority="interactive"):
+        self.streams.append(stream)
+        return self.pool.submit(chunk, callback=callback, timeout=timeout, stream=stream, priority=priority)
+
+
+def tone(seconds, rate=16000, channels=1, level=8000):
+    samples = (np.sin(np.arange(int(seconds * rate)) * 0.05) * level).astype("<i2")
+    return np.repeat(samples[:, None], channels, axis=1).tobytes()
+
+
+def test_streams_keep_separate_timelines_and_buffers():
+    transcriber = PooledTranscriber(workers=4)
+    manager = SessionManager(transcriber, chunk_sec=1.0)
+    for i in range(8):
+        manager.add_pcm_source(f"s{i}", io.BytesIO(tone(1 + i * 0.5)))
+    manager.wait()
+    transcriber.pool.close()
+
+    for i in range(8):
+        stream = manager.streams[f"s{i}"]
+        segments = stream.buffer.get_segments()
+        # Every stream starts at zero and ends with its own (partial) last chunk
+        assert segments[0]["start"] == "00:00:00.000"
+        assert segments[-1]["end"] == Segment(0, 1000 + i * 500, "").to_dict()["end"]
+        assert stream.stats.chunks == len(segments)
+    assert set(transcriber.streams) == {f"s{i}" for i in range(8)}
+
+
+def test_stream_converts_to_16k_mono_and_reports_segments():
+    transcriber = PooledTranscriber(workers=2)
+    delivered = []
+    manager = SessionManager(transcriber, chunk_sec=1.0, on_segments=lambda name, segments: delivered.append(name))
+    stream = manager.add_stream("line-in", sample_rate=48000, channels=2)
+    stream.feed(tone(2.5, rate=48000, channels=2))
+    manager.close()
+    transcriber.pool.close()
+
+    texts = [s["text"] for s in stream.buffer.get_segments()]
+    assert texts == ["16000:1", "16000:2", "16000:3"]
+    assert stream.buffer.get_segments()[-1]["start"] == "00:00:02.000"
+    assert delivered == ["line-in"] * 3
+
+
+def test_quiet_streams_cost_nothing_with_vad():
+    transcriber = PooledTranscriber(workers=1)
+    manager = SessionManager(transcriber, chunk_sec=1.0, make_vad=VoiceActivityDetector)
+    manager.add_pcm_source("talking", io.BytesIO(tone(2)))
+    manager.add_pcm_source("silent", io.BytesIO(tone(2, level=0)))
+    manager.wait()
+    transcriber.pool.close()
+
+    assert manager.streams["silent"].stats.silent_chunks == 2
+    assert transcriber.streams == ["talking", "talking"]
+    assert "Stream silent: 2.0s audio, 2 chunks (2 silent, 0 dropped), 0 segments" in manager.summary()
+
+
+def test_non_blocking_feed_drops_chunks_beyond_the_in_flight_limit():
+    class StalledTranscriber:
+        concurrency = 1
+
+        def submit(self, chunk, callback=None, timeout=10.0, stream=None, priority="interactive"):
+            pass  # never completes
+
+    manager = SessionManager(StalledTranscriber(), chunk_sec=0.5)
+    stream = manager.add_stream("mic")
+    stream.feed(tone(2), block=False)
+    assert stream.stats.chunks == 4 and stream.stats.dropped_chunks == 2
+
+
+def test_duplicate_stream_names_are_rejected():
+    transcriber = PooledTranscriber(workers=1)
+    manager = SessionManager(transcriber)
+    manager.add_stream("a")
+    with pytest.raises(ValueError):
+        manager.add_stream("a")
+    transcriber.pool.close()
+
+
+def test_device_callback_only_queues_audio(monkeypatch):
+    import session_manager
+
+    class FakeInputStream:
+        def __init__(self, callback, **kwargs):
+            self.callback = callback
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+        def close(self):
+            pass
+
+    class FakeSoundDevice:
+        InputStream = FakeInputStream
+
+    class RecordingTranscriber(PooledTranscriber):
+        def submit(self, chunk, **kwargs):
+            self.threads.append(threading.current_thread())
+            return super().submit(chunk, **kwargs)
+
+    monkeypatch.setattr(session_manager, "sd", FakeSoundDevice)
+    transcriber = RecordingTranscriber(workers=2)
+    transcriber.threads = []
+    manager = SessionManager(transcriber, chunk_sec=0.5)
+    streams = manager.capture_device_channels(2)
+    stereo = np.frombuffer(tone(1, channels=2), dtype="<i2").reshape(-1, 2)
+    for start in range(0, len(stereo), 1600):
+        manager._device_stream.callback(stereo[start:start + 1600], 1600, None, None)
+    manager.close()
+    transcriber.pool.close()
+
+    # Chunks are cut and submitted on the feeder thread, never on the audio callback's thread
+    assert transcriber.threads and threading.current_thread() not in transcriber.threads
+    assert [len(s.buffer.get_segments()) for s in streams] == [2, 2]
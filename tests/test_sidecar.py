@@ -0,0 +1,138 @@
+import io
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from sidecar import SidecarServer, read_frame, write_frame
+from segments import Segment
+
+
+class FakeTranscriber:
+    concurrency = 1
+
+    def __init__(self):
+        self.chunks = []
+
+    def submit(self, chunk, callback=None, timeout=10.0, priority="interactive"):
+        self.chunks.append(chunk)
+        future = Future()
+        future.set_result([Segment(chunk.offset_ms, chunk.offset_ms + 1000, f"{len(chunk.pcm)} bytes")])
+        return future
+
+    def close(self):
+        pass
+
+
+def _run(server, *frames):
+    rfile = io.BytesIO()
+    for header, payload in frames:
+        write_frame(rfile, header, payload)
+    rfile.seek(0)
+    wfile = io.BytesIO()
+    server.serve_stream(rfile, wfile)
+    wfile.seek(0)
+    responses = []
+    while True:
+        frame = read_frame(wfile)
+        if frame is None:
+            return responses
+        responses.append(frame[0])
+
+
+def test_frame_roundtrip():
+    stream = io.BytesIO()
+    write_frame(stream, {"id": 7, "op": "status"}, b"\x01\x02")
+    stream.seek(0)
+    assert read_frame(stream) == ({"id": 7, "op": "status"}, b"\x01\x02")
+    assert read_frame(stream) is None
+
+
+def test_truncated_frame_is_an_error():
+    stream = io.BytesIO()
+    write_frame(stream, {"id": 1}, b"abcd")
+    stream = io.BytesIO(stream.getvalue()[:-2])
+    with pytest.raises(RuntimeError):
+        read_frame(stream)
+
+
+def test_transcribe_save_status_and_shutdown(tmp_path):
+    fake = FakeTranscriber()
+    server = SidecarServer(lambda: fake, output_dir=str(tmp_path))
+    responses = _run(
+        server,
+        ({"id": "a", "op": "status"}, b""),
+        ({"id": "b", "op": "transcribe-chunk", "offset_ms": 3000}, b"\x00" * 3200),
+        ({"id": "c", "op": "save", "format": "txt", "segments": [{"text": "hi"}]}, b""),
+        ({"id": "d", "op": "shutdown"}, b""),
+        ({"id": "e", "op": "status"}, b""),  # never read after shutdown
+    )
+    assert [r["id"] for r in responses] == ["a", "b", "c", "d"]
+    assert responses[0]["model_loaded"] is False
+    assert responses[1]["segments"] == [{"start": "00:00:03.000", "end": "00:00:04.000", "text": "3200 bytes"}]
+    assert Path(responses[2]["path"]).read_text(encoding="utf-8").endswith("hi")
+    assert all(r["ok"] for r in responses)
+    assert server.stopping
+
+
+def test_errors_are_reported_per_request():
+    server = SidecarServer(None)
+    responses = _run(
+        server,
+        ({"id": 1, "op": "transcribe_chunk"}, b"\x00\x00"),
+        ({"id": 2, "op": "nope"}, b""),
+    )
+    assert [(r["id"], r["ok"]) for r in responses] == [(1, False), (2, False)]
+    assert "No model configured" in responses[0]["error"]
+
+
+def test_end_of_input_waits_for_pending_replies():
+    class SlowTranscriber(FakeTranscriber):
+        def submit(self, chunk, callback=None, timeout=10.0, priority="interactive"):
+            future = Future()
+            result = super().submit(chunk).result()
+            threading.Timer(0.1, future.set_result, (result,)).start()
+            return future
+
+    server = SidecarServer(lambda: SlowTranscriber())
+    # The client half-closes right after its request; the reply must still be written
+    responses = _run(server, ({"id": 1, "op": "transcribe_chunk"}, b"\x00\x00"))
+    assert [(r["id"], r["ok"]) for r in responses] == [(1, True)]
+
+
+def test_status_replies_without_holding_the_server_lock():
+    server = SidecarServer(None)
+    replies = []
+    server._op_status({}, b"", lambda status: replies.append(server._lock.locked()))
+    assert replies == [False]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets unavailable")
+def test_serve_unix_socket(tmp_path):
+    path = str(tmp_path / "whisperlite.sock")
+    server = SidecarServer(lambda: FakeTranscriber())
+    thread = threading.Thread(target=server.serve_unix, args=(path,), daemon=True)
+    thread.start()
+    for _ in range(100):
+        if Path(path).exists():
+            break
+        time.sleep(0.01)
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(path)
+        rfile, wfile = conn.makefile("rb"), conn.makefile("wb")
+        write_frame(wfile, {"id": 1, "op": "status"})
+        assert read_frame(rfile)[0]["ok"] is True
+        write_frame(wfile, {"id": 2, "op": "shutdown"})
+        assert read_frame(rfile)[0]["id"] == 2
+        rfile.close()
+        wfile.close()
+    thread.join(timeout=2)
+    assert not thread.is_alive()
+    assert not Path(path).exists()
@@ -0,0 +1,58 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+from segments import format_timestamp
+from stitcher import SegmentStitcher
+
+
+def seg(start_ms, end_ms, text):
+    return {"start": format_timestamp(start_ms), "end": format_timestamp(end_ms), "text": text}
+
+
+def texts(segments):
+    return [s["text"] for s in segments]
+
+
+def test_non_overlapping_windows_pass_through():
+    stitcher = SegmentStitcher(overlap_ms=0)
+    out = stitcher.add([seg(0, 1000, "one")], 0, 1500)
+    out += stitcher.add([seg(1500, 2500, "two")], 1500, 3000)
+    out += stitcher.flush()
+    assert texts(out) == ["one", "two"]
+
+
+def test_repeated_words_at_boundary_are_dropped():
+    stitcher = SegmentStitcher(overlap_ms=1000)
+    # Window 1 covers 0-3000 ms, window 2 covers 2000-5000 ms
+    out = stitcher.add([seg(0, 1500, "we went"), seg(1500, 2900, "to the")], 0, 3000)
+    assert texts(out) == ["we went"]
+    out += stitcher.add([seg(2200, 3500, "to the store"), seg(3500, 4800, "yesterday")], 2000, 5000)
+    out += stitcher.flush()
+    assert texts(out) == ["we went", "to the", "store", "yesterday"]
+    assert out[2]["start"] == "00:00:02.900"
+
+
+def test_previous_segments_after_cut_are_replaced_by_new_window():
+    stitcher = SegmentStitcher(overlap_ms=1000)
+    out = stitcher.add([seg(0, 2000, "hello"), seg(2600, 3000, "wor")], 0, 3000)
+    out += stitcher.add([seg(2550, 3400, "world"), seg(3400, 4000, "again")], 2000, 5000)
+    out += stitcher.flush()
+    assert texts(out) == ["hello", "world", "again"]
+
+
+def test_single_word_match_requires_time_overlap():
+    stitcher = SegmentStitcher(overlap_ms=0)
+    out = stitcher.add([seg(0, 1000, "yes")], 0, 1500)
+    out += stitcher.add([seg(2000, 2500, "yes")], 2000, 3000)
+    out += stitcher.flush()
+    assert texts(out) == ["yes", "yes"]
+
+
+def test_punctuation_and_case_ignored_in_alignment():
+    stitcher = SegmentStitcher(overlap_ms=1000)
+    out = stitcher.add([seg(0, 2900, "Thanks for coming,")], 0, 3000)
+    out += stitcher.add([seg(2100, 3600, "for coming. Let's start")], 2000, 5000)
+    out += stitcher.flush()
+    assert texts(out) == ["Thanks for coming,", "Let's start"]
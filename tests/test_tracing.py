@@ -0,0 +1,91 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+from audio_chunk import AudioChunk
+from segments import Segment, rebase_segments
+from stitcher import SegmentStitcher
+from tracing import ChunkTrace, LatencyTracer, traces_of
+from transcript_buffer import TranscriptBuffer
+
+
+@pytest.fixture
+def tracer(mocker):
+    tracer = LatencyTracer(enabled=True)
+    mocker.patch("tracing.TRACER", tracer)
+    mocker.patch("transcriber.TRACER", tracer)
+    mocker.patch("transcript_buffer.TRACER", tracer)
+    return tracer
+
+
+def test_finish_records_latency_once(mocker):
+    tracer = LatencyTracer(enabled=True)
+    trace = ChunkTrace(1, captured_at=10.0)
+    mocker.patch("tracing.time.monotonic", return_value=10.5)
+    assert tracer.finish(trace) == pytest.approx(0.5)
+    assert tracer.finish(trace) is None
+    assert tracer.latency.count == 1
+    assert "1 chunks" in tracer.summary()
+
+
+def test_disabled_tracer_keeps_nothing():
+    tracer = LatencyTracer()
+    trace = ChunkTrace(1)
+    tracer.mark(trace, "transcribed")
+    assert tracer.finish(trace) is None
+    assert trace.marks == [] and tracer.finished == []
+
+
+def test_trace_survives_rebase_and_stitching():
+    trace = ChunkTrace(3)
+    segments = rebase_segments([Segment(0, 500, "hello there", trace)], 1000)
+    assert segments[0].trace is trace
+
+    stitcher = SegmentStitcher(overlap_ms=500)
+    stitcher.add([Segment(0, 900, "hello there")], 0, 1000)
+    stitched = stitcher.add([Segment(700, 1400, "there friend", trace)], 500, 1500)
+    stitched += stitcher.flush()
+    friend = [s for s in stitched if s.text == "friend"]
+    assert len(friend) == 1 and friend[0].trace is trace
+
+
+def test_transcribed_segments_carry_the_chunk_trace(tracer, mocker, tmp_path):
+    from transcriber import WhisperTranscriber
+
+    model = tmp_path / "model.bin"
+    model.touch()
+    transcriber = WhisperTranscriber(str(model), whisper_bin="/usr/local/bin/main")
+    process = mocker.MagicMock(returncode=0)
+    process.communicate.return_value = (b"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nHi.\n", b"")
+    mocker.patch("subprocess.Popen", return_value=process)
+
+    trace = ChunkTrace(7)
+    segments = transcriber.transcribe_chunk(AudioChunk(7, b"\0\0" * 1600, offset_ms=3000, trace=trace))
+    buffer = TranscriptBuffer()
+    buffer.append(segments)
+    assert buffer.read_since(0).segments[0].trace is trace
+    assert traces_of(segments) == [trace]
+
+    tracer.finish_segments(segments)
+    assert [stage for stage, _ in trace.marks] == ["inference_start", "transcribed", "buffered", "displayed"]
+
+
+def test_export_formats(tmp_path):
+    tracer = LatencyTracer(enabled=True)
+    trace = ChunkTrace(1)
+    tracer.mark(trace, "transcribed")
+    tracer.finish(trace)
+
+    tracer.export(str(tmp_path / "trace.jsonl"))
+    line = json.loads((tmp_path / "trace.jsonl").read_text())
+    assert line["chunk_id"] == 1
+    assert list(line["stages_ms"]) == ["transcribed", "displayed"]
+
+    tracer.export(str(tmp_path / "trace.json"))
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert [e["name"] for e in events] == ["captured -> transcribed", "transcribed -> displayed"]
+    assert all(e["ph"] == "X" and e["tid"] == 1 for e in events)
@@ -88,8 +88,9 @@ def test_transcribe_chunk_malformed_vtt(mock_transcriber, mocker, tmp_path):
     chunk_path.touch()
 
     segments = mock_transcriber.transcribe_chunk(str(chunk_path))
-    assert len(segments) == 1 # Only the first valid segment should be parsed
-    assert segments[0]["text"] == "Hello world."
+    assert len(segments) == 1 # A stray line never becomes a segment of its own
+    # WebVTT cue text runs until the blank line, so the extra line belongs to the cue
+    assert segments[0]["text"] == "Hello world. MALFORMED LINE"
 
 def test_transcribe_chunk_no_output(mock_transcriber, mocker, tmp_path):
     mock_process = MagicMock()
@@ -102,3 +103,177 @@ def test_transcribe_chunk_no_output(mock_transcriber, mocker, tmp_path):
 
     segments = mock_transcriber.transcribe_chunk(str(chunk_path))
     assert segments == []
+
+def test_parse_vtt_multiple_cues():
+    from transcriber import parse_vtt
+    segments = parse_vtt("WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nOne.\n\n00:00:01.000 --> 00:00:02.000\nTwo.\n")
+    assert [s["text"] for s in segments] == ["One.", "Two."]
+    assert segments[1]["start"] == "00:00:01.000"
+
+def test_workers_require_server_binary(mocker, tmp_path):
+    model_path = tmp_path / "test_model.bin"
+    model_path.touch()
+    mocker.patch('shutil.which', side_effect=lambda name: '/usr/local/bin/main' if name == 'main' else None)
+    with pytest.raises(FileNotFoundError, match='server binary not found'):
+        WhisperTranscriber(str(model_path), workers=2)
+
+def test_transcribe_chunk_uses_worker_pool(mocker, tmp_path):
+    model_path = tmp_path / "test_model.bin"
+    model_path.touch()
+    mocker.patch('transcriber.WhisperServerWorker.start')
+    transcribe = mocker.patch(
+        'transcriber.WhisperServerWorker.transcribe',
+        return_value=[{"start": "00:00:00.000", "end": "00:00:01.000", "text": "pooled"}]
+    )
+    popen = mocker.patch('subprocess.Popen')
+    transcriber = WhisperTranscriber(str(model_path), workers=2, server_bin='/usr/local/bin/whisper-server')
+
+    chunk_path = tmp_path / "audio.wav"
+    chunk_path.touch()
+
+    segments = transcriber.transcribe_chunk(str(chunk_path))
+    transcriber.close()
+    assert segments[0]["text"] == "pooled"
+    transcribe.assert_called_once_with(str(chunk_path), 10.0)
+    popen.assert_not_called()
+
+def test_submit_without_pool_runs_synchronously(mock_transcriber, mocker, tmp_path):
+    mock_process = MagicMock()
+    mock_process.communicate.return_value = ("WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nSync.\n", "")
+    mocker.patch('subprocess.Popen', return_value=mock_process)
+
+    chunk_path = tmp_path / "audio.wav"
+    chunk_path.touch()
+
+    received = []
+    future = mock_transcriber.submit(str(chunk_path), callback=received.append)
+    assert future.done()
+    assert received[0][0]["text"] == "Sync."
+
+def test_transcribe_in_memory_chunk_pipes_wav_to_stdin(mock_transcriber, mocker):
+    from audio_chunk import AudioChunk
+    mock_process = MagicMock()
+    mock_process.communicate.return_value = (b"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nFrom memory.\n", b"")
+    popen = mocker.patch('subprocess.Popen', return_value=mock_process)
+
+    chunk = AudioChunk(1, b"\x00\x00" * 1600)
+    segments = mock_transcriber.transcribe_chunk(chunk)
+
+    assert segments[0]["text"] == "From memory."
+    cmd = popen.call_args[0][0]
+    assert cmd[cmd.index("-f") + 1] == "-"
+    assert "--output-vtt" not in cmd  # no -.vtt file per chunk
+    assert mock_process.communicate.call_args.kwargs["input"] == chunk.to_wav_bytes()
+
+def test_in_memory_chunk_segments_rebased_to_offset(mock_transcriber, mocker):
+    from audio_chunk import AudioChunk
+    mock_process = MagicMock()
+    mock_process.communicate.return_value = (b"WEBVTT\n\n00:00:00.250 --> 00:00:01.000\nLater.\n", b"")
+    mocker.patch('subprocess.Popen', return_value=mock_process)
+
+    segments = mock_transcriber.transcribe_chunk(AudioChunk(3, b"\x00\x00" * 1600, offset_ms=3000))
+    assert segments[0]["start"] == "00:00:03.250"
+    assert segments[0]["end"] == "00:00:04.000"
+
+def test_jobs_run_one_shot_processes_in_parallel(tmp_path, mocker):
+    model_path = tmp_path / "test_model.bin"
+    model_path.touch()
+    transcriber = WhisperTranscriber(str(model_path), jobs=3)
+    assert transcriber.concurrency == 3
+
+    def fake_popen(cmd, **kwargs):
+        process = MagicMock()
+        process.communicate.return_value = (b"WEBVTT\n\n00:00:00.000 --> 00:00:01.000\nchunk\n", b"")
+        return process
+    mocker.patch('subprocess.Popen', side_effect=fake_popen)
+
+    from audio_chunk import AudioChunk
+    futures = [transcriber.submit(AudioChunk(i, b"\x00\x00" * 160, offset_ms=i * 1000)) for i in range(6)]
+    starts = [f.result(timeout=5)[0]["start"] for f in futures]
+    transcriber.close()
+    assert starts == [f"00:00:0{i}.000" for i in range(6)]
+
+def test_result_cache_skips_whisper_for_repeated_audio(tmp_path, mocker):
+    from audio_chunk import AudioChunk
+    model_path = tmp_path / "test_model.bin"
+    model_path.touch()
+    transcriber = WhisperTranscriber(str(model_path), cache_dir=str(tmp_path / "cache"))
+    mock_process = MagicMock()
+    mock_process.communicate.return_value = (b"WEBVTT\n\n00:00:00.250 --> 00:00:01.000\nCached.\n", b"")
+    popen = mocker.patch('subprocess.Popen', return_value=mock_process)
+
+    first = transcriber.transcribe_chunk(AudioChunk(1, b"\x01\x00" * 1600, offset_ms=0))
+    # Same audio elsewhere in the timeline hits, with times on the new offset
+    again = transcriber.transcribe_chunk(AudioChunk(2, b"\x01\x00" * 1600, offset_ms=5000))
+    assert popen.call_count == 1
+    assert first[0]["start"] == "00:00:00.250"
+    assert again[0]["start"] == "00:00:05.250"
+    assert (transcriber.cache.stats.hits, transcriber.cache.stats.misses) == (1, 1)
+
+    transcriber.transcribe_chunk(AudioChunk(3, b"\x02\x00" * 1600))
+    assert popen.call_count == 2
+
+def test_result_cache_key_depends_on_language(tmp_path):
+    from audio_chunk import AudioChunk
+    model_path = tmp_path / "test_model.bin"
+    model_path.touch()
+    chunk = AudioChunk(1, b"\x01\x00" * 160)
+    en = WhisperTranscriber(str(model_path), cache_dir=str(tmp_path / "cache"))
+    de = WhisperTranscriber(str(model_path), language="de", cache_dir=str(tmp_path / "cache"))
+    assert en.cache.key(chunk) != de.cache.key(chunk)
+
+def test_stream_parser_handles_fragments_multiline_cues_and_bracket_lines():
+    from transcriber import VttStreamParser
+    received = []
+    parser = VttStreamParser(on_segment=received.append)
+    output = (
+        "WEBVTT\n\n00:00:00.000 --> 00:00:01.000 align:start\nFirst line\nsecond line\n\n"
+        "[00:00:01.000 --> 00:00:02.000]   Bracketed.\n"
+        "00:00:02.000 --> 00:00:03.000\nUnterminated"
+    )
+    returned = []
+    for i in range(0, len(output), 7):
+        returned.extend(parser.feed(output[i:i + 7]))
+    assert [s.text for s in received] == ["First line second line", "Bracketed."]
+    returned.extend(parser.close())
+    assert [s.text for s in received] == ["First line second line", "Bracketed.", "Unterminated"]
+    assert returned == received
+    assert received[2].start_ms == 2000
+
+def test_on_segment_streams_while_whisper_runs(mock_transcriber, mocker):
+    from audio_chunk import AudioChunk
+    received = []
+
+    class FakeProcess:
+        def __init__(self, *args, **kwargs):
+            self.stdin = MagicMock()
+            self.stderr = MagicMock()
+            self.stderr.read.return_value = b""
+            self.returncode = 0
+
+        @property
+        def stdout(self):
+            yield b"[00:00:00.000 --> 00:00:01.000]  One.\n"
+            # The first segment is delivered before whisper.cpp prints the next
+            assert [s.text for s in received] == ["One."]
+            yield b"[00:00:01.000 --> 00:00:02.000]  Two.\n"
+
+        def wait(self, timeout=None):
+            return 0
+
+        def kill(self):
+            pass
+
+    from tracing import TRACER, ChunkTrace
+    mocker.patch('subprocess.Popen', FakeProcess)
+    mocker.patch.object(TRACER, "enabled", True)
+    trace = ChunkTrace(1)
+    segments = mock_transcriber.transcribe_chunk(
+        AudioChunk(1, b"\x00\x00" * 1600, offset_ms=5000, trace=trace), on_segment=received.append
+    )
+    assert [s.text for s in received] == ["One.", "Two."]
+    assert received[0].start_ms == 5000
+    assert [s["start"] for s in segments] == ["00:00:05.000", "00:00:06.000"]
+    # Rebased once: the returned segments are the streamed ones, and the chunk is marked once
+    assert segments == received
+    assert [stage for stage, _ in trace.marks].count("transcribed") == 1
@@ -54,3 +54,93 @@ def test_empty_buffer_full_text(transcript_buffer):
 
 def test_empty_buffer_get_segments(transcript_buffer):
     assert transcript_buffer.get_segments() == []
+
+def test_segments_stored_compactly(transcript_buffer):
+    from segments import Segment
+    transcript_buffer.append([{"start": "00:00:01.000", "end": "00:00:02.000", "text": "a"}])
+    transcript_buffer.append([Segment(2000, 3000, "b")])
+    assert all(isinstance(s, Segment) for s in transcript_buffer.get_range(0, 10000))
+    assert transcript_buffer.get_segments()[1] == {"start": "00:00:02.000", "end": "00:00:03.000", "text": "b"}
+
+def test_get_range_uses_time_index(transcript_buffer):
+    from segments import Segment
+    transcript_buffer.append([Segment(i * 1000, i * 1000 + 900, f"s{i}") for i in range(100)])
+    assert [s.text for s in transcript_buffer.get_range(10000, 13000)] == ["s10", "s11", "s12"]
+    # A segment still running at the range start is included
+    assert [s.text for s in transcript_buffer.get_range(10500, 11000)] == ["s10"]
+    assert transcript_buffer.get_range(200000, 300000) == []
+
+def test_out_of_order_segments_are_kept_sorted(transcript_buffer):
+    from segments import Segment
+    transcript_buffer.append([Segment(0, 1000, "a"), Segment(3000, 4000, "c")])
+    transcript_buffer.append([Segment(1500, 2500, "b")])
+    assert transcript_buffer.full_text() == "a b c"
+
+def test_maxlen_eviction_compacts_storage():
+    from segments import Segment
+    buffer = TranscriptBuffer(maxlen=10)
+    for i in range(5000):
+        buffer.append([Segment(i, i + 1, str(i))])
+    assert len(buffer) == 10
+    assert buffer.get_segments()[0]["text"] == "4990"
+    assert len(buffer._segments) < 3000
+    assert [s.text for s in buffer.get_range(4995, 4997)] == ["4995", "4996"]
+
+def test_read_since_returns_only_new_segments(transcript_buffer):
+    transcript_buffer.append([{"start": "00:00:00.000", "end": "00:00:01.000", "text": "a"}])
+    delta = transcript_buffer.read_since(0)
+    assert [s.text for s in delta.segments] == ["a"] and not delta.reset
+    transcript_buffer.append([{"start": "00:00:01.000", "end": "00:00:02.000", "text": "b"}])
+    again = transcript_buffer.read_since(delta.cursor)
+    assert [s.text for s in again.segments] == ["b"]
+    assert transcript_buffer.read_since(again.cursor).segments == []
+    assert again.cursor == transcript_buffer.version == 2
+
+def test_read_since_resets_after_clear_and_reorder(transcript_buffer):
+    from segments import Segment
+    transcript_buffer.append([Segment(0, 1000, "a"), Segment(3000, 4000, "c")])
+    cursor = transcript_buffer.read_since(0).cursor
+    transcript_buffer.append([Segment(1500, 2500, "b")])
+    delta = transcript_buffer.read_since(cursor)
+    assert delta.reset and [s.text for s in delta.segments] == ["a", "b", "c"]
+    transcript_buffer.clear()
+    delta = transcript_buffer.read_since(delta.cursor)
+    assert delta.reset and delta.segments == []
+    assert delta.cursor > cursor
+
+def test_read_since_resets_when_cursor_falls_behind_eviction():
+    from segments import Segment
+    buffer = TranscriptBuffer(maxlen=5)
+    for i in range(3000):
+        buffer.append([Segment(i, i + 1, str(i))])
+    delta = buffer.read_since(0)
+    assert delta.reset and [s.text for s in delta.segments] == ["2995", "2996", "2997", "2998", "2999"]
+    buffer.append([Segment(3000, 3001, "3000")])
+    assert [s.text for s in buffer.read_since(delta.cursor).segments] == ["3000"]
+
+def test_full_text_cache_is_updated_incrementally(transcript_buffer):
+    transcript_buffer.append([{"text": "hello"}])
+    first = transcript_buffer.full_text()
+    assert transcript_buffer.full_text() is first
+    transcript_buffer.append([{"text": "world"}])
+    assert transcript_buffer.full_text() == "hello world"
+
+def test_cached_full_text_matches_plain_join_with_empty_texts(transcript_buffer):
+    texts = []
+    for batch in ([""], ["a"], [""], ["b", ""], [""]):
+        transcript_buffer.append([{"text": text} for text in batch])
+        texts.extend(batch)
+        # Same separators as joining every segment's text from scratch
+        assert transcript_buffer.full_text() == " ".join(texts)
+    assert transcript_buffer.full_text() == " a  b  "
+
+def test_pending_text_stays_bounded_while_cache_is_invalid():
+    from segments import Segment
+    buffer = TranscriptBuffer(maxlen=100)
+    for i in range(5000):
+        buffer.append([Segment(i, i + 1, str(i))])
+    # Eviction invalidated the text cache, so nothing is kept for it
+    assert buffer._text_pending == []
+    assert buffer.full_text() == " ".join(str(i) for i in range(4900, 5000))
+    buffer.append([Segment(5000, 5001, "5000")])
+    assert buffer.full_text().endswith("4999 5000")
@@ -0,0 +1,210 @@
+import asyncio
+import io
+import json
+import sys
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from segments import Segment
+from transcription_server import HttpError, ServerLimits, TranscriptionServer, _JobQueue, websocket_connect
+
+
+class FakeTranscriber:
+    concurrency = 1
+
+    def __init__(self, gate=None):
+        self.gate = gate
+        self.chunks = []
+
+    def transcribe_chunk(self, chunk, timeout=10.0, on_segment=None, priority="interactive"):
+        if self.gate is not None and priority == "batch":
+            self.gate.wait(5)  # holds uploads only
+        self.chunks.append(chunk)
+        end_ms = chunk.offset_ms + int(chunk.duration_sec * 1000)
+        segments = [Segment(chunk.offset_ms, end_ms, f"chunk {len(self.chunks)}")]
+        for segment in segments:
+            if on_segment is not None:
+                on_segment(segment)
+        return segments
+
+    def submit(self, chunk, callback=None, timeout=10.0, on_segment=None, stream=None, priority="interactive"):
+        future = Future()
+        future.set_result(self.transcribe_chunk(chunk, timeout, on_segment, priority))
+        if callback is not None:
+            callback(future.result())
+        return future
+
+
+def wav_bytes(seconds, rate=16000):
+    buffer = io.BytesIO()
+    sf.write(buffer, np.zeros(int(seconds * rate), dtype=np.int16), rate, format="WAV", subtype="PCM_16")
+    return buffer.getvalue()
+
+
+async def request(port, method, target, body=b"", headers=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines = [f"{method} {target} HTTP/1.1", "Host: localhost"]
+    if method == "POST":
+        lines.append(f"Content-Length: {len(body)}")
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status_line, *header_lines = head.decode("latin-1").split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), response_headers, payload
+
+
+def run_with_server(transcriber, test, **limits):
+    async def main():
+        server = TranscriptionServer(transcriber, limits=ServerLimits(**limits), chunk_sec=1.5)
+        await server.start()
+        try:
+            return await test(server)
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_upload_returns_transcript_in_requested_format():
+    async def test(server):
+        status, headers, body = await request(server.port, "POST", "/transcribe?format=json", wav_bytes(3.5))
+        assert status == 200 and headers["Content-Type"] == "application/json"
+        assert [s["start"] for s in json.loads(body)] == ["00:00:00.000", "00:00:01.500", "00:00:03.000"]
+        assert headers["X-Audio-Duration"] == "3.500"
+
+        status, _, body = await request(server.port, "POST", "/transcribe", wav_bytes(1.0))
+        assert status == 200 and body == b"chunk 4"
+
+    run_with_server(FakeTranscriber(), test)
+
+
+def test_multipart_upload():
+    audio = wav_bytes(1.0)
+    body = (
+        b"--XYZ\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.wav\"\r\n"
+        b"Content-Type: audio/wav\r\n\r\n" + audio + b"\r\n--XYZ--\r\n"
+    )
+
+    async def test(server):
+        status, _, payload = await request(
+            server.port, "POST", "/transcribe?format=srt", body,
+            {"Content-Type": "multipart/form-data; boundary=XYZ"},
+        )
+        assert status == 200
+        assert payload.decode() == "1\n00:00:00,000 --> 00:00:01,000\nchunk 1\n"
+
+    run_with_server(FakeTranscriber(), test)
+
+
+def test_request_errors():
+    async def test(server):
+        assert (await request(server.port, "GET", "/nope"))[0] == 404
+        assert (await request(server.port, "GET", "/transcribe"))[0] == 405
+        assert (await request(server.port, "POST", "/transcribe?format=docx", b"x"))[0] == 400
+        assert (await request(server.port, "POST", "/transcribe", b"x" * 2048))[0] == 413
+        assert (await request(server.port, "POST", "/transcribe", b"not audio"))[0] == 400
+        status, _, body = await request(server.port, "GET", "/health")
+        assert status == 200 and json.loads(body)["requests"] == 6  # including this one
+
+    run_with_server(FakeTranscriber(), test, max_upload_bytes=1024)
+
+
+def test_full_queue_sheds_load_with_503():
+    gate = threading.Event()
+
+    async def test(server):
+        running = asyncio.ensure_future(request(server.port, "POST", "/transcribe", wav_bytes(1.0)))
+        while server._queue.qsize() or not server.stats.uploads:
+            await asyncio.sleep(0.01)  # wait until the worker has taken the first job
+        queued = asyncio.ensure_future(request(server.port, "POST", "/transcribe", wav_bytes(1.0)))
+        while not server._queue.full():
+            await asyncio.sleep(0.01)
+
+        status, headers, _ = await request(server.port, "POST", "/transcribe", wav_bytes(1.0))
+        assert status == 503 and headers["Retry-After"] == "1"
+
+        # Stream chunks skip the upload queue, so a stream is still served while uploads are stuck
+        ws = await websocket_connect("127.0.0.1", server.port, "/stream?chunk_sec=0.5")
+        await ws.send(b"\x00\x00" * 8000)
+        await ws.send(json.dumps({"event": "end"}))
+        assert json.loads(await ws.receive())["start"] == "00:00:00.000"
+        assert json.loads(await ws.receive())["event"] == "done"
+
+        gate.set()
+        assert [(await running)[0], (await queued)[0]] == [200, 200]
+        assert server.stats.rejected == 1
+
+    run_with_server(FakeTranscriber(gate), test, queue_size=1)
+
+
+def test_websocket_streams_segments_in_order():
+    async def test(server):
+        ws = await websocket_connect("127.0.0.1", server.port, "/stream?chunk_sec=0.5")
+        for _ in range(16):
+            await ws.send(b"\x00\x00" * 1600)  # 0.1 s per message
+        await ws.send(json.dumps({"event": "end"}))
+        messages = []
+        while True:
+            message = json.loads(await ws.receive())
+            messages.append(message)
+            if message.get("event") == "done":
+                break
+        assert [m["start"] for m in messages[:-1]] == ["00:00:00.000", "00:00:00.500", "00:00:01.000", "00:00:01.500"]
+        assert messages[3]["end"] == "00:00:01.600"
+        assert messages[-1] == {"event": "done", "chunks": 4, "segments": 4, "dropped_chunks": 0}
+
+    run_with_server(FakeTranscriber(), test)
+
+
+def test_websocket_reports_chunks_the_transcriber_refuses():
+    class ClosedTranscriber(FakeTranscriber):
+        def submit(self, chunk, **kwargs):
+            raise RuntimeError("TranscriptionPool is closed")
+
+    async def test(server):
+        ws = await websocket_connect("127.0.0.1", server.port, "/stream?chunk_sec=0.5")
+        await ws.send(b"\x00\x00" * 8000)
+        await ws.send(json.dumps({"event": "end"}))
+        assert json.loads(await ws.receive()) == {"event": "dropped", "start": "00:00:00.000", "end": "00:00:00.500"}
+        assert json.loads(await ws.receive())["dropped_chunks"] == 1
+
+    run_with_server(ClosedTranscriber(), test)
+
+
+def test_websocket_stream_limit():
+    async def test(server):
+        first = await websocket_connect("127.0.0.1", server.port)
+        with pytest.raises(HttpError) as refused:
+            await websocket_connect("127.0.0.1", server.port)
+        assert refused.value.status == 503
+        await first.close()
+
+    run_with_server(FakeTranscriber(), test, max_streams=1)
+
+
+def test_job_queue_starts_live_jobs_first_and_limits_batch():
+    async def main():
+        jobs = _JobQueue(4, batch_limit=1)
+        jobs.put_nowait("upload 1", "batch")
+        jobs.put_nowait("upload 2", "batch")
+        jobs.put_nowait("chunk", "live")
+        assert await jobs.get() == ("live", "chunk")
+        assert await jobs.get() == ("batch", "upload 1")
+
+        second = asyncio.ensure_future(jobs.get())
+        await asyncio.sleep(0.05)
+        assert not second.done()  # one upload at a time leaves a worker for stream chunks
+        jobs.done("batch")
+        assert await asyncio.wait_for(second, 1) == ("batch", "upload 2")
+
+    asyncio.run(main())
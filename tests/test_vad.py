@@ -0,0 +1,78 @@
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+
+from audio_chunk import AudioChunk
+from vad import VoiceActivityDetector
+
+SR = 16000
+
+
+def _tone(seconds, amplitude=8000):
+    t = np.arange(int(SR * seconds)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype("<i2")
+
+
+def _silence(seconds):
+    return np.zeros(int(SR * seconds), dtype="<i2")
+
+
+def _chunk(samples, offset_ms=0, index=1):
+    return AudioChunk(index, samples.tobytes(), SR, 1, offset_ms)
+
+
+def test_silent_chunk_is_dropped_and_counted():
+    vad = VoiceActivityDetector()
+    assert vad.process(_chunk(_silence(1.5))) is None
+    assert vad.stats.chunks_skipped == 1
+    assert vad.stats.skipped_ms == 1500
+
+
+def test_speech_chunk_passes_through_unchanged():
+    vad = VoiceActivityDetector()
+    chunk = _chunk(_tone(1.5))
+    assert vad.process(chunk) is chunk
+    assert vad.stats.skipped_ms == 0
+
+
+def test_leading_silence_trimmed_and_offset_adjusted():
+    vad = VoiceActivityDetector(pre_roll_ms=100, hangover_ms=0)
+    samples = np.concatenate([_silence(1.0), _tone(0.5)])
+    out = vad.process(_chunk(samples, offset_ms=3000))
+    assert out.offset_ms == 3000 + 900
+    assert out.num_frames == int(SR * 0.6)
+    assert vad.stats.skipped_ms == 900
+
+
+def test_hangover_carries_into_next_chunk():
+    vad = VoiceActivityDetector(hangover_ms=400, pre_roll_ms=0)
+    vad.process(_chunk(np.concatenate([_silence(1.0), _tone(0.5)])))
+    out = vad.process(_chunk(_silence(1.5), offset_ms=1500, index=2))
+    assert out is not None
+    assert out.offset_ms == 1500
+    assert out.num_frames == int(SR * 0.4)
+    # The hangover is spent; the next silent chunk is dropped
+    assert vad.process(_chunk(_silence(1.5), offset_ms=3000, index=3)) is None
+
+
+def test_quiet_noisy_frames_use_zero_crossing_rate():
+    rng = np.random.default_rng(0)
+    hiss = (rng.standard_normal(SR) * 100).astype("<i2")  # about -50 dBFS, high ZCR
+    assert VoiceActivityDetector(threshold_db=-45).process(_chunk(hiss)) is not None
+    assert VoiceActivityDetector(threshold_db=-45, zcr_margin_db=0).process(_chunk(hiss)) is None
+
+
+def test_stereo_chunks_are_analysed_as_mono():
+    stereo = np.repeat(_tone(0.5), 2)
+    out = VoiceActivityDetector().process(AudioChunk(1, stereo.tobytes(), SR, 2))
+    assert out is not None and out.channels == 2
+
+
+def test_reset_clears_stats():
+    vad = VoiceActivityDetector()
+    vad.process(_chunk(_silence(1.0)))
+    vad.reset()
+    assert vad.stats.audio_ms == 0
@@ -0,0 +1,57 @@
+import struct
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import numpy as np
+import soundfile as sf
+
+from wav_mmap import map_pcm_wav
+
+
+def _write(path, data, rate=16000, subtype="PCM_16"):
+    sf.write(str(path), data, rate, subtype=subtype)
+    return str(path)
+
+
+def test_blocks_are_views_matching_soundfile(tmp_path):
+    data = np.arange(-5000, 5000, dtype=np.int16)
+    path = _write(tmp_path / "a.wav", data)
+    with map_pcm_wav(path) as wav:
+        assert (wav.samplerate, wav.channels, wav.frames) == (16000, 1, len(data))
+        blocks = list(wav.blocks(blocksize=3000, overlap=1000))
+        with sf.SoundFile(path) as f:
+            expected = list(f.blocks(blocksize=3000, overlap=1000, dtype="int16"))
+        assert len(blocks) == len(expected)
+        for got, want in zip(blocks, expected):
+            np.testing.assert_array_equal(got, want)
+        assert not blocks[0].flags.owndata  # a view into the mapping, not a decoded copy
+        del blocks
+
+
+def test_stereo_blocks_are_2d(tmp_path):
+    data = np.stack([np.arange(100, dtype=np.int16), -np.arange(100, dtype=np.int16)], axis=1)
+    with map_pcm_wav(_write(tmp_path / "s.wav", data, rate=48000)) as wav:
+        block = next(wav.blocks(blocksize=40))
+        assert block.shape == (40, 2)
+        np.testing.assert_array_equal(block, data[:40])
+        del block
+
+
+def test_non_pcm16_files_fall_back(tmp_path):
+    data = np.zeros(1000, dtype=np.int16)
+    assert map_pcm_wav(_write(tmp_path / "f.wav", data, subtype="FLOAT")) is None
+    assert map_pcm_wav(_write(tmp_path / "a.flac", data)) is None
+    (tmp_path / "junk.wav").write_bytes(b"not a wav file")
+    assert map_pcm_wav(str(tmp_path / "junk.wav")) is None
+
+
+def test_placeholder_data_length_is_clamped(tmp_path):
+    path = _write(tmp_path / "stream.wav", np.ones(500, dtype=np.int16))
+    raw = bytearray(Path(path).read_bytes())
+    data_at = raw.index(b"data")
+    raw[data_at + 4:data_at + 8] = struct.pack("<I", 0xFFFFFFFF)
+    Path(path).write_bytes(bytes(raw))
+    with map_pcm_wav(path) as wav:
+        assert wav.frames == 500
@@ -0,0 +1,247 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
+
+import pytest
+
+import worker_pool
+from metrics import METRICS
+from worker_pool import (
+    DeficitScheduler,
+    PriorityScheduler,
+    RoundRobinScheduler,
+    TranscriptionPool,
+    background_command,
+    make_scheduler,
+)
+
+
+class SleepyBackend:
+    """Returns one segment per chunk after sleeping for the chunk's delay."""
+
+    def __init__(self):
+        self.closed = False
+
+    def transcribe(self, chunk, timeout):
+        name, delay = chunk
+        time.sleep(delay)
+        if name == "boom":
+            raise RuntimeError("backend failure")
+        return [{"start": "00:00:00.000", "end": "00:00:01.000", "text": name}]
+
+    def close(self):
+        self.closed = True
+
+
+def test_pool_requires_backends():
+    with pytest.raises(ValueError):
+        TranscriptionPool([])
+
+
+def test_callbacks_delivered_in_submission_order():
+    pool = TranscriptionPool([SleepyBackend() for _ in range(3)])
+    delivered = []
+    done = threading.Event()
+
+    def on_segments(segments):
+        delivered.append(segments[0]["text"])
+        if len(delivered) == 3:
+            done.set()
+
+    # The first chunk is the slowest, so later chunks finish first
+    pool.submit(("one", 0.2), callback=on_segments)
+    pool.submit(("two", 0.05), callback=on_segments)
+    pool.submit(("three", 0.0), callback=on_segments)
+
+    assert done.wait(timeout=5)
+    assert delivered == ["one", "two", "three"]
+    pool.close()
+
+
+def test_future_returns_segments():
+    pool = TranscriptionPool([SleepyBackend()])
+    future = pool.submit(("hello", 0.0))
+    assert future.result(timeout=5)[0]["text"] == "hello"
+    pool.close()
+
+
+def test_backend_error_delivers_empty_and_keeps_order():
+    pool = TranscriptionPool([SleepyBackend(), SleepyBackend()])
+    delivered = []
+    failed = pool.submit(("boom", 0.0), callback=delivered.append)
+    ok = pool.submit(("fine", 0.0), callback=delivered.append)
+
+    with pytest.raises(RuntimeError):
+        failed.result(timeout=5)
+    ok.result(timeout=5)
+    pool.close()
+    assert delivered[0] == []
+    assert delivered[1][0]["text"] == "fine"
+
+
+def test_close_releases_backends_and_rejects_new_work():
+    backends = [SleepyBackend(), SleepyBackend()]
+    pool = TranscriptionPool(backends)
+    pool.close()
+    assert all(b.closed for b in backends)
+    with pytest.raises(RuntimeError):
+        pool.submit(("late", 0.0))
+
+
+def test_slow_callback_only_holds_up_its_own_stream():
+    pool = TranscriptionPool([SleepyBackend() for _ in range(2)])
+    release = threading.Event()
+    quick = threading.Event()
+
+    pool.submit(("slow", 0.0), callback=lambda segments: release.wait(5), stream="a")
+    pool.submit(("quick", 0.05), callback=lambda segments: quick.set(), stream="b")
+
+    # Stream a's consumer is stuck, yet stream b's result is still delivered
+    assert quick.wait(timeout=2)
+    release.set()
+    pool.close()
+
+
+def test_deficit_scheduler_shares_turns_by_cost():
+    scheduler = DeficitScheduler(quantum=2.0, cost=lambda task: task[1])
+    for _ in range(3):
+        scheduler.put(("long", 2.0), key="a")
+    for _ in range(4):
+        scheduler.put(("short", 1.0), key="b")
+    scheduler.close()
+    taken = []
+    while (task := scheduler.get()) is not None:
+        taken.append(task[0])
+    # One long chunk buys as much worker time as two short ones
+    assert taken == ["long", "short", "short", "long", "short", "short", "long"]
+
+
+def test_round_robin_scheduler_alternates_streams_in_order():
+    scheduler = RoundRobinScheduler()
+    for i in range(3):
+        scheduler.put(("chatty", i), key="chatty")
+    scheduler.put(("quiet", 0), key="quiet")
+    scheduler.close()
+    taken = []
+    while (task := scheduler.get()) is not None:
+        taken.append(task)
+    assert taken == [("chatty", 0), ("quiet", 0), ("chatty", 1), ("chatty", 2)]
+
+
+def test_make_scheduler_rejects_unknown_names():
+    with pytest.raises(ValueError):
+        make_scheduler("lottery")
+
+
+def test_fair_pool_serves_quiet_streams_before_a_backlog():
+    pool = TranscriptionPool([SleepyBackend() for _ in range(4)], scheduler=make_scheduler("round-robin"))
+    finished = {}
+    delivered = []
+
+    def record(name):
+        def on_segments(segments):
+            finished[name] = time.monotonic()
+            delivered.append(segments[0]["text"])
+        return on_segments
+
+    for i in range(16):
+        pool.submit((f"chatty{i}", 0.05), callback=record(f"chatty{i}"), stream="chatty")
+    for i in range(8):
+        pool.submit((f"quiet{i}", 0.05), callback=record(f"quiet{i}"), stream=f"quiet{i}")
+    pool.close()
+
+    # 4 workers serve all 8 quiet streams while most of the chatty backlog still waits
+    assert max(finished[f"quiet{i}"] for i in range(8)) < finished["chatty15"]
+    assert [t for t in delivered if t.startswith("chatty")] == [f"chatty{i}" for i in range(16)]
+
+
+def by_class(**kwargs):
+    # Test tasks are (name, priority) pairs rather than pool tuples
+    return PriorityScheduler(scheduler="round-robin", priority_of=lambda task: task[1], **kwargs)
+
+
+def take_all(scheduler):
+    scheduler.close()
+    taken = []
+    while (task := scheduler.get()) is not None:
+        taken.append(task[0])
+        scheduler.task_done(task)
+    return taken
+
+
+def test_strict_priority_serves_live_before_earlier_batch_work():
+    scheduler = by_class()
+    for i in range(2):
+        scheduler.put((f"batch{i}", "batch"))
+    scheduler.put(("chat", "interactive"))
+    scheduler.put(("mic", "live"))
+    assert take_all(scheduler) == ["mic", "chat", "batch0", "batch1"]
+
+
+def test_weighted_priority_keeps_batch_moving():
+    scheduler = by_class(mode="weighted", weights={"live": 2, "interactive": 1, "batch": 1})
+    for i in range(4):
+        scheduler.put(("live", "live"), key="mic")
+        scheduler.put(("batch", "batch"), key="file")
+    assert take_all(scheduler)[:6] == ["live", "batch", "live", "live", "batch", "live"]
+
+
+def test_batch_limit_holds_batch_work_until_a_slot_frees():
+    scheduler = by_class(batch_limit=1)
+    scheduler.put(("a", "batch"))
+    scheduler.put(("b", "batch"))
+    first = scheduler.get()
+    taken = []
+    waiter = threading.Thread(target=lambda: taken.append(scheduler.get()))
+    waiter.start()
+    waiter.join(timeout=0.2)
+    assert waiter.is_alive()  # the second batch task waits while the first runs
+
+    scheduler.put(("live", "live"))
+    waiter.join(timeout=5)
+    assert taken[0][0] == "live"  # live work is not held back by the limit
+    scheduler.task_done(first)
+    assert scheduler.get()[0] == "b"
+
+
+def test_priority_pool_runs_live_chunks_next_and_times_each_class():
+    METRICS.enable()
+    try:
+        pool = TranscriptionPool([SleepyBackend()], scheduler=PriorityScheduler())
+        order = []
+        pool.submit(("running", 0.1), callback=lambda s: order.append(s[0]["text"]), priority="batch")
+        while pool._tasks.qsize():
+            time.sleep(0.005)  # the only worker is busy from here on
+        for i in range(3):
+            pool.submit((f"batch{i}", 0.0), callback=lambda s: order.append(s[0]["text"]), priority="batch", stream="file")
+        pool.submit(("live", 0.0), callback=lambda s: order.append(s[0]["text"]), priority="live", stream="mic")
+        pool.close()
+        stages = METRICS.snapshot()["stages"]
+    finally:
+        METRICS.disable()
+        METRICS.reset()
+    assert order == ["running", "live", "batch0", "batch1", "batch2"]
+    assert stages["pool.wait.batch"]["count"] == 4 and stages["pool.wait.live"]["count"] == 1
+
+
+def test_pool_rejects_unknown_priority():
+    pool = TranscriptionPool([SleepyBackend()])
+    with pytest.raises(ValueError):
+        pool.submit(("x", 0.0), priority="urgent")
+    pool.close()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="nice and ionice are POSIX tools")
+def test_background_command_lowers_cpu_and_io_priority(monkeypatch):
+    monkeypatch.setattr(worker_pool.os, "getpriority", lambda which, who: 0)
+    monkeypatch.setattr(worker_pool.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(worker_pool.sys, "platform", "linux")
+    assert background_command(["main", "-f", "-"]) == [
+        "/usr/bin/nice", "-n", "10", "/usr/bin/ionice", "-c", "3", "main", "-f", "-",
+    ]
+    # A process already in the background passes it on to its children unchanged
+    monkeypatch.setattr(worker_pool.os, "getpriority", lambda which, who: 10)
+    assert background_command(["main"]) == ["main"]